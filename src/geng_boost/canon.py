@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+
+import shutil       # labelg の存在確認 / For locating the labelg executable
+import threading    # labelg への書き込みスレッド / For the writer thread feeding labelg
+import subprocess   # labelg の実行に使用 / For running nauty's labelg
+
+# nauty の labelg が PATH にあればそれを使い、なければ Python 実装で代用する
+# Use nauty's labelg when it is on PATH, otherwise fall back to the Python implementation
+LABELG = shutil.which("labelg")
+
+
+# graph6 文字列を隣接集合のリストに変換する関数（n <= 62 を想定）
+# Decode a graph6 string into a list of adjacency sets (assumes n <= 62)
+def decode_graph6(line):
+    data = line.encode() if isinstance(line, str) else line
+    n = data[0] - 63
+    adj = [set() for _ in range(n)]
+    k = 0
+    for j in range(1, n):
+        for i in range(j):
+            byte = data[1 + k // 6] - 63
+            if byte & (1 << (5 - k % 6)):
+                adj[i].add(j)
+                adj[j].add(i)
+            k += 1
+    return adj
+
+
+# 隣接集合のリストを graph6 文字列に変換する関数（order[k] が新しいラベル k の頂点）
+# Encode adjacency sets as graph6; order[k] is the vertex that receives new label k
+def encode_graph6(adj, order=None):
+    n = len(adj)
+    if order is None:
+        order = range(n)
+    order = list(order)
+    out = [chr(n + 63)]
+    value = 0
+    bits = 0
+    for j in range(1, n):
+        vj = order[j]
+        for i in range(j):
+            value = (value << 1) | (order[i] in adj[vj])
+            bits += 1
+            if bits == 6:
+                out.append(chr(value + 63))
+                value = 0
+                bits = 0
+    if bits:
+        out.append(chr((value << (6 - bits)) + 63))
+    return "".join(out)
+
+
+# 分割を等分割になるまで細分化する関数（ラベルに依存しない順序で細分化する）
+# Refine an ordered partition until it is equitable (splitting order is label-invariant)
+def _refine(adj, cells):
+    changed = True
+    while changed:
+        changed = False
+        cell_of = {}
+        for idx, cell in enumerate(cells):
+            for v in cell:
+                cell_of[v] = idx
+        new_cells = []
+        for cell in cells:
+            if len(cell) == 1:
+                new_cells.append(cell)
+                continue
+            # 各頂点について、各セルへの隣接数ベクトルを求める
+            # For each vertex, count its neighbours in every cell
+            groups = {}
+            for v in cell:
+                counts = [0] * len(cells)
+                for w in adj[v]:
+                    counts[cell_of[w]] += 1
+                groups.setdefault(tuple(counts), []).append(v)
+            if len(groups) > 1:
+                changed = True
+            for key in sorted(groups):
+                new_cells.append(groups[key])
+        cells = new_cells
+    return cells
+
+
+# 次数で分けた初期分割を細分化した等分割を返す関数（セルの大きさの並びはグラフの不変量）
+# Return the equitable refinement of the partition by degree (its cell sizes are a graph invariant)
+def equitable_cells(adj):
+    degree_cells = {}
+    for v in range(len(adj)):
+        degree_cells.setdefault(len(adj[v]), []).append(v)
+    return _refine(adj, [degree_cells[d] for d in sorted(degree_cells)])
+
+
+# 自己同型 gens で生成される群の軌道で、explored のどれかと同じ軌道に v があるかを調べる関数
+# Check whether v lies in the orbit of any vertex of explored under the group generated by gens
+def _in_explored_orbit(v, explored, gens, n):
+    parent = list(range(n))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for g in gens:
+        for x in range(n):
+            a, b = find(x), find(g[x])
+            if a != b:
+                parent[a] = b
+    roots = {find(u) for u in explored}
+    return find(v) in roots
+
+
+# 個別化・細分化の探索木を辿り、最小の graph6 を正準形とする（labelg が無いとき用）
+# 同じ graph6 を与える 2 つの葉から自己同型が分かるので、それを使って探索を刈り込む：
+#  - 節点の個別化した頂点をすべて固定する自己同型で、探索済みの子と同じ軌道にある子は辿らない
+#  - 最初の葉（または最良の葉）と同じ graph6 の葉に着いたら、その自己同型が共通の祖先までの経路を
+#    写すとき、共通の祖先の次の子までさかのぼる（その部分木は探索済みの部分木の像）
+# どちらも同じ graph6 の葉しか省かないので、正準形は刈り込まない全探索と同じになる。
+# Walk the individualisation-refinement tree and take the smallest graph6 as canonical form
+# Two leaves giving the same graph6 reveal an automorphism, which prunes the search:
+#  - children in the orbit of an explored child, under automorphisms fixing the individualised vertices of
+#    the node, are skipped
+#  - at a leaf equivalent to the first (or best) leaf, when the automorphism maps the path up to the common
+#    ancestor, the search jumps back to the next child of the common ancestor (that subtree is an image of one
+#    already explored)
+# Both only skip leaves with a graph6 already seen, so the canonical form equals that of the full search.
+def _python_canonical(line):
+    adj = decode_graph6(line)
+    n = len(adj)
+    if n == 0:
+        return line
+    automorphisms = []
+    first = None    # 最初の葉 (graph6, 経路, 頂点順) / First leaf (graph6, path, vertex order)
+    best = None     # 最小の葉 / Smallest leaf
+
+    # 葉 (path, order) が参照の葉 ref と同じ graph6 のとき、自己同型を記録して戻り先の深さを返す
+    # When leaf (path, order) has the same graph6 as the leaf ref, record the automorphism and return the depth
+    # to jump back to
+    def equivalent_leaf(path, order, ref):
+        _, ref_path, ref_order = ref
+        gamma = [0] * n
+        for u, w in zip(ref_order, order):
+            gamma[u] = w
+        automorphisms.append(gamma)
+        common = 0
+        while path[common] == ref_path[common]:
+            common += 1
+        if all(gamma[ref_path[i]] == path[i] for i in range(common + 1)):
+            return common
+        return None
+
+    # 分割 cells（個別化した頂点の列 path）の部分木を探索し、さかのぼる深さ（なければ None）を返す
+    # Search the subtree of cells (individualised vertices path) and return the depth to jump back to (or None)
+    def search(cells, path):
+        nonlocal first, best
+        target = next((i for i, c in enumerate(cells) if len(c) > 1), None)
+        if target is None:
+            # 離散分割（葉）に到達したら graph6 を比較
+            # At a discrete partition (leaf), compare the relabelled graph6
+            order = [c[0] for c in cells]
+            form = encode_graph6(adj, order)
+            if first is None:
+                first = best = (form, path, order)
+                return None
+            for ref in (first, best):
+                if form == ref[0]:
+                    return equivalent_leaf(path, order, ref)
+            if form < best[0]:
+                best = (form, path, order)
+            return None
+
+        # 最初の非単元セルの各頂点を個別化して子ノードを作る（探索済みの子の軌道にあるものは省く）
+        # Individualise each vertex of the first non-singleton cell (skipping the orbits of explored children)
+        explored = []
+        for v in cells[target]:
+            if explored:
+                gens = [g for g in automorphisms if all(g[p] == p for p in path)]
+                if gens and _in_explored_orbit(v, explored, gens, n):
+                    continue
+            explored.append(v)
+            rest = [w for w in cells[target] if w != v]
+            child = cells[:target] + [[v], rest] + cells[target + 1:]
+            jump = search(_refine(adj, child), path + [v])
+            if jump is not None and jump < len(path):
+                return jump
+        return None
+
+    # 初期分割は次数で分けてから細分化する
+    # The initial partition is split by degree before refinement
+    search(equitable_cells(adj), [])
+    return best[0]
+
+
+# graph6 文字列を 1 つ正準化する関数（labelg は subprocess.run で 1 回だけ起動し、終了まで待つ）
+# Canonicalise a single graph6 string (labelg is started once with subprocess.run and waited for)
+def canonical_graph6(line, use_labelg=True):
+    if not (use_labelg and LABELG):
+        return _python_canonical(line.strip())
+    result = subprocess.run([LABELG, "-q"], input=line.strip() + "\n", stdout=subprocess.PIPE,
+                            stderr=subprocess.DEVNULL, text=True, check=True)
+    return result.stdout.strip()
+
+
+# graph6 文字列の列を正準形の列に変換するジェネレータ（入力と同じ順序で出力）
+# Generator turning graph6 strings into canonical graph6 strings, preserving input order
+def canonical_lines(lines, use_labelg=True):
+    if not (use_labelg and LABELG):
+        for line in lines:
+            yield _python_canonical(line.strip())
+        return
+
+    proc = subprocess.Popen(
+        [LABELG, "-q"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True
+    )
+
+    # パイプの詰まりを避けるため、書き込みは別スレッドで行う
+    # （途中で読むのをやめられて labelg が止められたときは、書き込みもそこでやめる）
+    # Feed labelg from a separate thread so that neither pipe can fill up and deadlock
+    # (if the consumer stops early and labelg is killed, writing stops there too)
+    def feed():
+        try:
+            for line in lines:
+                proc.stdin.write(line.strip() + "\n")
+        except BrokenPipeError:
+            pass
+        finally:
+            try:
+                proc.stdin.close()
+            except BrokenPipeError:
+                pass
+
+    # 呼び出し側が途中でジェネレータを捨てても、labelg を止めてパイプを閉じ、子プロセスを回収する
+    # Even if the caller abandons the generator early, stop labelg, close the pipes and reap the child
+    writer = threading.Thread(target=feed, daemon=True)
+    writer.start()
+    finished = False
+    try:
+        for out_line in proc.stdout:
+            yield out_line.strip()
+        finished = True
+    finally:
+        if not finished:
+            proc.kill()
+        proc.stdout.close()
+        writer.join()
+        returncode = proc.wait()
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, [LABELG, "-q"])
+
+
+# 現在使用中の正準化方法の名前（異なる方法の正準形は混ぜてはいけない）
+# Name of the canonicaliser in use (forms from different canonicalisers must not be mixed)
+def canonicalizer_name(use_labelg=True):
+    return "labelg" if (use_labelg and LABELG) else "python"
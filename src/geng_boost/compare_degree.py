@@ -2,6 +2,11 @@
 
 import re  # 正規表現を使った文字列抽出に使用 / For extracting structured patterns using regular expressions
 import os  # ファイル操作と存在確認に使用 / For file access and path checking
+import argparse  # コマンドライン引数の解析 / For parsing command-line arguments
+
+# 次数分布パターンのファイルを置くディレクトリ（既定はこのスクリプトの隣の degree_list）
+# Directory holding the degree pattern files (defaults to degree_list next to this script)
+PATTERN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "degree_list")
 
 # 次数分布パターン文字列をパースする関数
 # Parse a degree pattern string (e.g., "[3,2] [4,3]") into a list of [degree, count] pairs
@@ -11,8 +16,8 @@ def parse_line(line):
 
 # 指定された n に対応するパターンファイルを読み込む
 # Load all degree patterns from file degree_list/n{n}.txt
-def load_patterns(n):
-    path = f"degree_list/n{n}.txt"  # ファイルパスを生成 / Generate file path
+def load_patterns(n, pattern_dir=PATTERN_DIR):
+    path = os.path.join(pattern_dir, f"n{n}.txt")  # ファイルパスを生成 / Generate file path
     if not os.path.exists(path):  # ファイルが存在するか確認 / Check if file exists
         print(f"File not found: {path}")
         return []
@@ -68,76 +73,97 @@ def predict_next(p, diffs):
 def is_exact_match(p1, p2):
     return all(a == b for a, b in zip(p1, p2))  # 全要素が順番も含め一致 / All elements match in order
 
-# ユーザーから範囲とモードを取得
-# Prompt user for n range and mode
-n_start = int(input("Enter start value of n: ").strip())
-n_end = int(input("Enter end value of n: ").strip())
-mode = input("Select mode: (a)ll, (e)ven only, (o)dd only: ").strip().lower()
-
-# モードに基づきステップを決定
-# Determine step based on mode
-if mode == 'a':
-    step = 1
-elif mode == 'e':
-    step = 2
-    if n_start % 2 != 0:
-        n_start += 1  # 偶数に調整 / Adjust to even
-elif mode == 'o':
-    step = 2
-    if n_start % 2 != 1:
-        n_start += 1  # 奇数に調整 / Adjust to odd
-else:
-    print("Error: Invalid mode. Use a, e, or o.")
-    exit(1)
-
-# 範囲が不正な場合は終了
-# Exit if range is invalid
-if n_end <= n_start:
-    print("Error: Invalid range. Start must be less than end.")
-    exit(1)
-
-# 対象の n 値をリストに格納
-# Generate list of n values to use
-n_values = list(range(n_start, n_end + 1, step))  # モードに応じた n のリスト / Generate n list with appropriate step
-
-# 各 n に対してパターンを読み込む
-# Load all pattern lists in range
-all_patterns = {}
-for n in n_values:
-    all_patterns[n] = load_patterns(n)  # 各 n に対応するパターンを辞書に格納 / Store patterns in dict
-
-print(f"\n--- Searching for full chains from n={n_values[0]} to n={n_values[-1]} (mode: {mode}) ---\n")
-
-# 最初の n を起点にしてチェインを探す
-# Start from first n in n_values
-for p1 in all_patterns[n_values[0]]:
-    for p2 in all_patterns[n_values[1]]:
-        if len(p1) != len(p2):
-            continue
-        diffs = extract_diff(p1, p2)
-        if not diffs:
-            continue  # 有効な差分がなければスキップ / Skip if no valid diff found
-        chain = [(n_values[0], p1), (n_values[1], p2)]  # チェイン初期化 / Initialize chain
-        current = p2
-        success = True
-        for i in range(2, len(n_values)):
-            next_n = n_values[i]
-            predicted = predict_next(current, diffs)  # 次のパターンを予測 / Predict next pattern
-            match_found = False
-            for candidate in all_patterns[next_n]:
-                if len(candidate) == len(predicted) and is_exact_match(candidate, predicted):
-                    chain.append((next_n, candidate))  # チェインに追加 / Append to chain
-                    current = candidate
-                    match_found = True
+# n の範囲とモード（a: すべて, e: 偶数のみ, o: 奇数のみ）から、連続して成長するチェインを探す関数
+# Find chains growing consistently over the n range for a mode (a: all, e: even only, o: odd only)
+# 戻り値は (n_values, chains)。chains は (marker, [(n, pattern), ...]) のリスト
+# Returns (n_values, chains), where chains is a list of (marker, [(n, pattern), ...])
+def find_chains(n_start, n_end, mode="a", pattern_dir=PATTERN_DIR):
+    # モードに基づきステップを決定
+    # Determine step based on mode
+    if mode == 'a':
+        step = 1
+    elif mode == 'e':
+        step = 2
+        if n_start % 2 != 0:
+            n_start += 1  # 偶数に調整 / Adjust to even
+    elif mode == 'o':
+        step = 2
+        if n_start % 2 != 1:
+            n_start += 1  # 奇数に調整 / Adjust to odd
+    else:
+        raise ValueError("Invalid mode. Use a, e, or o.")
+
+    # 範囲が不正な場合は終了
+    # Exit if range is invalid
+    if n_end <= n_start:
+        raise ValueError("Invalid range. Start must be less than end.")
+
+    # 対象の n 値をリストに格納
+    # Generate list of n values to use
+    n_values = list(range(n_start, n_end + 1, step))  # モードに応じた n のリスト / Generate n list with appropriate step
+
+    # 各 n に対してパターンを読み込む
+    # Load all pattern lists in range
+    all_patterns = {}
+    for n in n_values:
+        all_patterns[n] = load_patterns(n, pattern_dir)  # 各 n に対応するパターンを辞書に格納 / Store patterns in dict
+
+    # 最初の n を起点にしてチェインを探す
+    # Start from first n in n_values
+    chains = []
+    for p1 in all_patterns[n_values[0]]:
+        for p2 in all_patterns[n_values[1]]:
+            if len(p1) != len(p2):
+                continue
+            diffs = extract_diff(p1, p2)
+            if not diffs:
+                continue  # 有効な差分がなければスキップ / Skip if no valid diff found
+            chain = [(n_values[0], p1), (n_values[1], p2)]  # チェイン初期化 / Initialize chain
+            current = p2
+            success = True
+            for i in range(2, len(n_values)):
+                next_n = n_values[i]
+                predicted = predict_next(current, diffs)  # 次のパターンを予測 / Predict next pattern
+                match_found = False
+                for candidate in all_patterns[next_n]:
+                    if len(candidate) == len(predicted) and is_exact_match(candidate, predicted):
+                        chain.append((next_n, candidate))  # チェインに追加 / Append to chain
+                        current = candidate
+                        match_found = True
+                        break
+                if not match_found:
+                    success = False  # 一致するパターンがなければ中断 / Break if no match found
                     break
-            if not match_found:
-                success = False  # 一致するパターンがなければ中断 / Break if no match found
-                break
-        if success:
-            # countとdegreeの両成長がある場合は$、そうでなければ#で表示
-            # Use $ if both count and degree grow
-            marker = "$" if is_count_and_degree_growth(diffs) else "#"
-            print(f"{marker} Chains:")
-            for step_n, pat in chain:
-                print(f"n{step_n}: {format_pattern(pat)}")
-            print("---")
+            if success:
+                # countとdegreeの両成長がある場合は$、そうでなければ#で表示
+                # Use $ if both count and degree grow
+                marker = "$" if is_count_and_degree_growth(diffs) else "#"
+                chains.append((marker, chain))
+    return n_values, chains
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search degree_list/n{n}.txt for consistently growing chains.")
+    parser.add_argument("n_start", type=int, help="start value of n")
+    parser.add_argument("n_end", type=int, help="end value of n")
+    parser.add_argument("--mode", choices=["a", "e", "o"], default="a",
+                        help="(a)ll, (e)ven only or (o)dd only (default: a)")
+    parser.add_argument("--pattern-dir", default=PATTERN_DIR, help="directory with n{n}.txt pattern files")
+    args = parser.parse_args()
+
+    try:
+        n_values, chains = find_chains(args.n_start, args.n_end, args.mode, args.pattern_dir)
+    except ValueError as e:
+        print(f"Error: {e}")
+        exit(1)
+
+    print(f"\n--- Searching for full chains from n={n_values[0]} to n={n_values[-1]} (mode: {args.mode}) ---\n")
+    for marker, chain in chains:
+        print(f"{marker} Chains:")
+        for step_n, pat in chain:
+            print(f"n{step_n}: {format_pattern(pat)}")
+        print("---")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+
+import os       # ファイルの存在確認 / For checking file existence
+import lzma     # .xz 圧縮ファイルの読み書き / For reading .xz compressed files
+
+# 座標サイドカー：graph6 ファイル X.g6.xz と同じ行順で、各行に "x0 y0 x1 y1 ..." を持つ X.xy.xz
+# Coordinate sidecar: X.xy.xz holds "x0 y0 x1 y1 ..." per line, aligned with the lines of X.g6.xz
+
+
+# graph6 ファイルのパスから対応するサイドカーのパスを求める関数（kind で種類を変える：xy は座標）
+# Return the sidecar path belonging to a graph6 file path (kind selects the sidecar; xy is coordinates)
+def sidecar_path(g6_path, kind="xy"):
+    return g6_path[:-len(".g6.xz")] + f".{kind}.xz"
+
+
+# "x0 y0 x1 y1 ..." 形式の行を {頂点: (x, y)} に変換する関数
+# Parse a "x0 y0 x1 y1 ..." line into {vertex: (x, y)}
+def parse_coords(line):
+    values = [float(v) for v in line.split()]
+    return {v: (values[2 * v], values[2 * v + 1]) for v in range(len(values) // 2)}
+
+
+# 格子座標を [-1, 1] の範囲に中心化・正規化する関数（planar_layout と同じ縮尺にそろえる）
+# Centre and scale grid coordinates into [-1, 1] (the same scale as nx.planar_layout)
+def normalize(pos):
+    xs = [p[0] for p in pos.values()]
+    ys = [p[1] for p in pos.values()]
+    cx = (max(xs) + min(xs)) / 2
+    cy = (max(ys) + min(ys)) / 2
+    scale = max(max(xs) - min(xs), max(ys) - min(ys)) / 2 or 1
+    return {v: ((x - cx) / scale, (y - cy) / scale) for v, (x, y) in pos.items()}
+
+
+# サイドカーがあれば座標を 1 行ずつ返し、なければ None を返し続けるジェネレータ
+# Yield coordinates line by line from the sidecar, or None forever if there is no sidecar
+def read_coords(g6_path):
+    path = sidecar_path(g6_path)
+    if not os.path.exists(path):
+        while True:
+            yield None
+    with lzma.open(path, "rt") as f:
+        for line in f:
+            yield normalize(parse_coords(line))
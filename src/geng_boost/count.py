@@ -1,47 +1,54 @@
 #!/usr/bin/env python3
 
-import os       # ファイル操作 / For file handling
-import lzma     # .xz 圧縮ファイルの読み書き / For reading .xz compressed files
-
-# 入力ディレクトリ名と、頂点数 n をユーザー入力から受け取る
-# Prompt the user for the input directory name and the number of vertices
-input_dir = input("Enter input directory name (e.g., d3c): ").strip()
-n = int(input("Enter the number of vertices (e.g., 11): ").strip())
-
-# 単一ファイルとチャンクディレクトリのパスを構築
-# Construct paths for single file and chunk directory
-single_file_path = os.path.join(input_dir, f"n{n}.g6.xz")
-chunk_dir_path = os.path.join(input_dir, f"n{n}")
-
-total_lines = 0  # 全体の行数 / Total line count
-
-# 単一ファイルが存在する場合はそれを読み込んでカウント
-# If a single .g6.xz file exists, count its lines
-if os.path.exists(single_file_path):
-    print(f"Counting lines in: {single_file_path}")
-    with lzma.open(single_file_path, "rt") as f:
-        for _ in f:
-            total_lines += 1
-
-# チャンクされたファイル群が存在する場合はそれぞれ読み込んで合計
-# If a directory of chunked files exists, count all their lines
-elif os.path.isdir(chunk_dir_path):
-    print(f"Counting lines in chunked files under: {chunk_dir_path}")
-    for fname in sorted(os.listdir(chunk_dir_path)):
-        if not fname.endswith(".g6.xz"):
+import lzma         # .xz 圧縮ファイルの読み書き / For reading .xz compressed files
+import argparse     # コマンドライン引数の解析 / For parsing command-line arguments
+from store import require_input_files, read_graph6, parse_edge_selector  # 入力ファイルの列挙 / For listing input files
+
+
+# ストア input_dir の n 頂点グラフの個数（行数）を数える関数
+# （edges を指定すると、その辺数のグラフだけを数える。辺数で分けたストアなら該当するサブストアだけを読む）
+# Count the graphs (lines) on n vertices in input_dir
+# (with edges, only graphs with those edge counts; a store split by edge count reads only those sub-stores)
+def count_graphs(input_dir, n, edges=None):
+    total_lines = 0  # 全体の行数 / Total line count
+
+    # 単一ファイルまたはチャンクファイル群をそれぞれ読み込んで合計
+    # Count the lines of the single file or of every chunk file
+    for path in require_input_files(input_dir, n, edges):
+        print(f"  -> {path}")
+        if edges is not None:
+            total_lines += sum(1 for _ in read_graph6(path, edges))
             continue
-        chunk_path = os.path.join(chunk_dir_path, fname)
-        print(f"  -> {chunk_path}")
-        with lzma.open(chunk_path, "rt") as f:
+        with lzma.open(path, "rt") as f:
             for _ in f:
                 total_lines += 1
+    return total_lines
 
-# 入力が見つからない場合のエラー表示
-# Show an error if no valid input found
-else:
-    print("Error: No .g6.xz file or chunk directory found.")
-    exit(1)
 
-# 結果の出力
-# Print the total number of lines
-print(f"\nTotal number of graphs (lines): {total_lines}")
+def main():
+    parser = argparse.ArgumentParser(description="Count the graphs in a store.")
+    parser.add_argument("input_dir", help="input directory name (e.g., d3c)")
+    parser.add_argument("n", type=int, help="number of vertices (e.g., 11)")
+    parser.add_argument("--edges", help="only graphs with these edge counts, e.g. 30, 30:33 or 30,32:34")
+    args = parser.parse_args()
+
+    try:
+        edges = parse_edge_selector(args.edges) if args.edges else None
+    except ValueError as e:
+        parser.error(str(e))
+
+    try:
+        total_lines = count_graphs(args.input_dir, args.n, edges)
+    except FileNotFoundError as e:
+        # 入力が見つからない場合のエラー表示
+        # Show an error if no valid input found
+        print(f"Error: {e}")
+        exit(1)
+
+    # 結果の出力
+    # Print the total number of lines
+    print(f"\nTotal number of graphs (lines): {total_lines}")
+
+
+if __name__ == "__main__":
+    main()
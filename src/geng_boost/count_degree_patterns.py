@@ -1,71 +1,92 @@
 #!/usr/bin/env python3
 
-import os                   # ファイル操作 / For file and directory handling
 import lzma                 # .xz 圧縮ファイルの読み書き / For reading and writing .xz compressed files
+import argparse             # コマンドライン引数の解析 / For parsing command-line arguments
 import networkx as nx       # グラフ構造操作ライブラリ / For graph operations with NetworkX
 from collections import Counter, defaultdict
+from instrument import get_tracer, NullTracer  # 任意の計測フック / Opt-in instrumentation hooks
+from store import require_input_files  # 入力ファイルの列挙 / For listing input files
 
-# 入力ディレクトリ名と、頂点数 n をユーザー入力から受け取る
-# Prompt the user for the input directory name and the number of vertices
-input_dir = input("Enter input directory name (e.g., d3cpt): ").strip()
-n = int(input("Enter the number of vertices (e.g., 11): ").strip())
 
-# 単一の .g6.xz ファイルのパス（ファイルが分割されていない場合）
-# Path for the single .g6.xz file if not split
-single_input_path = os.path.join(input_dir, f"n{n}.g6.xz")
-chunk_input_dir = os.path.join(input_dir, f"n{n}")
+# 次数分布パターン（(次数, 個数) の組のタプル）を "[a,b] [c,d]" の形式に整形する関数
+# Format a degree pattern (tuple of (degree, count)) as "[a,b] [c,d]"
+def format_pattern(pattern):
+    return " ".join(f"[{deg},{cnt}]" for deg, cnt in pattern)
 
-# 出現する次数分布のカウント辞書
-# Dictionary to count how often each degree pattern appears
-degree_pattern_counter = defaultdict(int)
 
 # 指定されたファイルを処理して次数分布を集計する関数
 # Function to process a file and count degree patterns
-def count_degree_patterns(input_path):
-    with lzma.open(input_path, "rt") as f_in:
-        for line in f_in:
+def count_file(input_path, degree_pattern_counter, tracer=None):
+    tracer = tracer or NullTracer()
+    with lzma.open(tracer.open_input(input_path), "rt") as f_in:
+        for line in tracer.timed_iter(f_in, "decompress"):
             line = line.strip()
             if not line or line.startswith("#"):
                 continue
-            G = nx.from_graph6_bytes(line.encode())
-            degree_seq = [d for _, d in G.degree()]
-            deg_count = sorted(Counter(degree_seq).items())  # [(deg, count), ...]
-            key = tuple(deg_count)
-            degree_pattern_counter[key] += 1
-
-# 単一ファイルが存在すれば、それを処理
-# If the single file exists, process it
-if os.path.exists(single_input_path):
-    print(f"Processing: {single_input_path}")
-    count_degree_patterns(single_input_path)
-
-# それ以外の場合、チャンクされたファイル群が存在するか確認し、すべて処理する
-# Otherwise, if chunked files exist, process each one
-elif os.path.isdir(chunk_input_dir):
-    for fname in sorted(os.listdir(chunk_input_dir)):
-        if not fname.endswith(".g6.xz"):
-            continue
-        input_path = os.path.join(chunk_input_dir, fname)
-        print(f"Processing chunk: {input_path}")
-        count_degree_patterns(input_path)
-
-# 入力ファイルもチャンクも存在しない場合はエラー
-# If neither a file nor a chunk directory exists, show an error
-else:
-    print("Error: No valid input file or chunk directory found.")
-    exit(1)
-
-# 結果の出力
-# Output the frequency of each degree pattern
-print("\nAll degree patterns and their frequencies:")
-for pattern, count in sorted(degree_pattern_counter.items(), key=lambda x: (-x[1], x[0])):
-    formatted = " ".join(f"[{deg},{cnt}]" for deg, cnt in pattern)
-    print(f"{formatted} : {count}")
-
-# 一意のものだけを出力
-# Output only the degree patterns that appear exactly once
-print("\nDegree patterns that appear exactly once:")
-for pattern, count in sorted(degree_pattern_counter.items()):
-    if count == 1:
-        formatted = " ".join(f"[{deg},{cnt}]" for deg, cnt in pattern)
-        print(f"{formatted}")
+            with tracer.phase("decode"):
+                G = nx.from_graph6_bytes(line.encode())
+            with tracer.phase("filter"):
+                degree_seq = [d for _, d in G.degree()]
+                deg_count = sorted(Counter(degree_seq).items())  # [(deg, count), ...]
+                key = tuple(deg_count)
+                degree_pattern_counter[key] += 1
+            tracer.tick()
+
+
+# ストア input_dir の n 頂点グラフの次数分布を集計して {パターン: 個数} を返す関数
+# Count the degree patterns of the graphs on n vertices in input_dir as {pattern: count}
+def count_degree_patterns(input_dir, n, trace=None):
+    paths = require_input_files(input_dir, n)
+
+    # 出現する次数分布のカウント辞書
+    # Dictionary to count how often each degree pattern appears
+    degree_pattern_counter = defaultdict(int)
+
+    # 計測フック（--trace または環境変数 PIPELINE_TRACE が設定されたときだけ記録する）
+    # Instrumentation hooks (records only when --trace or PIPELINE_TRACE is set)
+    tracer = get_tracer("count_degree_patterns", trace)
+    tracer.begin(paths)
+    for input_path in paths:
+        print(f"Processing: {input_path}")
+        count_file(input_path, degree_pattern_counter, tracer)
+    tracer.count("patterns", len(degree_pattern_counter))
+    tracer.close()
+    return dict(degree_pattern_counter)
+
+
+# 集計結果を出力する関数
+# Print the frequencies of the degree patterns
+def print_report(degree_pattern_counter):
+    # 結果の出力
+    # Output the frequency of each degree pattern
+    print("\nAll degree patterns and their frequencies:")
+    for pattern, count in sorted(degree_pattern_counter.items(), key=lambda x: (-x[1], x[0])):
+        print(f"{format_pattern(pattern)} : {count}")
+
+    # 一意のものだけを出力
+    # Output only the degree patterns that appear exactly once
+    print("\nDegree patterns that appear exactly once:")
+    for pattern, count in sorted(degree_pattern_counter.items()):
+        if count == 1:
+            print(f"{format_pattern(pattern)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count how often each degree pattern appears.")
+    parser.add_argument("input_dir", help="input directory name (e.g., d3cpt)")
+    parser.add_argument("n", type=int, help="number of vertices (e.g., 11)")
+    parser.add_argument("--trace", help="write a JSON-lines instrumentation trace to this file")
+    args = parser.parse_args()
+
+    try:
+        degree_pattern_counter = count_degree_patterns(args.input_dir, args.n, args.trace)
+    except FileNotFoundError as e:
+        # 入力ファイルもチャンクも存在しない場合はエラー
+        # If neither a file nor a chunk directory exists, show an error
+        print(f"Error: {e}")
+        exit(1)
+    print_report(degree_pattern_counter)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,96 +1,153 @@
 #!/usr/bin/env python3
 
 import os                   # ファイル操作 / For file and directory handling
-import lzma                 # .xz 圧縮ファイルの読み書き / For reading and writing .xz compressed files
+import ast                  # 式の安全な評価 / For safely evaluating expressions
+import operator             # 許可する演算子 / For the permitted operators
+import argparse             # コマンドライン引数の解析 / For parsing command-line arguments
 import networkx as nx       # グラフ構造操作ライブラリ / For graph operations with NetworkX
-
-# 頂点数式を安全に評価する関数（例: "n-2" を数値に変換）
-# Safely evaluate expressions like "n-2" to an integer based on current n
+from coords import sidecar_path  # 座標サイドカーのパス / Path of the coordinate sidecar
+from instrument import get_tracer  # 任意の計測フック / Opt-in instrumentation hooks
+from pipeline import run_pipeline, phase  # 展開・判定・圧縮を重ねる実行基盤 / Overlapped decompress/filter/compress runtime
+from store import stage_files, parse_edge_selector  # 入出力ファイルの対応付け / For pairing input and output files
+
+# 式で使える演算子（整数の四則演算のみ）
+# Operators allowed in expressions (integer arithmetic only)
+_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.FloorDiv: operator.floordiv,
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+
+
+# 頂点数式を安全に評価する関数（例: "n-2" を数値に変換）。n と整数と + - * // だけを許可する
+# （書式の誤りや 0 での除算も ValueError にする）
+# Safely evaluate expressions like "n-2" to an integer; only n, integers and + - * // are allowed
+# (syntax errors and division by zero are reported as ValueError too)
 def eval_expr(expr, n):
-    return eval(expr, {"n": n})
-
-# 入力ディレクトリ名と、頂点数 n をユーザー入力から受け取る
-# Prompt the user for the input directory name and the number of vertices
-input_dir = input("Enter input directory name (e.g., d3cpt): ").strip()
-n = int(input("Enter the number of vertices (e.g., 11): ").strip())
-
-# 出力ディレクトリは、入力ディレクトリ名に 'd' を付けた名前（例: d3cptd）
-# The output directory is named by appending 'd' to the input directory (e.g., d3cptd)
-output_dir = input_dir + "d"
-
-# 単一の .g6.xz ファイルのパス（ファイルが分割されていない場合）
-# Path for the single .g6.xz file if not split
-single_input_path = os.path.join(input_dir, f"n{n}.g6.xz")
-single_output_path = os.path.join(output_dir, f"n{n}.g6.xz")
-
-# 分割されたファイルが格納されたディレクトリ（大規模な入力時）
-# Directory containing split chunk files (used when the input is large)
-chunk_input_dir = os.path.join(input_dir, f"n{n}")
-chunk_output_dir = os.path.join(output_dir, f"n{n}")
-
-# 出力ディレクトリが存在しなければ作成する
-# Create the output directory if it doesn't exist
-os.makedirs(output_dir, exist_ok=True)
-
-# ユーザーから次数条件を受け取る
-# Prompt the user to input degree constraints
-num_constraints = int(input("How many degree constraints would you like to apply? ").strip())
-degree_conditions = []
-
-for i in range(num_constraints):
-    deg_expr = input(f"  Constraint {i+1} - Enter degree (e.g., '3' or 'n-2'): ").strip()
-    count_expr = input(f"  Constraint {i+1} - Number of vertices with this degree (e.g., '2' or 'n-3'): ").strip()
-    deg = eval_expr(deg_expr, n)
-    count = eval_expr(count_expr, n)
-    degree_conditions.append((deg, count))
-
-# 指定されたグラフファイルを処理して、条件を満たすものだけ出力
-# Process each graph and write only those that match the degree conditions
-def process_file(input_path, output_path, n, degree_conditions):
-    with lzma.open(input_path, "rt") as f_in, lzma.open(output_path, "wt") as f_out:
-        count = 0  # 条件を満たすグラフの個数をカウント / Counter for matching graphs
-        
-        # 入力ファイルを 1 行ずつ読み取りながら処理
-        # Process each line (graph) from the input file
-        for line in f_in:
-            line = line.strip()
-            if not line or line.startswith("#"):
+    def evaluate(node):
+        if isinstance(node, ast.Expression):
+            return evaluate(node.body)
+        if isinstance(node, ast.Constant) and isinstance(node.value, int):
+            return node.value
+        if isinstance(node, ast.Name) and node.id == "n":
+            return n
+        if isinstance(node, ast.BinOp) and type(node.op) in _OPERATORS:
+            return _OPERATORS[type(node.op)](evaluate(node.left), evaluate(node.right))
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _OPERATORS:
+            return _OPERATORS[type(node.op)](evaluate(node.operand))
+        raise ValueError(f"Unsupported expression: {expr!r}")
+    try:
+        return evaluate(ast.parse(expr, mode="eval"))
+    except SyntaxError:
+        raise ValueError(f"Invalid expression: {expr!r}") from None
+    except ZeroDivisionError:
+        raise ValueError(f"Division by zero in expression: {expr!r}") from None
+
+
+# "次数:個数" 形式の条件（例: "n-2:2"）を (次数, 個数) の組に変換する関数
+# Parse "degree:count" constraints (e.g., "n-2:2") into (degree, count) pairs
+def parse_constraints(specs, n):
+    degree_conditions = []
+    for spec in specs:
+        parts = spec.split(":")
+        if len(parts) != 2:
+            raise ValueError(f"Invalid constraint {spec!r}: expected DEGREE:COUNT (e.g., n-2:2)")
+        deg_expr, count_expr = parts
+        degree_conditions.append((eval_expr(deg_expr, n), eval_expr(count_expr, n)))
+    return degree_conditions
+
+
+# グラフが次数条件をすべて満たすかを判定する関数
+# Check if the graph satisfies all specified degree constraints
+def matches_degree_conditions(G, degree_conditions):
+    degrees = [d for _, d in G.degree()]
+    return all(degrees.count(deg) == cnt for deg, cnt in degree_conditions)
+
+
+# 指定されたグラフファイルを処理して、条件を満たすものだけ出力（edges を指定するとその辺数のものだけ）
+# （展開・判定・圧縮は pipeline.py のスレッドで重ねて実行する）
+# Process each graph and write only those that match the degree conditions (and an edge count in edges, if given)
+# (decompression, testing and compression overlap on the threads of pipeline.py)
+def process_file(input_path, output_path, n, degree_conditions, tracer=None, workers=1, edges=None):
+    # graph6 行（bytes）のまとまりから次数条件を満たすものだけを残す（座標サイドカーの行も一緒に運ぶ）
+    # （NetworkX への変換は decode の時間として記録する）
+    # Keep the graphs of a batch of graph6 lines (bytes) matching the conditions, with their sidecar lines
+    # (NetworkX decoding is recorded as decode time)
+    def keep_matching(batch):
+        kept = []
+        for line, xy in batch:
+            with phase("decode"):
+                G = nx.from_graph6_bytes(line)
+            if edges is not None and G.number_of_edges() not in edges:
                 continue
-
-            # graph6 文字列を NetworkX グラフに変換
-            # Convert the graph6 string to a NetworkX graph
-            G = nx.from_graph6_bytes(line.encode())
-
-            # 指定された次数条件をすべて満たすか確認
-            # Check if the graph satisfies all specified degree constraints
-            degrees = [d for _, d in G.degree()]
-            if all(degrees.count(deg) == cnt for deg, cnt in degree_conditions):
-                f_out.write(line + '\n')
-                count += 1
-
-        # 結果を表示
-        # Print result summary
-        print(f"  -> {count} graphs matching degree constraints saved to {output_path}")
-
-# 単一ファイルが存在すれば、それを処理
-# If the single file exists, process it
-if os.path.exists(single_input_path):
-    print(f"Processing: {single_input_path}")
-    process_file(single_input_path, single_output_path, n, degree_conditions)
-
-# それ以外の場合、チャンクされたファイル群が存在するか確認し、すべて処理する
-# Otherwise, if chunked files exist, process each one
-elif os.path.isdir(chunk_input_dir):
-    os.makedirs(chunk_output_dir, exist_ok=True)
-    for fname in sorted(os.listdir(chunk_input_dir)):
-        if not fname.endswith(".g6.xz"):
-            continue
-        input_path = os.path.join(chunk_input_dir, fname)
-        output_path = os.path.join(chunk_output_dir, fname)
-        print(f"Processing chunk: {input_path}")
-        process_file(input_path, output_path, n, degree_conditions)
-
-# 入力ファイルもチャンクも存在しない場合はエラー
-# If neither a file nor a chunk directory exists, show an error
-else:
-    print("Error: No valid input file or chunk directory found.")
+            if matches_degree_conditions(G, degree_conditions):
+                kept.append((line, xy))
+        return kept
+
+    # 入力に座標サイドカーがあれば、残したグラフの座標も引き継ぐ
+    # If the input has a coordinate sidecar, carry the coordinates of kept graphs over
+    has_xy = os.path.exists(sidecar_path(input_path))
+    count = run_pipeline(input_path, output_path, keep_matching, has_xy, has_xy, workers, tracer=tracer)
+
+    # 結果を表示
+    # Print result summary
+    print(f"  -> {count} graphs matching degree constraints saved to {output_path}")
+    return count
+
+
+# ストア input_dir の n 頂点グラフから次数条件を満たすものを抽出する関数（出力は既定で input_dir + 'd'）
+# （edges を指定すると、辺数で分けたストアでは該当するサブストアだけを読み、出力も同じ配置にする）
+# Keep the graphs on n vertices of input_dir matching the degree conditions (output defaults to input_dir + 'd')
+# (with edges, a store split by edge count reads only the matching sub-stores, and the output keeps that layout)
+def degree_filter(input_dir, n, degree_conditions, output_dir=None, trace=None, workers=1, edges=None):
+    # 出力ディレクトリは、入力ディレクトリ名に 'd' を付けた名前（例: d3cptd）
+    # The output directory is named by appending 'd' to the input directory (e.g., d3cptd)
+    output_dir = output_dir or input_dir + "d"
+    pairs = stage_files(input_dir, output_dir, n, edges)
+
+    # 計測フック（--trace または環境変数 PIPELINE_TRACE が設定されたときだけ記録する）
+    # Instrumentation hooks (records only when --trace or PIPELINE_TRACE is set)
+    tracer = get_tracer("degree", trace)
+    tracer.begin([input_path for input_path, _ in pairs])
+
+    total = 0
+    for input_path, output_path in pairs:
+        print(f"Processing: {input_path}")
+        total += process_file(input_path, output_path, n, degree_conditions, tracer, workers, edges)
+    tracer.close()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep only graphs with the given numbers of vertices per degree.")
+    parser.add_argument("input_dir", help="input directory name (e.g., d3cpt)")
+    parser.add_argument("n", type=int, help="number of vertices (e.g., 11)")
+    parser.add_argument("-c", "--constraint", action="append", default=[], metavar="DEG:COUNT",
+                        help="degree constraint, e.g. -c n-2:2 -c 3:n-3 (repeatable)")
+    parser.add_argument("--output-dir", help="output directory (default: input_dir + 'd')")
+    parser.add_argument("--trace", help="write a JSON-lines instrumentation trace to this file")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="filter threads per file, overlapped with xz decompression and compression (default: 1)")
+    parser.add_argument("--edges", help="only graphs with these edge counts, e.g. 30, 30:33 or 30,32:34")
+    args = parser.parse_args()
+
+    try:
+        degree_conditions = parse_constraints(args.constraint, args.n)
+        edges = parse_edge_selector(args.edges) if args.edges else None
+    except ValueError as e:
+        parser.error(str(e))
+
+    try:
+        degree_filter(args.input_dir, args.n, degree_conditions, args.output_dir, args.trace, args.workers, edges)
+    except FileNotFoundError as e:
+        # 入力ファイルもチャンクも存在しない場合はエラー
+        # If neither a file nor a chunk directory exists, show an error
+        print(f"Error: {e}")
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+
+import os                   # ファイル・ディレクトリ操作 / For file and directory handling
+import re                   # ディレクトリ名の解析 / For parsing directory names
+import lzma                 # .xz 圧縮ファイルの読み書き / For reading and writing .xz compressed files
+import shlex                # オプション文字列の分割 / For splitting option strings
+import argparse             # コマンドライン引数の解析 / For parsing command-line arguments
+import networkx as nx       # グラフ構造操作ライブラリ / For graph operations with NetworkX
+from multiprocessing import Pool  # 並列処理 / For parallel processing
+from coords import sidecar_path  # 座標サイドカーのパス / Path of the coordinate sidecar
+from geng import generate, option_dir_name, parse_edge_range  # geng の実行と出力ディレクトリ名 / For running geng and naming its output
+from store import input_files, stage_files, read_store  # ストアの読み書き / For reading and writing stores
+from triconnected import is_triconnected  # 3-連結判定 / 3-connectivity test
+
+# 導出プランナー：geng の出力ディレクトリ名（geng.py の option_dir_name）とステージの接尾辞
+# （planar.py の p、triconnected.py の t）から各ストアが保証する性質を読み取り、求める族を含む
+# （上位集合の）ストアが既にあれば、足りない条件だけを絞り込みとしてそのストアに適用して族を作る。
+# 該当するストアがなければ geng を実行する。分かる性質と包含関係：
+#   c 連結 ⊇ xc 2-連結 ⊇ ステージ t（3-連結）、t 三角形なし ⊇ b 二部グラフ、f 4-閉路なし、
+#   k K4 なし ⊇ t, b、d{k} 最小次数、xd{k} 最大次数、e{a}-{b} 辺数範囲、ステージ p 平面
+# それ以外の geng オプションは、同じオプションを持つストアからしか導出しない。
+# Derivation planner: reads the properties guaranteed by each store from its geng directory name
+# (option_dir_name of geng.py) and stage suffixes (p from planar.py, t from triconnected.py). When a
+# store containing the requested family (a superset) already exists, the family is derived by streaming
+# only the missing conditions as filters over that store; otherwise geng is run. Known properties and
+# inclusions:
+#   c connected ⊇ xc biconnected ⊇ stage t (3-connected), t triangle-free ⊇ b bipartite, f 4-cycle-free,
+#   k K4-free ⊇ t, b, d{k} min degree, xd{k} max degree, e{a}-{b} edge range, stage p planar
+# Any other geng option is only derived from stores having the same option.
+#   例 / e.g.  python derive.py 10 --options="-c -d3 -t" --stages pt      (→ from d3cpt if present)
+
+# 意味の分かる geng のフラグ / geng flags whose meaning is known
+KNOWN_FLAGS = {"c", "xc", "t", "f", "k", "b"}
+
+# 性質 → それを含意する性質 / Property → the properties implying it
+IMPLIED_BY = {
+    "connected": {"biconnected", "triconnected"},
+    "biconnected": {"triconnected"},
+    "triangle_free": {"bipartite"},
+    "k4_free": {"triangle_free", "bipartite"},
+}
+
+
+# オプションの要素（例: "d3", "xd9", "xc"）に分ける / Split into option tokens (e.g., "d3", "xd9", "xc")
+def _tokens(text):
+    tokens = re.findall(r"x?[a-z]\d*", text)
+    return tokens if "".join(tokens) == text else None
+
+
+class Family:
+    """
+    ストアが保証する性質（geng のフラグ・次数と辺数の範囲・ステージ）
+    The properties guaranteed by a store (geng flags, degree and edge bounds, stages).
+    """
+    def __init__(self, tokens, edge_range=None, stages=""):
+        self.flags = set()
+        self.min_deg = 0
+        self.max_deg = None
+        for token in tokens:
+            if re.fullmatch(r"d\d+", token):
+                self.min_deg = int(token[1:])
+            elif re.fullmatch(r"xd\d+", token):
+                self.max_deg = int(token[2:])
+            else:
+                self.flags.add(token)
+        self.edge_range = edge_range
+        self.stages = stages
+
+    # geng のオプション（例: ["-c", "-d3"]）から作る / Build from geng options (e.g., ["-c", "-d3"])
+    @classmethod
+    def from_options(cls, geng_options, edge_range=None, stages=""):
+        tokens = _tokens(option_dir_name(geng_options))
+        if tokens is None:
+            raise ValueError(f"Unsupported geng options: {' '.join(geng_options)}")
+        return cls(tokens, edge_range, stages)
+
+    # ディレクトリ名（例: "d3cpt", "d3ce23-27"）から作る（解釈できなければ None）
+    # Build from a directory name (e.g., "d3cpt", "d3ce23-27"), or None if it cannot be interpreted
+    @classmethod
+    def from_dir_name(cls, name):
+        match = re.fullmatch(r"(.*?)e(\d+)-(\d+)([a-z]*)", name)
+        if match:
+            tokens, stages = _tokens(match.group(1)), match.group(4)
+            if tokens is None or tokens != sorted(tokens, reverse=True) or not _is_stage_suffix(stages):
+                return None
+            return cls(tokens, (int(match.group(2)), int(match.group(3))), stages)
+
+        # geng 部分は降順に並ぶので、降順が崩れたところからがステージの接尾辞
+        # The geng part is sorted in reverse, so the stage suffixes start where that order breaks
+        tokens = _tokens(name)
+        if tokens is None:
+            return None
+        for cut in range(len(tokens), -1, -1):
+            head, tail = tokens[:cut], "".join(tokens[cut:])
+            if head == sorted(head, reverse=True) and _is_stage_suffix(tail):
+                return cls(head, None, tail)
+        return None
+
+    # n 頂点での実効的な性質（含意を反映）/ Effective properties on n vertices (with inclusions applied)
+    def properties(self, n):
+        tri = "t" in self.stages
+        planar = "p" in self.stages
+        lo, hi = self.edge_range or (0, n * (n - 1) // 2)
+        if planar and n >= 3:
+            hi = min(hi, 3 * n - 6)
+        return {
+            "connected": bool(self.flags & {"c", "xc"}) or tri,
+            "biconnected": "xc" in self.flags or tri,
+            "triconnected": tri,
+            "planar": planar,
+            "triangle_free": bool(self.flags & {"t", "b"}),
+            "c4_free": "f" in self.flags,
+            "k4_free": bool(self.flags & {"k", "t", "b"}),
+            "bipartite": "b" in self.flags,
+            "min_deg": max(self.min_deg, 3 if tri and n >= 4 else 0),
+            "max_deg": n - 1 if self.max_deg is None else min(self.max_deg, n - 1),
+            "edges": (lo, hi),
+            "other": self.flags - KNOWN_FLAGS,
+        }
+
+
+# ステージの接尾辞（planar.py の p、triconnected.py の t がこの順に付く）かを判定する関数
+# Check for a stage suffix (p from planar.py and t from triconnected.py, appended in this order)
+def _is_stage_suffix(text):
+    return text in ("", "p", "t", "pt")
+
+
+# source の保証が target の条件の一部になっているか（source ⊇ target）を判定し、
+# 導出できれば target を得るために足りない条件（絞り込み）のリストを、できなければ None を返す関数
+# Check whether source is a superset of target (every guarantee of source follows from target) and
+# return the missing conditions (filters) needed to obtain target, or None if it cannot be derived
+def missing_conditions(source, target, n):
+    s, t = source.properties(n), target.properties(n)
+    if s["other"] != t["other"]:
+        return None
+    filters = []
+    for prop in ("connected", "biconnected", "triconnected", "planar",
+                 "triangle_free", "c4_free", "k4_free", "bipartite"):
+        if s[prop] and not t[prop]:
+            return None
+        if t[prop] and not s[prop]:
+            filters.append((prop, None))
+    if s["min_deg"] > t["min_deg"] or s["max_deg"] < t["max_deg"]:
+        return None
+    if t["min_deg"] > s["min_deg"]:
+        filters.append(("min_deg", t["min_deg"]))
+    if t["max_deg"] < s["max_deg"]:
+        filters.append(("max_deg", t["max_deg"]))
+    (slo, shi), (tlo, thi) = s["edges"], t["edges"]
+    if slo > tlo or shi < thi:
+        return None
+    if (tlo, thi) != (slo, shi):
+        filters.append(("edges", (tlo, thi)))
+
+    # 他の絞り込みから従う条件は判定しない / Skip conditions implied by other filters
+    props = {prop for prop, _ in filters}
+    filters = [f for f in filters if not props & IMPLIED_BY.get(f[0], set())]
+    return sorted(filters, key=lambda f: list(PREDICATES).index(f[0]))
+
+
+# 4-閉路がない ⇔ どの 2 頂点も共通の近傍を高々 1 つしか持たない
+# No 4-cycle ⇔ every two vertices have at most one common neighbour
+def _is_c4_free(G):
+    nodes = list(G)
+    return all(len(set(G[u]) & set(G[v])) <= 1 for i, u in enumerate(nodes) for v in nodes[i + 1:])
+
+
+# K4 がない ⇔ どの辺の両端の共通近傍にも辺がない
+# No K4 ⇔ the common neighbourhood of every edge spans no edge
+def _is_k4_free(G):
+    for u, v in G.edges():
+        common = set(G[u]) & set(G[v])
+        if any(w in common for x in common for w in G[x]):
+            return False
+    return True
+
+
+# 絞り込みの判定関数（安いものから順に適用する）/ Predicates of the filters (applied cheapest first)
+PREDICATES = {
+    "edges": lambda G, r: r[0] <= G.number_of_edges() <= r[1],
+    "min_deg": lambda G, k: min(d for _, d in G.degree()) >= k,
+    "max_deg": lambda G, k: max(d for _, d in G.degree()) <= k,
+    "connected": lambda G, _: nx.is_connected(G),
+    "biconnected": lambda G, _: nx.is_biconnected(G),
+    "bipartite": lambda G, _: nx.is_bipartite(G),
+    "triangle_free": lambda G, _: sum(nx.triangles(G).values()) == 0,
+    "c4_free": lambda G, _: _is_c4_free(G),
+    "k4_free": lambda G, _: _is_k4_free(G),
+    "planar": lambda G, _: nx.check_planarity(G)[0],
+    "triconnected": lambda G, _: is_triconnected(G),
+}
+
+
+# 1 つのファイルに絞り込みを適用する関数（座標サイドカーがあれば引き継ぐ。残した個数を返す）
+# Apply the filters to one file (carrying the coordinate sidecar over if present; returns the kept count)
+def filter_file(args):
+    input_path, output_path, filters = args
+    count = 0
+    with lzma.open(input_path, "rt") as f_in, lzma.open(output_path, "wt") as f_out:
+        has_xy = os.path.exists(sidecar_path(input_path))
+        xy_in = lzma.open(sidecar_path(input_path), "rt") if has_xy else None
+        xy_out = lzma.open(sidecar_path(output_path), "wt") if has_xy else None
+        for line in f_in:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            xy = xy_in.readline() if has_xy else None
+            G = nx.from_graph6_bytes(line.encode())
+            if all(PREDICATES[prop](G, value) for prop, value in filters):
+                f_out.write(line + "\n")
+                if has_xy:
+                    xy_out.write(xy)
+                count += 1
+        if has_xy:
+            xy_in.close()
+            xy_out.close()
+    return count
+
+
+# ストアのファイルサイズの合計（読む量の目安）/ Total file size of a store (an estimate of the work)
+def store_size(input_dir, n):
+    return sum(os.path.getsize(path) for path in input_files(input_dir, n))
+
+
+# search_dir にある n 頂点のストアから、target を導出できるもので最も小さいものを探す関数
+# （(ディレクトリ, 絞り込み) を返す。なければ None）
+# Find the smallest store for n in search_dir from which target can be derived
+# (returns (directory, filters), or None)
+def find_source(target, n, search_dir="."):
+    best = None
+    for name in sorted(os.listdir(search_dir)):
+        path = os.path.join(search_dir, name)
+        family = Family.from_dir_name(name)
+        if family is None or not os.path.isdir(path) or input_files(path, n) is None:
+            continue
+        filters = missing_conditions(family, target, n)
+        if filters is None:
+            continue
+        size = store_size(path, n)
+        if best is None or size < best[0]:
+            best = (size, path, filters)
+    return None if best is None else (best[1], best[2])
+
+
+# 求める族 target を作る計画を立てる関数
+# （("reuse" | "derive" | "geng", 元のディレクトリ or None, 絞り込み) を返す）
+# Plan how to obtain target (returns ("reuse" | "derive" | "geng", source directory or None, filters))
+def plan(target, n, search_dir="."):
+    found = find_source(target, n, search_dir)
+    if found is None:
+        return "geng", None, None
+    source_dir, filters = found
+    return ("reuse" if not filters else "derive"), source_dir, filters
+
+
+# 計画に従って族を作る関数（出力ディレクトリ、グラフ数、計画の種類を返す）
+# geng に頼る場合、ステージの条件は geng の出力からの導出として続けて適用する
+# Build the family following the plan (returns the output directory, the graph count and the plan kind)
+# When falling back to geng, the stage conditions are then applied as a derivation from its output
+def derive(geng_options, n, edge_range=None, stages="", search_dir=".", output_dir=None, jobs=1):
+    if isinstance(geng_options, str):
+        geng_options = shlex.split(geng_options)
+    target = Family.from_options(geng_options, edge_range, stages)
+    output_dir = output_dir or os.path.join(search_dir, option_dir_name(geng_options, edge_range) + stages)
+
+    kind, source_dir, filters = plan(target, n, search_dir)
+    if kind == "reuse":
+        return source_dir, sum(1 for _ in read_store(source_dir, n)), kind
+    if kind == "geng":
+        geng_dir = os.path.join(search_dir, option_dir_name(geng_options, edge_range))
+        _, count = generate(geng_options, n, geng_dir, edge_range)
+        if not stages:
+            return geng_dir, count, kind
+        source_dir = geng_dir
+        filters = missing_conditions(Family.from_options(geng_options, edge_range), target, n)
+
+    pairs = stage_files(source_dir, output_dir, n)
+    tasks = [(input_path, output_path, filters) for input_path, output_path in pairs]
+    with Pool(jobs) as pool:
+        count = sum(pool.imap(filter_file, tasks))
+    return output_dir, count, kind
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Derive a geng family from an existing superset store, or run geng.")
+    parser.add_argument("n", type=int, help="number of vertices (e.g., 10)")
+    parser.add_argument("--options", default="", help='geng options of the family, e.g. --options="-c -d3 -t"')
+    parser.add_argument("--edges", help="edge range MINE:MAXE (as in geng)")
+    parser.add_argument("--stages", default="", choices=["", "p", "t", "pt"],
+                        help="stages applied on top of geng (p: planar, t: triconnected)")
+    parser.add_argument("--search-dir", default=".", help="directory holding the stores (default: .)")
+    parser.add_argument("--output-dir", help="output directory (default: derived from the options and stages)")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="number of worker processes (default: 1)")
+    parser.add_argument("--dry-run", action="store_true", help="only print the plan")
+    args = parser.parse_args()
+
+    edge_range = None
+    if args.edges:
+        try:
+            edge_range = parse_edge_range(args.edges)
+        except ValueError as e:
+            parser.error(str(e))
+
+    try:
+        geng_options = shlex.split(args.options)
+        target = Family.from_options(geng_options, edge_range, args.stages)
+        kind, source_dir, filters = plan(target, args.n, args.search_dir)
+    except (ValueError, FileNotFoundError) as e:
+        print(f"Error: {e}")
+        exit(1)
+
+    # 計画を表示 / Print the plan
+    if kind == "geng":
+        command = " ".join(["geng"] + geng_options + [str(args.n)] + ([args.edges] if args.edges else []))
+        print(f"Planned: {command}" + (f", then filter by stages {args.stages}" if args.stages else ""))
+    else:
+        conditions = ", ".join(prop if value is None else f"{prop}={value}" for prop, value in filters)
+        print(f"Planned: {kind} {source_dir}" + (f" filtered by {conditions}" if conditions else ""))
+    if args.dry_run:
+        return
+
+    try:
+        output_dir, count, _ = derive(geng_options, args.n, edge_range, args.stages,
+                                      args.search_dir, args.output_dir, args.jobs)
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        exit(1)
+    print(f"  -> {count} graphs on {args.n} vertices in {output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,105 +1,135 @@
 #!/usr/bin/env python3
 
 import os                           # ファイル操作 / For file and directory handling
-import lzma                         # .xz 圧縮ファイルの読み書き / For reading and writing .xz compressed files
+import argparse                     # コマンドライン引数の解析 / For parsing command-line arguments
 import networkx as nx               # グラフ構造操作ライブラリ / For graph operations with NetworkX
 import matplotlib.pyplot as plt     # グラフ描画 / For drawing graphs
 from math import ceil               # 切り上げ関数（ページ数計算に使用）/ For rounding up when computing number of pages
-
-# 入力ディレクトリ名と頂点数を受け取る
-# Prompt the user for the input directory and number of vertices
-input_dir = input("Enter input directory name (e.g., d3cpt): ").strip()
-n = int(input("Enter the number of vertices (e.g., 11): ").strip())
-
-# 単一ファイル・分割ファイルパスを構成
-# Construct paths for single-file input or chunked input
-single_input_path = os.path.join(input_dir, f"n{n}.g6.xz")
-chunk_input_dir = os.path.join(input_dir, f"n{n}")
-
-# 出力ディレクトリ（描画結果）を作成
-# Create output directory for graph drawings
-draw_dir = os.path.join("drawing", input_dir, f"n{n}")
-os.makedirs(draw_dir, exist_ok=True)
-
-graphs = []  # グラフを格納するリスト / List to store loaded graphs
-
-# 入力ファイルを読み込み（単一ファイルの場合）
-# Read input from a single .g6.xz file
-if os.path.exists(single_input_path):
-    print(f"Reading from: {single_input_path}")
-    with lzma.open(single_input_path, "rt") as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith("#"):
-                G = nx.from_graph6_bytes(line.encode())
-                graphs.append(G)
-
-# 分割された複数ファイルを順に読み込み
-# Read from chunked directory if present
-elif os.path.isdir(chunk_input_dir):
-    print(f"Reading from chunked files: {chunk_input_dir}")
-    for fname in sorted(os.listdir(chunk_input_dir)):
-        if fname.endswith(".g6.xz"):
-            with lzma.open(os.path.join(chunk_input_dir, fname), "rt") as f:
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith("#"):
-                        G = nx.from_graph6_bytes(line.encode())
-                        graphs.append(G)
-else:
-    print("Error: No valid input file or chunk directory found.")
-    exit(1)
-
-# グリッド設定（1 ページあたりの描画数）
-# Grid layout settings (graphs per page)
-cols = 5                                 # 横方向のグラフ数 / Number of graphs per row
-rows = 7                                 # 縦方向のグラフ数 / Number of graphs per column
-per_page = cols * rows                   # 1 ページあたりの最大グラフ数 / Max number of graphs per page
-figsize = (cols * 2.5, rows * 2.5)       # 1ページのサイズ（インチ）/ Page size in inches
-num_pages = ceil(len(graphs) / per_page) # ページ数の計算 / Calculate number of pages
-
-# グラフ描画とページごとの保存処理
-# Draw and save each page of graphs
-for page in range(num_pages):
-    fig, axes = plt.subplots(rows, cols, figsize=figsize)
-    axes = axes.flatten()
-
-    for i in range(per_page):
-        idx = page * per_page + i
-        ax = axes[i]
-        ax.axis('off')  # 軸を非表示にする / Hide axis
-
-        if idx >= len(graphs):
-            continue
-
-        G = graphs[idx]
-        try:
-            pos = nx.planar_layout(G)  # 平面レイアウトで配置 / Use planar layout
-        except:
-            pos = nx.spring_layout(G, seed=42)  # 失敗時は spring_layout にフォールバック / Fallback to spring layout
-
-        # グラフ描画（ノード・エッジは黒、ラベルなし）
-        # Draw graph with black nodes and edges, no labels
-        nx.draw(
-            G, pos, ax=ax,
-            node_size=40,
-            node_color='black',
-            edge_color='black',
-            with_labels=False
-        )
-
-        # 各グラフにインデックス番号を表示
-        # Show graph index below the drawing
-        ax.text(0.5, -0.02, f"({idx + 1})", ha='center', va='top',
-                transform=ax.transAxes, fontsize=13)
-
-    # PDF として保存（複数ページに対応）
-    # Save figure as PDF (per page)
-    page_path = os.path.join(draw_dir, f"n{n}_page{page + 1}.pdf")
-    plt.savefig(page_path, dpi=600, bbox_inches='tight')
-    plt.close()
-    print(f"Saved page: {page_path}")
-
-# 完了メッセージ
-# Print summary message
-print(f"Done. {len(graphs)} graphs saved in {num_pages} PDF pages at: {draw_dir}")
+from render import COLS, ROWS, PER_PAGE, default_layout, render_pages  # 軽量なベクター描画 / Lightweight vector renderer
+from store import read_store_with_coords, parse_edge_selector, edge_selector_name  # グラフと座標の読み込み / For reading graphs and coordinates
+
+# 描画の方式：既定は render.py で PDF/SVG を直接書き、"matplotlib" は従来どおり Figure を作って保存する
+# Drawing backends: by default render.py writes PDF/SVG directly, "matplotlib" builds and saves figures as before
+#   例 / e.g.  python draw.py d3cpt 11 -j 8
+#              python draw.py d3cpt 9 --format svg --backend matplotlib
+BACKENDS = ["vector", "matplotlib"]
+
+# グリッド設定（1 ページあたりの描画数、COLS・ROWS・PER_PAGE は render.py と共通）
+# Grid layout settings (graphs per page; COLS, ROWS and PER_PAGE are shared with render.py)
+FIGSIZE = (COLS * 2.5, ROWS * 2.5)       # 1ページのサイズ（インチ）/ Page size in inches
+
+
+# ストアのグラフと座標サイドカーの座標（なければ None）を読み込む関数（edges を指定するとその辺数だけ）
+# Load the graphs of a store together with their sidecar coordinates (None if absent; only edge counts in edges)
+def load_graphs(input_dir, n, edges=None):
+    graphs = []     # グラフを格納するリスト / List to store loaded graphs
+    positions = []  # サイドカーの座標（なければ None）/ Sidecar coordinates (None if absent)
+    for line, pos in read_store_with_coords(input_dir, n, edges):
+        graphs.append(nx.from_graph6_bytes(line.encode()))
+        positions.append(pos)
+    return graphs, positions
+
+
+# グラフを 5×7 のグリッドで PDF（または SVG）ページに matplotlib で描画する関数
+# Draw graphs on PDF (or SVG) pages in a 5×7 grid with matplotlib
+def draw_pages(graphs, positions, draw_dir, n, fmt="pdf"):
+    os.makedirs(draw_dir, exist_ok=True)
+    num_pages = ceil(len(graphs) / PER_PAGE) # ページ数の計算 / Calculate number of pages
+
+    # グラフ描画とページごとの保存処理
+    # Draw and save each page of graphs
+    for page in range(num_pages):
+        fig, axes = plt.subplots(ROWS, COLS, figsize=FIGSIZE)
+        axes = axes.flatten()
+
+        for i in range(PER_PAGE):
+            idx = page * PER_PAGE + i
+            ax = axes[i]
+            ax.axis('off')  # 軸を非表示にする / Hide axis
+
+            if idx >= len(graphs):
+                continue
+
+            G = graphs[idx]
+            # planar.cpp が計算した直線描画（なければ平面レイアウト、失敗時は spring_layout）
+            # Straight-line drawing from planar.cpp (otherwise the planar layout, falling back to spring layout)
+            pos = default_layout(G, positions[idx])
+
+            # グラフ描画（ノード・エッジは黒、ラベルなし）
+            # Draw graph with black nodes and edges, no labels
+            nx.draw(
+                G, pos, ax=ax,
+                node_size=40,
+                node_color='black',
+                edge_color='black',
+                with_labels=False
+            )
+
+            # 各グラフにインデックス番号を表示
+            # Show graph index below the drawing
+            ax.text(0.5, -0.02, f"({idx + 1})", ha='center', va='top',
+                    transform=ax.transAxes, fontsize=13)
+
+        # PDF（または SVG）として保存（複数ページに対応）
+        # Save figure as PDF or SVG (per page)
+        page_path = os.path.join(draw_dir, f"n{n}_page{page + 1}.{fmt}")
+        plt.savefig(page_path, dpi=600, bbox_inches='tight')
+        plt.close()
+        print(f"Saved page: {page_path}")
+    return num_pages
+
+
+# ストア input_dir の n 頂点グラフを drawing/{input_dir}/n{n}/ に描画する関数
+# （vector 方式はページ単位で jobs 並列に描き、matplotlib 方式は 1 ページずつ描く）
+# （edges を指定すると、その辺数のグラフだけを drawing/{input_dir}/n{n}/m{...}/ に描画する）
+# Draw the graphs on n vertices of input_dir into drawing/{input_dir}/n{n}/
+# (with edges, only the graphs with those edge counts, into drawing/{input_dir}/n{n}/m{...}/)
+# (the vector backend renders jobs pages in parallel, the matplotlib backend one page at a time)
+def draw_store(input_dir, n, draw_dir=None, edges=None, backend="vector", fmt="pdf", jobs=1):
+    if draw_dir is None:
+        draw_dir = os.path.join("drawing", input_dir, f"n{n}")
+        if edges is not None:
+            draw_dir = os.path.join(draw_dir, edge_selector_name(edges))
+    graphs, positions = load_graphs(input_dir, n, edges)
+    if backend == "matplotlib":
+        num_pages = draw_pages(graphs, positions, draw_dir, n, fmt)
+    else:
+        num_pages = 0
+        for page_path in render_pages(graphs, positions, draw_dir, n, fmt, jobs):
+            print(f"Saved page: {page_path}")
+            num_pages += 1
+    return len(graphs), num_pages, draw_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Draw the graphs of a store into PDF or SVG pages (5x7 per page).")
+    parser.add_argument("input_dir", help="input directory name (e.g., d3cpt)")
+    parser.add_argument("n", type=int, help="number of vertices (e.g., 11)")
+    parser.add_argument("--draw-dir", help="output directory (default: drawing/{input_dir}/n{n})")
+    parser.add_argument("--edges", help="only graphs with these edge counts, e.g. 30, 30:33 or 30,32:34")
+    parser.add_argument("--format", choices=["pdf", "svg"], default="pdf", help="page format (default: pdf)")
+    parser.add_argument("--backend", choices=BACKENDS, default="vector",
+                        help="vector: write pages directly, matplotlib: draw figures as before (default: vector)")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="pages rendered in parallel by the vector backend (default: 1)")
+    args = parser.parse_args()
+
+    try:
+        edges = parse_edge_selector(args.edges) if args.edges else None
+    except ValueError as e:
+        parser.error(str(e))
+
+    try:
+        count, num_pages, draw_dir = draw_store(args.input_dir, args.n, args.draw_dir, edges, args.backend,
+                                                args.format, args.jobs)
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        exit(1)
+
+    # 完了メッセージ
+    # Print summary message
+    print(f"Done. {count} graphs saved in {num_pages} {args.format.upper()} pages at: {draw_dir}")
+
+
+if __name__ == "__main__":
+    main()
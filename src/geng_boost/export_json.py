@@ -1,60 +1,21 @@
 #!/usr/bin/env python3
 
 import os                   # ファイル操作 / For file and directory handling
-import lzma                 # .xz 圧縮ファイルの読み書き / For reading .xz compressed files
 import json                 # JSON出力 / For exporting graph structure to JSON
+import argparse             # コマンドライン引数の解析 / For parsing command-line arguments
 import networkx as nx       # グラフ構造操作ライブラリ / For graph operations with NetworkX
+from families import read_store_with_families  # グラフ・座標・族の読み込み / For reading graphs, coordinates and families
+from store import parse_edge_selector, edge_selector_name  # 辺数の指定 / For edge-count selectors
 
-# 入力ディレクトリ名と項点数 n を受け取る
-# Prompt the user for the input directory name and the number of vertices
-input_dir = input("Enter input directory name (e.g., d3cpt): ").strip()
-n = int(input("Enter the number of vertices (e.g., 11): ").strip())
-
-# 単一ファイル・分割ファイルのパス
-# Construct paths
-single_input_path = os.path.join(input_dir, f"n{n}.g6.xz")
-chunk_input_dir = os.path.join(input_dir, f"n{n}")
-
-# JSON 出力用ディレクトリ
-# Create output directory for JSON
-json_dir = os.path.join("json", input_dir, f"n{n}")
-os.makedirs(json_dir, exist_ok=True)
-
-# グラフを格納するリスト
-# List to store parsed graphs
-graphs = []
-
-# 入力ファイルを読み込む
-# Read input graphs
-if os.path.exists(single_input_path):
-    print(f"Reading from: {single_input_path}")
-    with lzma.open(single_input_path, "rt") as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith("#"):
-                G = nx.from_graph6_bytes(line.encode())
-                graphs.append(G)
-elif os.path.isdir(chunk_input_dir):
-    print(f"Reading from chunked files: {chunk_input_dir}")
-    for fname in sorted(os.listdir(chunk_input_dir)):
-        if fname.endswith(".g6.xz"):
-            with lzma.open(os.path.join(chunk_input_dir, fname), "rt") as f:
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith("#"):
-                        G = nx.from_graph6_bytes(line.encode())
-                        graphs.append(G)
-else:
-    print("Error: No valid input file or chunk directory found.")
-    exit(1)
-
-# 各グラフを JSON 形式にエクスポート（座標 + 次数ラベル付き）
-# Export each graph as JSON (with position and degree label)
-for i, G in enumerate(graphs):
-    try:
-        pos = nx.planar_layout(G)  # 平面レイアウトの取得 / Get planar layout
-    except:
-        pos = nx.spring_layout(G, seed=42)  # 失敗時は spring_layout / Fallback layout
+
+# 1 つのグラフを Cytoscape 形式の辞書に変換する関数（座標 + 次数ラベル付き、分かれば族名も）
+# Convert one graph to a Cytoscape-style dict (with position and degree label, and families if known)
+def graph_to_json(G, pos=None, families=None):
+    if pos is None:
+        try:
+            pos = nx.planar_layout(G)  # 平面レイアウトの取得 / Get planar layout
+        except:
+            pos = nx.spring_layout(G, seed=42)  # 失敗時は spring_layout / Fallback layout
 
     degrees = dict(G.degree())
 
@@ -80,13 +41,71 @@ for i, G in enumerate(graphs):
             } for u, v in G.edges()
         ]
     }
+    if families is not None:
+        data["families"] = families  # families.py の分類結果 / Classification by families.py
+    return data
+
+
+# ストア input_dir の n 頂点グラフを json/{input_dir}/n{n}/{i}.json に書き出す関数
+# family を指定すると、families.py でその族に分類されたグラフだけを json/{family}/n{n}/ に書き出す
+# Export the graphs on n vertices of input_dir to json/{input_dir}/n{n}/{i}.json
+# With family, export only the graphs tagged with that family by families.py to json/{family}/n{n}/
+# edges を指定すると、その辺数のグラフだけを .../n{n}/m{...}/ に書き出す
+# With edges, export only the graphs with those edge counts, into .../n{n}/m{...}/
+def export_json(input_dir, n, json_dir=None, family=None, edges=None):
+    # JSON 出力用ディレクトリ
+    # Create output directory for JSON
+    if json_dir is None:
+        json_dir = os.path.join("json", family or input_dir, f"n{n}")
+        if edges is not None:
+            json_dir = os.path.join(json_dir, edge_selector_name(edges))
+    os.makedirs(json_dir, exist_ok=True)
+
+    # 各グラフを JSON 形式にエクスポート（planar.cpp の座標があればそれを使う）
+    # Export each graph as JSON (using the planar.cpp coordinates when available)
+    count = 0
+    for line, pos, families in read_store_with_families(input_dir, n, edges):
+        if family is not None:
+            if families is None:
+                raise FileNotFoundError(f"No family sidecar for n={n} in {input_dir} (run families.py first)")
+            if family not in families:
+                continue
+        G = nx.from_graph6_bytes(line.encode())
+        data = graph_to_json(G, pos, families)
+
+        count += 1
+        outpath = os.path.join(json_dir, f"{count}.json")
+        with open(outpath, "w") as f:
+            json.dump(data, f, indent=2)
+
+        print(f"Saved: {outpath}")
+    return count, json_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the graphs of a store as Cytoscape JSON files.")
+    parser.add_argument("input_dir", help="input directory name (e.g., d3cpt)")
+    parser.add_argument("n", type=int, help="number of vertices (e.g., 11)")
+    parser.add_argument("--json-dir", help="output directory (default: json/{family or input_dir}/n{n})")
+    parser.add_argument("--family", help="export only the graphs tagged with this family (see families.py)")
+    parser.add_argument("--edges", help="only graphs with these edge counts, e.g. 30, 30:33 or 30,32:34")
+    args = parser.parse_args()
+
+    try:
+        edges = parse_edge_selector(args.edges) if args.edges else None
+    except ValueError as e:
+        parser.error(str(e))
+
+    try:
+        count, json_dir = export_json(args.input_dir, args.n, args.json_dir, args.family, edges)
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        exit(1)
 
-    outpath = os.path.join(json_dir, f"{i+1}.json")
-    with open(outpath, "w") as f:
-        json.dump(data, f, indent=2)
+    # 完了メッセージ
+    # Summary message
+    print(f"\nDone. {count} graphs exported to: {json_dir}")
 
-    print(f"Saved: {outpath}")
 
-# 完了メッセージ
-# Summary message
-print(f"\nDone. {len(graphs)} graphs exported to: {json_dir}")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+
+import os                   # ファイル操作 / For file and directory handling
+import lzma                 # .xz 圧縮ファイルの読み書き / For reading and writing .xz compressed files
+import subprocess           # 外部 C++ プログラムの実行 / For invoking the external C++ program
+import argparse             # コマンドライン引数の解析 / For parsing command-line arguments
+from contextlib import ExitStack, closing  # 複数のファイルをまとめて閉じる / For closing several files together
+from itertools import islice  # 入力を BATCH_SIZE 行ずつ読む / For reading the input BATCH_SIZE lines at a time
+import networkx as nx       # 平面埋め込み（回転系）の計算 / For planar embeddings (rotation systems)
+from multiprocessing import Pool  # 並列処理 / For parallel processing
+from canon import decode_graph6, encode_graph6  # graph6 の読み書き / For reading and writing graph6
+from coords import sidecar_path  # サイドカーのパス / Path of the sidecars
+from degree import parse_constraints  # "サイズ:個数" 条件の解析 / For parsing "size:count" conditions
+from planar import PLANAR_BIN  # Boost の平面性判定バイナリ / The Boost planarity binary
+from predcache import PredicateCache, DEFAULT_CACHE_PATH  # 判定結果の永続キャッシュ / Persistent predicate cache
+from store import stage_files, require_input_files, read_graph6  # ストアの読み書き / For reading stores
+
+# 面の計算：3-連結平面グラフの埋め込みは（鏡像を除いて）一意なので、面と面サイズの分布（面ベクトル）は
+# グラフの不変量になる。回転系（各頂点の近傍の巡回順序）から面をたどって求める。
+# Faces: a 3-connected planar graph has a unique embedding (up to mirror image), so its faces and
+# the distribution of face sizes (face vector) are graph invariants. Faces are traced from the rotation
+# system (the cyclic order of the neighbours at each vertex).
+#
+# 面ステージ：ストアの各グラフについて planar.cpp（--faces）が求めた埋め込みの面から、面ベクトルを
+# サイドカー X.fv.xz に、必要なら双対グラフの graph6 をサイドカー X.dual.xz に書く（どちらも X.g6.xz と同じ行順）。
+# -f サイズ:個数 を指定すると、面ベクトルが条件を満たすグラフだけを出力ストア（既定で input_dir + 'f'）に残す。
+# Face stage: for every graph of a store, write the face vector to a sidecar X.fv.xz and optionally the
+# graph6 of the dual graph to a sidecar X.dual.xz (both aligned with X.g6.xz), using the faces of the
+# embedding found by planar.cpp (--faces). With -f SIZE:COUNT, only graphs whose face vector matches are
+# kept in an output store (input_dir + 'f' by default).
+#   例 / e.g.  python faces.py d3cpt 9 -j 4 --dual -f 3:2*n-4
+
+# 1 回の planar.cpp 呼び出しに渡すグラフ数 / Graphs passed to one planar.cpp call
+BATCH_SIZE = 5000
+
+
+# 隣接集合のリストから、平面グラフの回転系（各頂点の近傍の時計回りの順序）を求める関数
+# Compute the rotation system (clockwise neighbour order at each vertex) from adjacency sets
+def rotation_system(adj):
+    G = nx.Graph()
+    G.add_nodes_from(range(len(adj)))
+    G.add_edges_from((u, w) for u in range(len(adj)) for w in adj[u] if u < w)
+    is_planar, embedding = nx.check_planarity(G)
+    if not is_planar:
+        raise ValueError("input graph is not planar")
+    return [list(embedding.neighbors_cw_order(v)) for v in range(len(adj))]
+
+
+# 回転系から面（頂点の巡回列）をすべてたどる関数（各有向辺はちょうど 1 つの面に属する）
+# Trace all faces (cyclic vertex sequences) of a rotation system (each dart lies on exactly one face)
+def trace_faces(rotation):
+    position = [{w: i for i, w in enumerate(r)} for r in rotation]
+    seen = set()
+    faces = []
+    for u, r in enumerate(rotation):
+        for v in r:
+            if (u, v) in seen:
+                continue
+            face = []
+            a, b = u, v
+            while (a, b) not in seen:
+                seen.add((a, b))
+                face.append(a)
+                # b で a の次（時計回り）の近傍へ進む / Continue to the neighbour after a around b (clockwise)
+                rb = rotation[b]
+                a, b = b, rb[(position[b][a] + 1) % len(rb)]
+            faces.append(face)
+    return faces
+
+
+# 面のリストから面ベクトル ((面サイズ, 個数), ...) を求める関数（面サイズの昇順）
+# Face vector ((face size, count), ...) of a list of faces (ascending face size)
+def face_vector(faces):
+    counts = {}
+    for face in faces:
+        counts[len(face)] = counts.get(len(face), 0) + 1
+    return tuple(sorted(counts.items()))
+
+
+# 面ベクトルを "[3,4] [4,2]" 形式の文字列にする関数（次数パターンと同じ書式）
+# Format a face vector as "[3,4] [4,2]" (the same format as degree patterns)
+def format_face_vector(vector):
+    return " ".join(f"[{size},{count}]" for size, count in vector)
+
+
+# 3-連結平面グラフの自己同型の個数を回転系から数える関数。埋め込みが（鏡像を除いて）一意なので、
+# 自己同型は 1 本の有向辺の像と向き（回転を保つか反転するか）で決まる：固定した有向辺 (u0, v0) の像の候補
+# （有向辺 × 2 方向）ごとに、回転に沿って写像を広げて矛盾がなければ 1 つ数える（O(m^2)）。
+# Count the automorphisms of a 3-connected planar graph from its rotation system. The embedding is unique
+# up to mirror image, so an automorphism is determined by the image of one dart and the orientation (rotation
+# kept or reversed): for every candidate image of a fixed dart (u0, v0) (darts × 2 directions), extend the
+# map along the rotations and count it if no conflict arises (O(m^2)).
+def automorphism_count(rotation):
+    position = [{w: i for i, w in enumerate(r)} for r in rotation]
+
+    def extends(a, b, direction):
+        image = [-1] * len(rotation)
+        used = {a}
+        image[0] = a
+        pending = [(0, rotation[0][0], a, b)]
+        while pending:
+            u, v, a, b = pending.pop()
+            ru, ra = rotation[u], rotation[a]
+            if len(ru) != len(ra):
+                return False
+            i, j = position[u][v], position[a][b]
+            for k in range(len(ru)):
+                w, x = ru[(i + k) % len(ru)], ra[(j + direction * k) % len(ra)]
+                if image[w] == -1:
+                    if x in used:
+                        return False
+                    image[w] = x
+                    used.add(x)
+                    pending.append((w, u, x, a))
+                elif image[w] != x:
+                    return False
+        return True
+
+    return sum(1 for a, ra in enumerate(rotation) if len(ra) == len(rotation[0])
+               for b in ra for direction in (1, -1) if extends(a, b, direction))
+
+
+# graph6 行のまとまりの面を planar.cpp で求め、行ごとに面（頂点列のリスト）を返す関数
+# Compute the faces of a batch of graph6 lines with planar.cpp and return the faces (vertex lists) per line
+def embedded_faces(lines):
+    payload = []
+    for line in lines:
+        adj = decode_graph6(line)
+        edges = [(u, w) for u in range(len(adj)) for w in adj[u] if u < w]
+        payload.append(f"# {len(adj)} {len(edges)}\n")
+        payload.extend(f"{u} {w}\n" for u, w in edges)
+        payload.append(f"{line}\n\n")
+    result = subprocess.run([PLANAR_BIN, "--faces"], input="".join(payload),
+                            capture_output=True, text=True, check=True)
+
+    # 出力は平面なグラフだけなので、入力と 1 対 1 に対応しているかを確かめる
+    # Only planar graphs are output, so check that the output matches the input line for line
+    output = result.stdout.splitlines()
+    if len(output) != len(lines):
+        raise ValueError("input contains non-planar graphs (run planar.py first)")
+    all_faces = []
+    for line, result_line in zip(lines, output):
+        graph6, face_text = result_line.split(" | ", 1)
+        if graph6 != line:
+            raise ValueError(f"input graph {line} is not planar (run planar.py first)")
+        all_faces.append([[int(v) for v in face.split()] for face in face_text.split(";")])
+    return all_faces
+
+
+# 面のリストから双対グラフの隣接集合を作る関数（辺を共有する面どうしを結ぶ）
+# Build the adjacency sets of the dual graph from the faces (faces sharing an edge are joined)
+def dual_adjacency(faces):
+    edge_faces = {}
+    for f, face in enumerate(faces):
+        for i in range(len(face)):
+            edge = frozenset((face[i], face[(i + 1) % len(face)]))
+            edge_faces.setdefault(edge, []).append(f)
+    adj = [set() for _ in faces]
+    for pair in edge_faces.values():
+        if len(pair) == 2 and pair[0] != pair[1]:
+            adj[pair[0]].add(pair[1])
+            adj[pair[1]].add(pair[0])
+    return adj
+
+
+# 面ベクトルが "サイズ:個数" 条件をすべて満たすかを判定する関数
+# Check whether a face vector satisfies all "size:count" conditions
+def matches_face_conditions(vector, face_conditions):
+    counts = dict(vector)
+    return all(counts.get(size, 0) == cnt for size, cnt in face_conditions)
+
+
+# graph6 行のまとまりの面ベクトル（と双対グラフの graph6 or None）を行ごとに返す関数
+# （cache を渡すと、双対が要らなければキャッシュにないグラフだけの面を求める）
+# Return the face vector (and the graph6 of the dual graph or None) per line of a batch of graph6 lines
+# (with a cache and no duals, only the faces of graphs missing from the cache are computed)
+def batch_face_vectors(lines, write_dual=False, cache=None):
+    if cache is not None and not write_dual:
+        vectors = cache.resolve("face_vector", lines,
+                                lambda missing: [face_vector(faces) for faces in embedded_faces(missing)])
+        return [(tuple(tuple(pair) for pair in vector), None) for vector in vectors]
+    return [(face_vector(faces), encode_graph6(dual_adjacency(faces)) if write_dual else None)
+            for faces in embedded_faces(lines)]
+
+
+# 1 つのファイルを処理し、面ベクトルのサイドカー（と双対・絞り込み結果）を書く関数
+# （cache_path を指定すると判定結果キャッシュを開いて使う。{面ベクトル: 個数}、残したグラフ数、
+#   キャッシュのヒット数・ミス数を返す）
+# Process one file and write the face vector sidecar (and duals and the filtered output)
+# (with cache_path, the predicate cache is opened and used; returns {face vector: count}, the number of
+#  kept graphs and the hits and misses of the cache)
+def process_file(args):
+    input_path, output_path, write_dual, face_conditions, cache_path, use_labelg = args
+    cache = PredicateCache(cache_path, use_labelg=use_labelg, warn=False) if cache_path is not None else None
+    counter = {}
+    kept = 0
+
+    # 入力は BATCH_SIZE 行ずつ読み、出力ファイルは例外が起きても閉じる
+    # Read the input BATCH_SIZE lines at a time, and close the outputs even if an error occurs
+    has_xy = output_path is not None and os.path.exists(sidecar_path(input_path))
+    with ExitStack() as files:
+        def open_xz(path, mode):
+            return files.enter_context(lzma.open(path, mode))
+        xy_in = open_xz(sidecar_path(input_path), "rt") if has_xy else None
+        fv_out = open_xz(sidecar_path(input_path, "fv"), "wt")
+        dual_out = open_xz(sidecar_path(input_path, "dual"), "wt") if write_dual else None
+        f_out = open_xz(output_path, "wt") if output_path is not None else None
+        xy_out = open_xz(sidecar_path(output_path), "wt") if has_xy else None
+        kept_fv_out = open_xz(sidecar_path(output_path, "fv"), "wt") if output_path is not None else None
+        lines = files.enter_context(closing(read_graph6(input_path)))
+
+        while batch := list(islice(lines, BATCH_SIZE)):
+            for line, (vector, dual) in zip(batch, batch_face_vectors(batch, write_dual, cache)):
+                text = format_face_vector(vector)
+                counter[vector] = counter.get(vector, 0) + 1
+                fv_out.write(text + "\n")
+                if dual_out is not None:
+                    dual_out.write(dual + "\n")
+
+                # 面ベクトルで絞り込む（座標サイドカーがあれば一緒に引き継ぐ）
+                # Filter on the face vector (carrying the coordinate sidecar over if present)
+                xy = xy_in.readline() if has_xy else None
+                if f_out is not None and matches_face_conditions(vector, face_conditions):
+                    f_out.write(line + "\n")
+                    kept_fv_out.write(text + "\n")
+                    if has_xy:
+                        xy_out.write(xy)
+                    kept += 1
+
+    if cache is None:
+        return counter, kept, {}
+    cache.close(evict=False)
+    return counter, kept, cache.stats
+
+
+# ストア input_dir の n 頂点グラフの面を求める関数（ファイル単位で jobs 並列）
+# face_conditions を指定すると、条件を満たすグラフを output_dir（既定で input_dir + 'f'）に残す
+# （{面ベクトル: 個数} と残したグラフ数を返す）
+# cache に PredicateCache を渡すと、ほかの族やストアで求めた面ベクトルを再利用する
+# Compute the faces of the graphs on n vertices of input_dir (jobs files in parallel)
+# With face_conditions, keep the matching graphs in output_dir (input_dir + 'f' by default)
+# (returns {face vector: count} and the number of kept graphs)
+# With a PredicateCache as cache, face vectors computed for other families or stores are reused
+def face_stage(input_dir, n, jobs=1, write_dual=False, face_conditions=None, output_dir=None, cache=None):
+    if face_conditions:
+        pairs = stage_files(input_dir, output_dir or input_dir + "f", n)
+    else:
+        pairs = [(input_path, None) for input_path in require_input_files(input_dir, n)]
+    # キャッシュは各ワーカーが同じファイルを開いて使う（SQLite が同時アクセスをまとめる）
+    # Every worker opens the same cache file (SQLite arbitrates concurrent access)
+    cache_args = (cache.path, cache.use_labelg) if cache is not None else (None, True)
+    tasks = [(input_path, output_path, write_dual, face_conditions, *cache_args) for input_path, output_path in pairs]
+
+    counter = {}
+    kept = 0
+    with Pool(jobs) as pool:
+        for (input_path, _), (file_counter, file_kept, stats) in zip(pairs, pool.imap(process_file, tasks)):
+            print(f"Processed: {input_path}")
+            if cache is not None:
+                cache.add_stats(stats)
+            for vector, count in file_counter.items():
+                counter[vector] = counter.get(vector, 0) + count
+            kept += file_kept
+    return counter, kept
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute face vectors (and dual graphs) of a polyhedral store.")
+    parser.add_argument("input_dir", help="input directory name (e.g., d3cpt)")
+    parser.add_argument("n", type=int, help="number of vertices (e.g., 11)")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="number of worker processes (default: 1)")
+    parser.add_argument("--dual", action="store_true", help="also write the dual graphs as a .dual.xz sidecar")
+    parser.add_argument("-f", "--face", action="append", default=[], metavar="SIZE:COUNT",
+                        help="keep only graphs with COUNT faces of SIZE, repeatable (e.g., -f 3:2*n-4)")
+    parser.add_argument("--output-dir", help="output directory for -f (default: input_dir + 'f')")
+    parser.add_argument("--cache", action="store_true",
+                        help="reuse face vectors from the predicate cache (not used with --dual)")
+    parser.add_argument("--cache-path", default=DEFAULT_CACHE_PATH,
+                        help=f"predicate cache file (default: {DEFAULT_CACHE_PATH})")
+    parser.add_argument("--cache-max-mb", type=int, default=1024, help="cache size limit in MB (default: 1024)")
+    parser.add_argument("--no-labelg", action="store_true", help="use the Python canonicaliser even if labelg exists")
+    args = parser.parse_args()
+
+    try:
+        face_conditions = parse_constraints(args.face, args.n)
+        cache = PredicateCache(args.cache_path, args.cache_max_mb << 20, not args.no_labelg) if args.cache else None
+    except ValueError as e:
+        parser.error(str(e))
+
+    try:
+        counter, kept = face_stage(args.input_dir, args.n, args.jobs, args.dual, face_conditions, args.output_dir,
+                                   cache)
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        exit(1)
+    finally:
+        if cache is not None:
+            cache.close()
+
+    # 面ベクトルごとの個数を出力（次数パターンと同じ書式）
+    # Print the number of graphs per face vector (in the same format as degree patterns)
+    print("\nAll face vectors and their frequencies:")
+    for vector, count in sorted(counter.items(), key=lambda x: (-x[1], x[0])):
+        print(f"{format_face_vector(vector)} : {count}")
+    if face_conditions:
+        print(f"\n{kept} graphs match the face conditions.")
+    if cache is not None:
+        print(f"Predicate cache: {cache.summary()}")
+
+
+if __name__ == "__main__":
+    main()
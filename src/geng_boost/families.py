@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+
+import os                   # ファイル・ディレクトリ操作 / For file and directory handling
+import lzma                 # .xz 圧縮ファイルの読み書き / For reading and writing .xz compressed files
+import json                 # 手作業で選んだ族の JSON の読み込み / For reading the curated family JSON files
+import argparse             # コマンドライン引数の解析 / For parsing command-line arguments
+from multiprocessing import Pool  # 並列処理 / For parallel processing
+from coords import sidecar_path, read_coords  # サイドカーのパスと座標 / Sidecar paths and coordinates
+from canon import decode_graph6, encode_graph6, canonical_lines, canonical_graph6, canonicalizer_name, equitable_cells  # graph6 と正準化 / graph6 and canonical forms
+from faces import rotation_system, trace_faces, face_vector  # 面ベクトル / Face vectors
+from store import require_input_files, read_graph6, graph6_edge_count  # ストアの読み込み / For reading stores
+
+# 多面体グラフの族の分類：安い不変量（辺数・次数パターン・面ベクトル・等分割のセルサイズ）で索引を作り、
+# 不変量が一致したときだけ正準形を比べて族を確定する。族は 3 通りで与える：
+#   - 定義から構成できる古典的な族（pyramid, bipyramid, prism, antiprism）
+#   - 次数パターンで決まる変種の族（pyramid_var_1 など）：graph_viewer/json/{族}/n{k}/ に手作業で選ばれた例は、
+#     どの族もその n の次数パターン（n の式）を持つ多面体グラフすべてなので、任意の n でパターンから判定する
+#   - それ以外に graph_viewer/json/{族}/n{k}/ にある例（例のある n だけ分かる）
+# 変種の族は次数パターンだけで判定するので、入力は多面体グラフのストア（d3cpt など）であること。
+# 結果は各 X.g6.xz と同じ行順のサイドカー X.fam.xz（族名をカンマ区切り、なければ "-"）に書く。
+# Classification into polyhedral families: cheap invariants (edge count, degree pattern, face vector,
+# cell sizes of the equitable partition) are indexed, and canonical forms are compared only when the
+# invariants match. Families come from three sources:
+#   - classical families built from their definition (pyramid, bipyramid, prism, antiprism)
+#   - variant families defined by a degree pattern (pyramid_var_1, ...): the examples curated in
+#     graph_viewer/json/{family}/n{k}/ are, for every family, all polyhedral graphs with a degree pattern given
+#     by a formula in n, so they are recognised from that pattern for any n
+#   - other examples in graph_viewer/json/{family}/n{k}/ (known only for those n)
+# Variant families are recognised by their degree pattern alone, so the input must be a polyhedral store
+# (d3cpt, ...).
+# Results go to a sidecar X.fam.xz aligned with X.g6.xz (comma-separated family names, or "-").
+#   例 / e.g.  python families.py d3cpt 9 -j 4
+
+# 手作業で選ばれた族の JSON ディレクトリ / Directory of the curated family JSON files
+CURATED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "graph_viewer", "json")
+
+# 族ではないディレクトリ / Directories that are not families
+NOT_FAMILIES = {"polyhedron", "sample"}
+
+# 1 ワーカーにまとめて渡すグラフ数 / Graphs handed to a worker at once
+BATCH_SIZE = 256
+
+
+# 閉路 0..k-1 に頂点を加えた隣接集合を作る補助関数
+# Helper building adjacency sets for a cycle 0..k-1 plus extra vertices
+def _cycle(k, total):
+    adj = [set() for _ in range(total)]
+    for i in range(k):
+        adj[i].add((i + 1) % k)
+        adj[(i + 1) % k].add(i)
+    return adj
+
+
+# 角錐（車輪）：n-1 角形と頂点 1 つ / Pyramid (wheel): an (n-1)-gon and one apex
+def pyramid(n):
+    adj = _cycle(n - 1, n)
+    for i in range(n - 1):
+        adj[i].add(n - 1)
+        adj[n - 1].add(i)
+    return adj
+
+
+# 双角錐：n-2 角形と頂点 2 つ / Bipyramid: an (n-2)-gon and two apexes
+def bipyramid(n):
+    adj = _cycle(n - 2, n)
+    for apex in (n - 2, n - 1):
+        for i in range(n - 2):
+            adj[i].add(apex)
+            adj[apex].add(i)
+    return adj
+
+
+# 角柱：n/2 角形 2 つを対応する頂点で結ぶ / Prism: two (n/2)-gons joined vertex to vertex
+def prism(n):
+    k = n // 2
+    adj = _cycle(k, n)
+    for i in range(k):
+        j, nxt = k + i, k + (i + 1) % k
+        adj[j].update((nxt, i))
+        adj[nxt].add(j)
+        adj[i].add(j)
+    return adj
+
+
+# 反角柱：n/2 角形 2 つを三角形の帯で結ぶ / Antiprism: two (n/2)-gons joined by a band of triangles
+def antiprism(n):
+    adj = prism(n)
+    k = n // 2
+    for i in range(k):
+        u, v = i, k + (i + 1) % k
+        adj[u].add(v)
+        adj[v].add(u)
+    return adj
+
+
+# 古典的な族：名前 → (構成関数, 構成できる n の条件)
+# Classical families: name → (constructor, condition on n)
+CLASSICAL = {
+    "pyramid": (pyramid, lambda n: n >= 4),
+    "bipyramid": (bipyramid, lambda n: n >= 5),
+    "prism": (prism, lambda n: n >= 6 and n % 2 == 0),
+    "antiprism": (antiprism, lambda n: n >= 6 and n % 2 == 0),
+}
+
+
+# (次数, 個数) の組を次数パターン ((次数, 個数), ...) にまとめる関数（同じ次数は足し合わせる）
+# Merge (degree, count) pairs into a degree pattern ((degree, count), ...) (equal degrees are added up)
+def degree_pattern(*pairs):
+    counts = {}
+    for degree, count in pairs:
+        counts[degree] = counts.get(degree, 0) + count
+    return tuple(sorted((d, c) for d, c in counts.items() if c > 0))
+
+
+# 変種の族：名前 → (n 頂点での次数パターン, パターンが族を表す n の条件)
+# （例：pyramid_var_1 は車輪の外周に弦を 1 本足したもので、次数 3 が n-3 個・4 が 2 個・n-1 が 1 個）
+# Variant families: name → (degree pattern on n vertices, condition on n for the pattern to define the family)
+# (e.g. pyramid_var_1 is a wheel with one chord added to its rim: n-3 vertices of degree 3, two of 4, one of n-1)
+VARIANTS = {
+    "octahedron_var_1": (lambda n: degree_pattern((3, n - 6), (4, 5), (n - 2, 1)), lambda n: n >= 6),
+    "prism_var_1": (lambda n: degree_pattern((3, n - 1), (n - 3, 1)), lambda n: n >= 6),
+    "pyramid_var_1": (lambda n: degree_pattern((3, n - 3), (4, 2), (n - 1, 1)), lambda n: n >= 6),
+    "pyramid_var_2": (lambda n: degree_pattern((3, n - 4), (4, 3), (n - 2, 1)), lambda n: n >= 6),
+    "pyramid_var_3": (lambda n: degree_pattern((3, n - 5), (4, 2), (5, 2), (n - 1, 1)), lambda n: n >= 7),
+    "pyramid_var_4": (lambda n: degree_pattern((3, n - 5), (4, 4), (n - 1, 1)), lambda n: n >= 7),
+    "pyramid_var_5": (lambda n: degree_pattern((3, n - 4), (5, 3), (n - 1, 1)), lambda n: n >= 7),
+    "pyramid_var_6": (lambda n: degree_pattern((3, 2), (4, 2), (5, n - 5), (n - 1, 1)), lambda n: n >= 6),
+    "pyramid_var_7": (lambda n: degree_pattern((3, 3), (4, n - 4), (n - 1, 1)), lambda n: n >= 6 and n % 2 == 0),
+    "unremarkable_var_1": (lambda n: degree_pattern((3, n - 2), (n // 2 + 1, 2)), lambda n: n >= 6 and n % 2 == 0),
+}
+
+
+# Cytoscape 形式の JSON を graph6 に変換する関数
+# Convert a Cytoscape-style JSON graph to graph6
+def json_to_graph6(data):
+    index = {node["data"]["id"]: i for i, node in enumerate(data["nodes"])}
+    adj = [set() for _ in index]
+    for edge in data["edges"]:
+        u, v = index[edge["data"]["source"]], index[edge["data"]["target"]]
+        adj[u].add(v)
+        adj[v].add(u)
+    return encode_graph6(adj)
+
+
+# 辺数と次数パターン（最も安い不変量、前段の絞り込みに使う）
+# Edge count and degree pattern (the cheapest invariants, used as a pre-filter)
+def quick_key(adj):
+    degrees = {}
+    for s in adj:
+        degrees[len(s)] = degrees.get(len(s), 0) + 1
+    return len(adj), sum(len(s) for s in adj) // 2, tuple(sorted(degrees.items()))
+
+
+# 不変量の組：辺数・次数パターン・面ベクトル・等分割のセルサイズ（自己同型の軌道の近似）
+# Invariant key: edge count, degree pattern, face vector and the equitable cell sizes (approximating orbits)
+def invariant_key(adj):
+    faces = face_vector(trace_faces(rotation_system(adj)))
+    cells = tuple(sorted(len(cell) for cell in equitable_cells(adj)))
+    return quick_key(adj) + (faces, cells)
+
+
+class FamilyIndex:
+    """
+    不変量 → {正準形: 族名の集合} の索引（と、次数パターン → 族名の集合）
+    An index from invariants to {canonical form: set of family names} (and degree pattern → family names).
+    """
+    def __init__(self, use_labelg=True):
+        self.use_labelg = use_labelg
+        self.quick = set()  # 前段の絞り込み用 / For the pre-filter
+        self.full = {}      # 不変量 → {正準形: 族名の集合} / Invariant key → {canonical form: family names}
+        self.patterns = {}  # (頂点数, 次数パターン) → 族名の集合 / (vertices, degree pattern) → family names
+
+    def add(self, family, line):
+        self.add_many([(family, line)])
+
+    # (族名, graph6) の組をまとめて加える（正準化は 1 回の canonical_lines で行う）
+    # Add (family, graph6) pairs together (canonicalised with a single canonical_lines call)
+    def add_many(self, pairs):
+        pairs = list(pairs)
+        canonical_forms = list(canonical_lines([line for _, line in pairs], self.use_labelg))
+        for (family, line), canonical in zip(pairs, canonical_forms):
+            adj = decode_graph6(line)
+            self.quick.add(quick_key(adj))
+            self.full.setdefault(invariant_key(adj), {}).setdefault(canonical, set()).add(family)
+
+    # 次数パターンで決まる族を加える / Add a family defined by a degree pattern
+    def add_pattern(self, family, n, pattern):
+        self.patterns.setdefault((n, pattern), set()).add(family)
+
+    def classify(self, line):
+        adj = decode_graph6(line)
+        tags, candidates = self._lookup(adj)
+        if candidates:
+            tags.update(candidates.get(canonical_graph6(line, self.use_labelg), ()))
+        return sorted(tags)
+
+    # graph6 行のリストを分類する（候補の残ったものだけを 1 回の canonical_lines でまとめて正準化する）
+    # Classify a list of graph6 lines (only the lines with candidates left are canonicalised, together in a
+    # single canonical_lines call)
+    def classify_many(self, lines):
+        results = [self._lookup(decode_graph6(line)) for line in lines]
+        pending = [i for i, (_, candidates) in enumerate(results) if candidates]
+        canonical_forms = list(canonical_lines([lines[i] for i in pending], self.use_labelg))
+        for i, canonical in zip(pending, canonical_forms):
+            tags, candidates = results[i]
+            tags.update(candidates.get(canonical, ()))
+        return [sorted(tags) for tags, _ in results]
+
+    # 次数パターンで決まる族を引いてから、安い不変量を順に比べ、(族名の集合, すべて一致したときの
+    # {正準形: 族名の集合} or None) を返す（正準形はそのときだけ求めればよい）
+    # Look up the families defined by the degree pattern, then compare the cheap invariants, returning
+    # (family names, {canonical form: family names} when all of them match, else None); the canonical form
+    # is only needed in that case
+    def _lookup(self, adj):
+        quick = quick_key(adj)
+        tags = set(self.patterns.get((quick[0], quick[2]), ()))
+        candidates = self.full.get(invariant_key(adj)) if quick in self.quick else None
+        return tags, candidates
+
+
+# n 頂点の族の索引を作る関数（古典的な族 + 変種の族 + curated_dir にあるそれ以外の族の例）
+# Build the family index for n vertices (classical families + variant families + examples of other families
+# in curated_dir)
+def build_index(n, curated_dir=CURATED_DIR, use_labelg=True):
+    index = FamilyIndex(use_labelg)
+    index.add_many((family, encode_graph6(build(n))) for family, (build, valid) in CLASSICAL.items() if valid(n))
+    for family, (pattern, valid) in VARIANTS.items():
+        if valid(n):
+            index.add_pattern(family, n, pattern(n))
+
+    if curated_dir and os.path.isdir(curated_dir):
+        for family in sorted(os.listdir(curated_dir)):
+            family_dir = os.path.join(curated_dir, family, f"n{n}")
+            if family in NOT_FAMILIES or family in CLASSICAL or family in VARIANTS or not os.path.isdir(family_dir):
+                continue
+            curated = []
+            for fname in sorted(os.listdir(family_dir)):
+                if fname.endswith(".json"):
+                    with open(os.path.join(family_dir, fname)) as f:
+                        curated.append((family, json_to_graph6(json.load(f))))
+            index.add_many(curated)
+    return index
+
+
+# ワーカーごとの索引（Pool の initializer で設定）/ Per-worker index (set by the Pool initializer)
+_worker_index = None
+
+
+def _init_worker(index):
+    global _worker_index
+    _worker_index = index
+
+
+def _classify_batch(lines):
+    return _worker_index.classify_many(lines)
+
+
+# 入力ファイルを BATCH_SIZE 行ずつに分けるジェネレータ
+# Generator cutting an input file into batches of BATCH_SIZE lines
+def _batches(path):
+    batch = []
+    for line in read_graph6(path):
+        batch.append(line)
+        if len(batch) >= BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# ストア input_dir の n 頂点グラフを分類し、各ファイルの横に .fam.xz サイドカーを書く関数
+# （族名 → 個数 の辞書を返す）
+# Classify the graphs on n vertices of input_dir and write a .fam.xz sidecar next to every file
+# (returns a dict family name → count)
+def classify_store(input_dir, n, jobs=1, curated_dir=CURATED_DIR, use_labelg=True):
+    index = build_index(n, curated_dir, use_labelg)
+    totals = {}
+    with Pool(jobs, initializer=_init_worker, initargs=(index,)) as pool:
+        for input_path in require_input_files(input_dir, n):
+            with lzma.open(sidecar_path(input_path, "fam"), "wt") as f_out:
+                for tags_batch in pool.imap(_classify_batch, _batches(input_path)):
+                    for tags in tags_batch:
+                        f_out.write((",".join(tags) or "-") + "\n")
+                        for family in tags:
+                            totals[family] = totals.get(family, 0) + 1
+    return totals
+
+
+# 族サイドカーがあれば族名のリストを 1 行ずつ返し、なければ None を返し続けるジェネレータ
+# Yield the family names line by line from the sidecar, or None forever if there is no sidecar
+def read_families(g6_path):
+    path = sidecar_path(g6_path, "fam")
+    if not os.path.exists(path):
+        while True:
+            yield None
+    with lzma.open(path, "rt") as f:
+        for line in f:
+            line = line.strip()
+            yield [] if line == "-" else line.split(",")
+
+
+# ストア全体の (graph6 行, 座標 or None, 族名のリスト or None) を読み出すジェネレータ（edges を指定するとその辺数だけ）
+# Generator yielding (graph6 line, coordinates or None, family names or None) for the whole store
+# (only the graphs with an edge count in edges, if given)
+def read_store_with_families(input_dir, n, edges=None):
+    for path in require_input_files(input_dir, n, edges):
+        xy = read_coords(path)
+        fam = read_families(path)
+        for line in read_graph6(path):
+            pos, families = next(xy), next(fam)
+            if edges is None or graph6_edge_count(line) in edges:
+                yield line, pos, families
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tag the graphs of a polyhedral store with their families.")
+    parser.add_argument("input_dir", help="input directory name (e.g., d3cpt)")
+    parser.add_argument("n", type=int, help="number of vertices (e.g., 11)")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="number of worker processes (default: 1)")
+    parser.add_argument("--curated-dir", default=CURATED_DIR, help="directory of curated family JSON files")
+    parser.add_argument("--no-labelg", action="store_true", help="use the Python canonicaliser even if labelg exists")
+    args = parser.parse_args()
+
+    use_labelg = not args.no_labelg
+    print(f"Canonical forms computed by: {canonicalizer_name(use_labelg)}")
+    try:
+        totals = classify_store(args.input_dir, args.n, args.jobs, args.curated_dir, use_labelg)
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        exit(1)
+
+    # 族ごとの個数を表示
+    # Print the number of graphs per family
+    for family, count in sorted(totals.items()):
+        print(f"{family}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,54 +4,78 @@ import subprocess   # 外部コマンドの実行に使用 / For running externa
 import lzma         # .xz 圧縮ファイルの読み書きに使用 / For reading and writing .xz compressed files
 import shlex        # コマンドライン文字列をトークンに分割 / For parsing option strings
 import os           # ディレクトリ操作に使用 / For directory handling
+import argparse     # コマンドライン引数の解析 / For parsing command-line arguments
+from store import partition_path, remove_store  # 辺数で分けた配置 / For the layout split by edge count
 
-# geng に渡す追加オプションを受け取る
-# Prompt user for geng options
-opt_str = input("Enter geng options (e.g., -c -d3): ")
-geng_options = shlex.split(opt_str)  # 空白で区切ってリストに変換 / Split options string into list
-
-# オプションを変換：大文字なら x を付けて小文字化（例: -F → xf
-# Convert options: uppercase becomes 'x' + lowercase (e.g., -F → xf)
-converted_opts = []
-for opt in geng_options:
-    if opt.startswith('-'):
-        opt_body = opt[1:]  # '-' を除去 / Remove leading '-'
-        new_opt = ''
-        for ch in opt_body:
-            if ch.isupper():
-                new_opt += 'x' + ch.lower()  # 大文字 → 'x' + 小文字 / Uppercase → 'x' + lowercase
-            else:
-                new_opt += ch  # 小文字はそのまま / Keep lowercase as is
-        converted_opts.append(new_opt)
-    else:
-        converted_opts.append(opt)  # '-' で始まらない文字列はそのまま / Keep unprefixed items as is
-
-# 変換後オプションを逆順にソートし、連結（例: ['c', 'd3', 'xf'] → 'xfd3c'）
-# Sort reversed and concatenate (e.g., ['c', 'd3', 'xf'] → 'xfd3c')
-base_dir = ''.join(sorted(converted_opts, reverse=True))
-
-# 出力用ディレクトリを作成 / Create output directory
-os.makedirs(base_dir, exist_ok=True)
-
-# ループ処理か単体処理かを選択
-# Ask user whether to run for a single n or a loop range
-single_mode = input("Run in single-n mode? (y/n): ").strip().lower() == "y"
-
-if single_mode:
-    # 頂点数をユーザー入力から受け取る
-    # Prompt user for the number of vertices
-    n = int(input("Enter the number of vertices (>= 4): "))
-    max_n = n
-    min_n = n
-else:
-    # 最大頂点数をユーザー入力から受け取る
-    # Prompt user for the maximum number of vertices to process
-    max_n = int(input("Enter the maximum number of vertices (>= 4): "))
-    min_n = 4
-
-# ループ開始 / Begin loop
-for n in range(min_n, max_n + 1):
-    print(f"Generating n = {n} graphs ...")
+
+# geng の辺数範囲 "MINE:MAXE"（または辺数ちょうどの "M"）を (mine, maxe) にする関数
+# Parse a geng edge range "MINE:MAXE" (or "M" for exactly M edges) into (mine, maxe)
+def parse_edge_range(spec):
+    lo, sep, hi = spec.partition(":")
+    try:
+        edge_range = (int(lo), int(hi) if sep else int(lo))
+    except ValueError:
+        raise ValueError(f"Invalid edge range: {spec} (expected MINE:MAXE, e.g. 12:18)") from None
+    if edge_range[0] < 0 or edge_range[0] > edge_range[1]:
+        raise ValueError(f"Invalid edge range: {spec} (expected 0 <= MINE <= MAXE)")
+    return edge_range
+
+
+# geng オプションから出力ディレクトリ名を作る関数（辺数範囲があれば末尾に e{mine}-{maxe} を付ける）
+# Build the output directory name from the geng options (with e{mine}-{maxe} appended for an edge range)
+def option_dir_name(geng_options, edge_range=None):
+    # オプションを変換：大文字なら x を付けて小文字化（例: -F → xf
+    # Convert options: uppercase becomes 'x' + lowercase (e.g., -F → xf)
+    converted_opts = []
+    for opt in geng_options:
+        if opt.startswith('-'):
+            opt_body = opt[1:]  # '-' を除去 / Remove leading '-'
+            new_opt = ''
+            for ch in opt_body:
+                if ch.isupper():
+                    new_opt += 'x' + ch.lower()  # 大文字 → 'x' + 小文字 / Uppercase → 'x' + lowercase
+                else:
+                    new_opt += ch  # 小文字はそのまま / Keep lowercase as is
+            converted_opts.append(new_opt)
+        else:
+            converted_opts.append(opt)  # '-' で始まらない文字列はそのまま / Keep unprefixed items as is
+
+    # 変換後オプションを逆順にソートし、連結（例: ['c', 'd3', 'xf'] → 'xfd3c'）
+    # Sort reversed and concatenate (e.g., ['c', 'd3', 'xf'] → 'xfd3c')
+    name = ''.join(sorted(converted_opts, reverse=True))
+    if edge_range is not None:
+        name += f"e{edge_range[0]}-{edge_range[1]}"
+    return name
+
+
+# geng を実行し、n 頂点のグラフを base_dir/n{n}.g6.xz に保存する関数（edge_range=(mine, maxe) で辺数を制限）
+# partition_edges なら辺数 m ごとに geng を m:m で実行し、base_dir/n{n}/m{m}/ に直接書く（partition.py と同じ配置）
+# Run geng and save the graphs on n vertices to base_dir/n{n}.g6.xz (edge_range=(mine, maxe) bounds the edges)
+# With partition_edges, run geng with m:m for every edge count m and write base_dir/n{n}/m{m}/ directly
+# (the layout of partition.py)
+def generate(geng_options, n, base_dir=None, edge_range=None, partition_edges=False):
+    if isinstance(geng_options, str):
+        geng_options = shlex.split(geng_options)  # 空白で区切ってリストに変換 / Split options string into list
+    if base_dir is None:
+        base_dir = option_dir_name(geng_options, edge_range)
+
+    # 出力用ディレクトリを作成 / Create output directory
+    os.makedirs(base_dir, exist_ok=True)
+
+    if partition_edges:
+        remove_store(base_dir, n)
+        lo, hi = edge_range if edge_range is not None else (0, n * (n - 1) // 2)
+        total = 0
+        for m in range(lo, hi + 1):
+            output_path = partition_path(base_dir, n, m)
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            count = run_geng(["geng"] + list(geng_options) + [str(n), f"{m}:{m}"], output_path)
+            if count == 0:
+                # 空のサブストアは残さない / Do not keep empty sub-stores
+                os.remove(output_path)
+                os.rmdir(os.path.dirname(output_path))
+            total += count
+        return os.path.join(base_dir, f"n{n}"), total
 
     # 出力ファイルのパス（.g6.xz 形式で保存）
     # Construct output file path (compressed graph6 format)
@@ -59,8 +83,15 @@ for n in range(min_n, max_n + 1):
 
     # geng コマンドを構築（ユーザー指定オプション + 頂点数）
     # Build geng command using user-specified options + vertex count
-    geng_cmd = ["geng"] + geng_options + [str(n)]
+    geng_cmd = ["geng"] + list(geng_options) + [str(n)]
+    if edge_range is not None:
+        geng_cmd.append(f"{edge_range[0]}:{edge_range[1]}")  # 辺数範囲 mine:maxe / Edge range mine:maxe
+    return output_path, run_geng(geng_cmd, output_path)
 
+
+# geng コマンドを実行し、出力を output_path に .xz で保存してグラフ数を返す関数
+# Run a geng command, save its output to output_path as .xz and return the number of graphs
+def run_geng(geng_cmd, output_path):
     # geng を実行し、その出力をそのまま圧縮ファイルに保存
     # Run geng and directly pipe its output into a compressed file
     with lzma.open(output_path, mode="wt") as f_out:
@@ -85,6 +116,37 @@ for n in range(min_n, max_n + 1):
         proc.stdout.close()   # 出力ストリームを閉じる / Close output stream
         proc.wait()           # geng の終了を待つ / Wait for geng to finish
 
-    # 結果を出力
-    # Print results
-    print(f"  -> Saved {count} graphs to {output_path}")
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate graphs with geng into {options}/n{n}.g6.xz.")
+    parser.add_argument("n", type=int, help="number of vertices (>= 4); the maximum when --min-n is given")
+    parser.add_argument("--options", default="", help='geng options, e.g. --options="-c -d3"')
+    parser.add_argument("--min-n", type=int, help="generate every n from MIN_N up to n (e.g., 4)")
+    parser.add_argument("--output-dir", help="output directory (default: derived from the options)")
+    parser.add_argument("--edges", help="edge range MINE:MAXE (as in geng)")
+    parser.add_argument("--partition-edges", action="store_true",
+                        help="write one sub-store per edge count, {dir}/n{n}/m{m}/ (see partition.py)")
+    args = parser.parse_args()
+
+    min_n = args.n if args.min_n is None else args.min_n
+    edge_range = None
+    if args.edges:
+        try:
+            edge_range = parse_edge_range(args.edges)
+        except ValueError as e:
+            parser.error(str(e))
+
+    # ループ開始 / Begin loop
+    for n in range(min_n, args.n + 1):
+        print(f"Generating n = {n} graphs ...")
+        output_path, count = generate(args.options, n, args.output_dir, edge_range, args.partition_edges)
+
+        # 結果を出力
+        # Print results
+        print(f"  -> Saved {count} graphs to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
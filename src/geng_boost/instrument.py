@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+
+import os       # 環境変数・ファイルサイズの取得 / For environment variables and file sizes
+import json     # JSON-lines 形式のトレース出力 / For writing the JSON-lines trace
+import time     # 経過時間の計測 / For measuring elapsed time
+
+# 計測は任意：--trace または環境変数 PIPELINE_TRACE にトレースファイルを指定したときだけ有効になる
+# Instrumentation is opt-in: it is enabled only when --trace or PIPELINE_TRACE names a trace file
+#   例 / e.g.  python triconnected.py d3cp 11 --trace trace.jsonl
+TRACE_ENV = "PIPELINE_TRACE"
+
+# 進捗を出力する間隔（秒）/ Interval between progress records (seconds)
+PROGRESS_INTERVAL = float(os.environ.get("PIPELINE_TRACE_INTERVAL", "10"))
+
+
+class _Phase:
+    """
+    1 つのフェーズの経過時間を積算するコンテキストマネージャ
+    A context manager accumulating the elapsed time of one phase.
+    """
+    __slots__ = ("tracer", "name", "start")
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.add_time(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Tracer:
+    """
+    フェーズ別タイマ・カウンタ・進捗（スループットと ETA）を JSON-lines で記録するクラス
+    A class recording per-phase timers, counters and progress (throughput and ETA) as JSON lines.
+    """
+    def __init__(self, path, stage, interval=PROGRESS_INTERVAL):
+        # 複数ステージで同じファイルを共有できるよう追記モードで開く
+        # Open in append mode so that several stages can share one trace file
+        self.out = open(path, "a")
+        self.stage = stage
+        self.interval = interval
+        self.t0 = time.perf_counter()
+        self.last_progress = self.t0
+
+        self.timers = {}    # フェーズ名 → 積算秒数 / Phase name → accumulated seconds
+        self.calls = {}     # フェーズ名 → 呼び出し回数 / Phase name → number of calls
+        self.counters = {}  # カウンタ名 → 値 / Counter name → value
+
+        # 進捗計算用の状態 / State used for progress computation
+        self.items = 0
+        self.total_items = None
+        self.total_bytes = 0
+        self.done_bytes = 0
+        self.raw = None
+        self.raw_size = 0
+
+        self.emit("start", pid=os.getpid())
+
+    def emit(self, event, **fields):
+        record = {"t": round(time.perf_counter() - self.t0, 6), "stage": self.stage, "event": event}
+        record.update(fields)
+        self.out.write(json.dumps(record) + "\n")
+        self.out.flush()
+
+    def phase(self, name):
+        return _Phase(self, name)
+
+    def add_time(self, name, seconds):
+        self.timers[name] = self.timers.get(name, 0.0) + seconds
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def timed_iter(self, iterable, name):
+        # 反復の各 next() にかかった時間を name フェーズに積算する
+        # Accumulate the time spent in each next() of the iterable under the phase name
+        it = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                value = next(it)
+            except StopIteration:
+                self.add_time(name, time.perf_counter() - start)
+                return
+            self.add_time(name, time.perf_counter() - start)
+            yield value
+
+    def count(self, name, k=1):
+        self.counters[name] = self.counters.get(name, 0) + k
+
+    def begin(self, paths=None, total_items=None):
+        # ETA の基準として、入力ファイルの総バイト数または総件数を設定する
+        # Set the total input bytes or total items used as the basis of the ETA
+        if paths:
+            self.total_bytes = sum(os.path.getsize(p) for p in paths)
+        self.total_items = total_items
+
+    def open_input(self, path):
+        # 圧縮ファイルを生のバイナリとして開き、読み込み位置から進捗を求められるようにする
+        # Open the compressed file as raw binary so progress can be derived from its position
+        self.end_input()
+        self.raw = open(path, "rb")
+        self.raw_size = os.path.getsize(path)
+        self.emit("file", path=path, bytes=self.raw_size)
+        return self.raw
+
+    def end_input(self):
+        if self.raw is not None:
+            self.done_bytes += self.raw_size
+            self.raw.close()
+            self.raw = None
+
+    def tick(self, k=1):
+        self.items += k
+        if self.items & 0x3ff == 0 or k > 1:
+            now = time.perf_counter()
+            if now - self.last_progress >= self.interval:
+                self.last_progress = now
+                self.progress(now)
+
+    def progress(self, now=None):
+        now = now or time.perf_counter()
+        elapsed = now - self.t0
+        fraction = None
+        if self.total_items:
+            fraction = self.items / self.total_items
+        elif self.total_bytes:
+            done = self.done_bytes
+            if self.raw is not None:
+                done += self.raw.tell()
+            fraction = done / self.total_bytes
+        eta = elapsed * (1 - fraction) / fraction if fraction else None
+        self.emit("progress",
+                  items=self.items,
+                  rate=round(self.items / elapsed, 1) if elapsed else None,
+                  fraction=round(fraction, 4) if fraction is not None else None,
+                  eta=round(eta, 1) if eta is not None else None,
+                  timers={k: round(v, 6) for k, v in self.timers.items()})
+
+    def close(self):
+        self.end_input()
+        elapsed = time.perf_counter() - self.t0
+        self.emit("summary",
+                  items=self.items,
+                  elapsed=round(elapsed, 6),
+                  timers={k: round(v, 6) for k, v in self.timers.items()},
+                  calls=self.calls,
+                  counters=self.counters)
+        self.out.close()
+
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class NullTracer:
+    """
+    計測が無効なときに使う、何もしない Tracer
+    A Tracer that does nothing, used when instrumentation is disabled.
+    """
+    _phase = _NullPhase()
+
+    def emit(self, event, **fields):
+        pass
+
+    def phase(self, name):
+        return self._phase
+
+    def add_time(self, name, seconds):
+        pass
+
+    def timed_iter(self, iterable, name):
+        return iterable
+
+    def count(self, name, k=1):
+        pass
+
+    def begin(self, paths=None, total_items=None):
+        pass
+
+    def open_input(self, path):
+        # 計測しないときはパスをそのまま返し、lzma.open に開かせる
+        # Without instrumentation, hand the path straight to lzma.open
+        return path
+
+    def end_input(self):
+        pass
+
+    def tick(self, k=1):
+        pass
+
+    def progress(self, now=None):
+        pass
+
+    def close(self):
+        pass
+
+
+# 指定されたパス（なければ環境変数）に応じて Tracer または NullTracer を返す関数
+# Return a Tracer or a NullTracer depending on the given path (or the environment)
+def get_tracer(stage, path=None):
+    path = path or os.environ.get(TRACE_ENV)
+    return Tracer(path, stage) if path else NullTracer()
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+
+import os                   # ファイル・ディレクトリ操作 / For file and directory handling
+import json                 # チャンクごとの集計結果の保存 / For saving per-chunk counting results
+import time                 # リースの期限とハートビート / For lease expiry and heartbeats
+import socket               # ワーカー ID のホスト名 / Host name for the worker id
+import threading            # ハートビートのスレッド / For the heartbeat thread
+import argparse             # コマンドライン引数の解析 / For parsing command-line arguments
+from collections import defaultdict  # 次数分布の集計 / For counting degree patterns
+from multiprocessing import Process  # ローカルで複数ワーカーを起動 / For starting several local workers
+from coords import sidecar_path  # 座標サイドカーのパス / Path of the coordinate sidecar
+from degree import parse_constraints  # 次数条件の解析 / For parsing degree constraints
+from scheduler import STAGE_SUFFIX  # ステージの出力ディレクトリの接尾辞 / Output directory suffix of each stage
+from store import require_input_files, stage_files  # 入出力ファイルの対応付け / For pairing input and output files
+import planar, triconnected, degree, count_degree_patterns  # 各ステージの処理 / The stages themselves
+
+# ファイルベースの分散ジョブキュー：チャンク配置 {dir}/n{n}/*.g6.xz の各チャンクを、共有ファイルシステム上の
+# ロックファイル（O_EXCL で作成するリース）で 1 つのワーカーに貸し出す。ワーカーは処理中にリースの
+# 更新時刻を定期的に更新（ハートビート）し、期限 lease_seconds を過ぎたリースは他のワーカーが奪える。
+# 出力は一時ファイルに書いてから os.replace で置き換えるので、同じチャンクを 2 回処理しても結果は同じ（冪等）。
+# 複数のマシンで同じコマンドを実行すれば、1 つのステージを一緒に処理できる（-j でローカルに複数起動）。
+# File-based distributed job queue: every chunk of the layout {dir}/n{n}/*.g6.xz is leased to one worker
+# through a lock file created with O_EXCL on a shared filesystem. Workers refresh the modification time of
+# their lease while processing (heartbeat), and a lease older than lease_seconds may be taken over by another
+# worker. Outputs are written to temporary files and moved into place with os.replace, so processing a chunk
+# twice gives the same result (idempotent). Running the same command on several machines drains one stage
+# together (-j starts several local workers).
+#   例 / e.g.  python jobqueue.py planar d3c 13 --drawing        (on every node)
+#              python jobqueue.py count_degree_patterns d3cpt 13 -j 4
+#              python jobqueue.py planar d3c 13 --status
+# 注：期限の判定はファイルの更新時刻と各ノードの時計を比べるので、lease_seconds は時計のずれより十分長くする。
+# Note: expiry compares file modification times with the local clock, so keep lease_seconds well above the
+# clock skew between nodes.
+
+# 対応するステージ / Supported stages
+STAGES = ("planar", "triconnected", "degree", "count_degree_patterns")
+
+# 既定のリース期限（秒）/ Default lease duration (seconds)
+LEASE_SECONDS = 120
+
+# 空きチャンクがないときに待つ時間（秒）/ Seconds to wait when no chunk is available
+POLL_SECONDS = 5
+
+
+# このプロセスのワーカー ID（ホスト名-PID）/ Worker id of this process (host-pid)
+def worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class LeaseQueue:
+    """
+    キューディレクトリのロックファイルでチャンクを貸し出すキュー
+    A queue leasing chunks through lock files in a queue directory.
+      {chunk}.lease : 処理中（中身はワーカー ID、更新時刻がハートビート）/ In progress (worker id; mtime is the heartbeat)
+      {chunk}.done  : 完了 / Completed
+    """
+    def __init__(self, queue_dir, chunks, lease_seconds=LEASE_SECONDS, worker=None):
+        self.queue_dir = queue_dir
+        self.chunks = list(chunks)
+        self.lease_seconds = lease_seconds
+        self.worker = worker or worker_id()
+        os.makedirs(queue_dir, exist_ok=True)
+
+    def _path(self, chunk, kind):
+        return os.path.join(self.queue_dir, f"{chunk}.{kind}")
+
+    def is_done(self, chunk):
+        return os.path.exists(self._path(chunk, "done"))
+
+    def _expired(self, lease_path):
+        try:
+            return time.time() - os.path.getmtime(lease_path) > self.lease_seconds
+        except FileNotFoundError:
+            return False
+
+    # リースを作る（既にあれば False）/ Create the lease (False if it already exists)
+    def _create(self, chunk):
+        try:
+            fd = os.open(self._path(chunk, "lease"), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w") as f:
+            f.write(self.worker + "\n")
+        return True
+
+    # 未完了のチャンクを 1 つ借りる（期限切れのリースは奪う）。今借りられるものがなければ None
+    # Lease one unfinished chunk (taking over expired leases); None if nothing is available right now
+    def acquire(self):
+        for chunk in self.chunks:
+            if self.is_done(chunk):
+                continue
+            if self._create(chunk):
+                # 作成直前に他のワーカーが完了させていないかを確かめる
+                # Check that no other worker completed it just before the lease was created
+                if self.is_done(chunk):
+                    self.release(chunk)
+                    continue
+                return chunk
+            lease_path = self._path(chunk, "lease")
+            try:
+                seen = os.stat(lease_path).st_mtime_ns
+            except FileNotFoundError:
+                continue
+            if time.time() - seen / 1e9 > self.lease_seconds:
+                # 期限切れのリースを別名に移す（rename は 1 つのワーカーしか成功しない）
+                # Move the expired lease aside (only one worker's rename can succeed)
+                stale_path = f"{lease_path}.stale-{self.worker}"
+                try:
+                    os.rename(lease_path, stale_path)
+                except FileNotFoundError:
+                    continue
+
+                # 確かめてから移すまでの間に、別のワーカーが奪い直したかハートビートが再開していれば、
+                # 移したのは生きているリースなので元に戻す（link は既にあれば失敗する）
+                # If another worker took the lease over or its heartbeat resumed between the check and the
+                # rename, the moved lease is alive, so put it back (link fails if a lease exists again)
+                if os.stat(stale_path).st_mtime_ns != seen:
+                    try:
+                        os.link(stale_path, lease_path)
+                    except FileExistsError:
+                        pass
+                    os.remove(stale_path)
+                    continue
+                os.remove(stale_path)
+                if self._create(chunk):
+                    print(f"Took over expired lease: {chunk}")
+                    return chunk
+        return None
+
+    # リースの更新時刻を今にする / Refresh the modification time of the lease
+    def heartbeat(self, chunk):
+        try:
+            os.utime(self._path(chunk, "lease"))
+        except FileNotFoundError:
+            pass
+
+    # 完了を記録してリースを返す / Mark the chunk as done and give the lease back
+    def complete(self, chunk):
+        with open(self._path(chunk, "done"), "w") as f:
+            f.write(self.worker + "\n")
+        self.release(chunk)
+
+    def release(self, chunk):
+        try:
+            os.remove(self._path(chunk, "lease"))
+        except FileNotFoundError:
+            pass
+
+    # 完了・処理中・期限切れ・未着手のチャンク数 / Number of done, leased, expired and pending chunks
+    def status(self):
+        counts = {"done": 0, "leased": 0, "expired": 0, "pending": 0}
+        for chunk in self.chunks:
+            lease_path = self._path(chunk, "lease")
+            if self.is_done(chunk):
+                counts["done"] += 1
+            elif not os.path.exists(lease_path):
+                counts["pending"] += 1
+            elif self._expired(lease_path):
+                counts["expired"] += 1
+            else:
+                counts["leased"] += 1
+        return counts
+
+    def all_done(self):
+        return all(self.is_done(chunk) for chunk in self.chunks)
+
+
+class Heartbeat:
+    """
+    処理中のチャンクのリースを別スレッドで定期的に更新するコンテキストマネージャ
+    Context manager refreshing the lease of the chunk in progress on a background thread.
+    """
+    def __init__(self, queue, chunk):
+        self.queue = queue
+        self.chunk = chunk
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self.stopped.wait(self.queue.lease_seconds / 4):
+            self.queue.heartbeat(self.chunk)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stopped.set()
+        self.thread.join()
+        return False
+
+
+# 入力ファイルのパスからチャンク名を作る（例: n13/00012.g6.xz → n13__00012）
+# Chunk name of an input path (e.g., n13/00012.g6.xz → n13__00012)
+def chunk_name(input_dir, input_path):
+    return os.path.relpath(input_path, input_dir)[:-len(".g6.xz")].replace(os.sep, "__")
+
+
+# 1 つのチャンクを一時ファイルに処理し、os.replace で出力を置き換える関数（何度実行しても同じ結果）
+# Process one chunk into temporary files and move the outputs into place with os.replace (idempotent)
+def run_chunk(stage, input_path, output_path, n, params, worker):
+    if stage == "count_degree_patterns":
+        counter = defaultdict(int)
+        count_degree_patterns.count_file(input_path, counter)
+        tmp_path = f"{output_path}.tmp-{worker}"
+        with open(tmp_path, "w") as f:
+            json.dump([[list(map(list, pattern)), count] for pattern, count in counter.items()], f)
+        os.replace(tmp_path, output_path)
+        return
+
+    # 一時ファイルは "." で始まる名前にして、チャンクの一覧（store.py）に入らないようにする
+    # Temporary files get a name starting with "." so that chunk listings (store.py) skip them
+    tmp_path = os.path.join(os.path.dirname(output_path), f".tmp-{worker}-{os.path.basename(output_path)}")
+    if stage == "planar":
+        planar.process_file(input_path, tmp_path, n, params.get("write_drawing", False))
+    elif stage == "triconnected":
+        triconnected.process_file(input_path, tmp_path, n)
+    else:
+        degree.process_file(input_path, tmp_path, n, params["degree_conditions"])
+
+    # 座標サイドカーを先に置き換え、最後に本体を置き換える
+    # Move the coordinate sidecar first and the graph6 file last
+    if os.path.exists(sidecar_path(tmp_path)):
+        os.replace(sidecar_path(tmp_path), sidecar_path(output_path))
+    os.replace(tmp_path, output_path)
+
+
+# ステージの (入力, 出力) の組とキューディレクトリを求める関数
+# （count_degree_patterns の出力はキューディレクトリ内のチャンクごとの JSON）
+# Return the (input, output) pairs of a stage and its queue directory
+# (for count_degree_patterns, the outputs are per-chunk JSON files in the queue directory)
+def stage_plan(stage, input_dir, n, output_dir=None, queue_dir=None):
+    if stage == "count_degree_patterns":
+        queue_dir = queue_dir or os.path.join(input_dir, f".queue-count-n{n}")
+        pairs = [(path, os.path.join(queue_dir, chunk_name(input_dir, path) + ".json"))
+                 for path in require_input_files(input_dir, n)]
+    else:
+        output_dir = output_dir or input_dir + STAGE_SUFFIX[stage]
+        queue_dir = queue_dir or os.path.join(output_dir, f".queue-n{n}")
+        pairs = stage_files(input_dir, output_dir, n)
+    return pairs, queue_dir
+
+
+# キューが空になるまでチャンクを借りて処理するワーカー（処理したチャンク数を返す）
+# Worker leasing and processing chunks until the queue is drained (returns the number of chunks processed)
+def work(stage, input_dir, n, output_dir=None, queue_dir=None, params=None, lease_seconds=LEASE_SECONDS):
+    params = params or {}
+    pairs, queue_dir = stage_plan(stage, input_dir, n, output_dir, queue_dir)
+    outputs = {chunk_name(input_dir, input_path): (input_path, output_path) for input_path, output_path in pairs}
+    queue = LeaseQueue(queue_dir, outputs, lease_seconds)
+
+    processed = 0
+    while not queue.all_done():
+        chunk = queue.acquire()
+        if chunk is None:
+            # 残りはすべて他のワーカーが処理中：期限切れになるか完了するまで待つ
+            # Everything left is leased by other workers: wait until they finish or expire
+            time.sleep(min(POLL_SECONDS, lease_seconds / 4))
+            continue
+        input_path, output_path = outputs[chunk]
+        print(f"[{queue.worker}] Processing: {input_path}")
+        with Heartbeat(queue, chunk):
+            run_chunk(stage, input_path, output_path, n, params, queue.worker)
+        queue.complete(chunk)
+        processed += 1
+    return processed
+
+
+# count_degree_patterns のチャンクごとの結果をまとめる関数 / Merge the per-chunk results of count_degree_patterns
+def merge_counts(input_dir, n, queue_dir=None):
+    pairs, _ = stage_plan("count_degree_patterns", input_dir, n, queue_dir=queue_dir)
+    counter = {}
+    for _, result_path in pairs:
+        with open(result_path) as f:
+            for pattern, count in json.load(f):
+                key = tuple(tuple(pair) for pair in pattern)
+                counter[key] = counter.get(key, 0) + count
+    return counter
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drain a chunked stage together with other workers via lease files.")
+    parser.add_argument("stage", choices=STAGES, help="stage to run")
+    parser.add_argument("input_dir", help="input directory name (e.g., d3c)")
+    parser.add_argument("n", type=int, help="number of vertices (e.g., 13)")
+    parser.add_argument("--output-dir", help="output directory (default: input_dir + stage suffix)")
+    parser.add_argument("--queue-dir", help="directory of the lease files (default: inside the output directory)")
+    parser.add_argument("--lease-seconds", type=float, default=LEASE_SECONDS,
+                        help=f"seconds without heartbeat before a lease expires (default: {LEASE_SECONDS})")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="number of local worker processes (default: 1)")
+    parser.add_argument("--drawing", action="store_true", help="planar: also save straight-line drawing coordinates")
+    parser.add_argument("-c", "--constraint", action="append", default=[], metavar="DEG:COUNT",
+                        help="degree: degree constraint, e.g. -c n-2:2 (repeatable)")
+    parser.add_argument("--status", action="store_true", help="only print the state of the queue")
+    args = parser.parse_args()
+
+    params = {"write_drawing": args.drawing}
+    if args.stage == "degree":
+        try:
+            params["degree_conditions"] = parse_constraints(args.constraint, args.n)
+        except ValueError as e:
+            parser.error(str(e))
+
+    try:
+        pairs, queue_dir = stage_plan(args.stage, args.input_dir, args.n, args.output_dir, args.queue_dir)
+        if args.status:
+            chunks = [chunk_name(args.input_dir, input_path) for input_path, _ in pairs]
+            status = LeaseQueue(queue_dir, chunks, args.lease_seconds).status()
+            print(", ".join(f"{kind}: {count}" for kind, count in status.items()))
+            return
+
+        worker_args = (args.stage, args.input_dir, args.n, args.output_dir, args.queue_dir, params, args.lease_seconds)
+        if args.jobs > 1:
+            workers = [Process(target=work, args=worker_args) for _ in range(args.jobs)]
+            for p in workers:
+                p.start()
+            for p in workers:
+                p.join()
+        else:
+            work(*worker_args)
+
+        if args.stage == "count_degree_patterns":
+            count_degree_patterns.print_report(merge_counts(args.input_dir, args.n, args.queue_dir))
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+
+import os                   # ファイル・ディレクトリ操作 / For file and directory handling
+import ast                  # 辺リストの読み取り / For reading edge lists
+import json                 # 索引のメタデータと Cytoscape JSON / For the index metadata and Cytoscape JSON
+import heapq                # ソート済みランの k-way マージ / For k-way merging of sorted runs
+import struct               # 固定長レコード / For fixed-size records
+import tempfile             # 一時ランファイルの保存先 / For temporary run files
+import argparse             # コマンドライン引数の解析 / For parsing command-line arguments
+from multiprocessing import Pool  # 並列処理 / For parallel processing
+from canon import canonical_lines, canonicalizer_name, encode_graph6  # graph6 の正準化 / graph6 canonicalisation
+from draw import PER_PAGE   # draw.py の 1 ページあたりのグラフ数 / Graphs per page of draw.py
+from families import json_to_graph6  # Cytoscape JSON → graph6 / Cytoscape JSON to graph6
+from setop import write_run, read_run  # ランファイルの読み書き / For reading and writing run files
+from store import require_input_files, read_graph6  # ストアの読み込み / For reading stores
+
+# 正準形による点検索の索引：ストア {dir}/n{n} の各グラフについて (正準形, チャンク番号, チャンク内の行番号,
+# 通し番号) の固定長レコードを正準形の順に並べたファイル {dir}/n{n}.index と、チャンクの一覧などを持つ
+# {dir}/n{n}.index.json を作る。検索は二分探索（ファイルを読み込まずに seek する）なので、
+# 任意のラベル付けのグラフ（graph6・辺リスト・Cytoscape JSON）がストアにあるか、何番目（draw.py のページ）かが
+# 全体を展開せずに分かる。索引の作成はチャンクごとに並列に正準化・ソートしてから k-way マージする。
+# Point-lookup index by canonical form: for every graph of the store {dir}/n{n}, fixed-size records
+# (canonical form, chunk number, line within the chunk, global index) sorted by canonical form are written to
+# {dir}/n{n}.index, with the chunk list and so on in {dir}/n{n}.index.json. Lookups binary-search the file
+# (seeking, without loading it), so whether a graph in any labelling (graph6, edge list or Cytoscape JSON)
+# is in the store, and at which index (and draw.py page), is known without decompressing the store.
+# The index is built by canonicalising and sorting each chunk in parallel, followed by a k-way merge.
+#   例 / e.g.  python lookup.py build xtd3cpt 12 -j 8
+#              python lookup.py query xtd3cpt 12 'K?zDHc~' graph_viewer/json/prism/n12/1.json
+
+# 1 つのランにメモリ上でソートする行数 / Lines sorted in memory per run
+RUN_SIZE = 200000
+
+# レコードの後半：チャンク番号・チャンク内の行番号・通し番号（0 始まり）
+# Tail of a record: chunk number, line within the chunk and global index (0-based)
+RECORD_TAIL = struct.Struct("<IIQ")
+
+
+# 索引ファイルとメタデータのパス / Paths of the index file and its metadata
+def index_paths(input_dir, n):
+    base = os.path.join(input_dir, f"n{n}.index")
+    return base, base + ".json"
+
+
+# n 頂点の graph6 の長さ（n <= 62）/ Length of a graph6 string on n vertices (n <= 62)
+def graph6_length(n):
+    return 1 + (n * (n - 1) // 2 + 5) // 6
+
+
+# 1 つのチャンクを正準化し、(正準形 チャンク番号 行番号) のソート済みランを書く関数（並列に呼ばれる）
+# Canonicalise one chunk and write sorted runs of "canonical chunk line" (called in parallel)
+def index_chunk(args):
+    chunk, path, tmp_dir, use_labelg, run_size = args
+    runs = []
+    buffer = []
+    count = 0
+    for count, canonical in enumerate(canonical_lines(read_graph6(path), use_labelg), 1):
+        buffer.append((canonical, count - 1))
+        if len(buffer) >= run_size:
+            buffer.sort()
+            runs.append(write_run((f"{c} {chunk} {line}" for c, line in buffer), tmp_dir))
+            buffer = []
+    if buffer:
+        buffer.sort()
+        runs.append(write_run((f"{c} {chunk} {line}" for c, line in buffer), tmp_dir))
+    return chunk, runs, count
+
+
+# ストア input_dir の n 頂点グラフの索引を作る関数（索引ファイルのパスとグラフ数を返す）
+# Build the index of the graphs on n vertices of input_dir (returns the index path and the number of graphs)
+def build_index(input_dir, n, jobs=1, use_labelg=True, run_size=RUN_SIZE):
+    paths = require_input_files(input_dir, n)
+    index_path, meta_path = index_paths(input_dir, n)
+    key_length = graph6_length(n)
+
+    with tempfile.TemporaryDirectory(dir=input_dir) as tmp_dir:
+        # チャンクごとに並列に正準化・ソート / Canonicalise and sort every chunk in parallel
+        tasks = [(chunk, path, tmp_dir, use_labelg, run_size) for chunk, path in enumerate(paths)]
+        runs = []
+        counts = [0] * len(paths)
+        with Pool(jobs) as pool:
+            for chunk, chunk_runs, count in pool.imap_unordered(index_chunk, tasks):
+                runs += chunk_runs
+                counts[chunk] = count
+                print(f"  -> {paths[chunk]}: {count} graphs")
+
+        # 各チャンクの先頭の通し番号 / Global index of the first graph of every chunk
+        starts = [0] * len(paths)
+        for chunk in range(1, len(paths)):
+            starts[chunk] = starts[chunk - 1] + counts[chunk - 1]
+
+        # k-way マージして固定長レコードに書く（一時ファイルに書いてから置き換える）
+        # k-way merge into fixed-size records (written to a temporary file, then moved into place)
+        tmp_index = os.path.join(tmp_dir, "index")
+        with open(tmp_index, "wb") as f_out:
+            for record in heapq.merge(*[read_run(path) for path in runs]):
+                canonical, chunk, line = record.split()
+                chunk, line = int(chunk), int(line)
+                f_out.write(canonical.encode().ljust(key_length) + RECORD_TAIL.pack(chunk, line, starts[chunk] + line))
+        os.replace(tmp_index, index_path)
+
+    meta = {
+        "n": n,
+        "count": sum(counts),
+        "key_length": key_length,
+        "canonicalizer": canonicalizer_name(use_labelg),
+        "chunks": [{"path": os.path.relpath(path, input_dir), "size": os.path.getsize(path), "count": count}
+                   for path, count in zip(paths, counts)],
+    }
+    with open(meta_path, "w") as f:
+        json.dump(meta, f, indent=2)
+    return index_path, meta["count"]
+
+
+class StoreIndex:
+    """
+    索引ファイルを二分探索で引くクラス（索引がストアより古ければ ValueError）
+    A class looking up the index file by binary search (ValueError if the index is older than the store).
+    """
+    def __init__(self, input_dir, n):
+        index_path, meta_path = index_paths(input_dir, n)
+        if not os.path.exists(meta_path):
+            raise FileNotFoundError(f"No index for n={n} in {input_dir} (run: lookup.py build {input_dir} {n})")
+        with open(meta_path) as f:
+            self.meta = json.load(f)
+        self.input_dir = input_dir
+        self.chunks = [chunk["path"] for chunk in self.meta["chunks"]]
+        self.key_length = self.meta["key_length"]
+        self.record_size = self.key_length + RECORD_TAIL.size
+        self.count = self.meta["count"]
+
+        # ストアのチャンクが索引を作ったときと同じか確かめる
+        # Check that the chunks of the store are the ones the index was built from
+        current = [(os.path.relpath(path, input_dir), os.path.getsize(path)) for path in require_input_files(input_dir, n)]
+        if current != [(chunk["path"], chunk["size"]) for chunk in self.meta["chunks"]]:
+            raise ValueError(f"The index of n={n} in {input_dir} is out of date (run: lookup.py build {input_dir} {n})")
+        self.use_labelg = self.meta["canonicalizer"] == "labelg"
+        if canonicalizer_name(self.use_labelg) != self.meta["canonicalizer"]:
+            raise ValueError(f"The index was built with {self.meta['canonicalizer']}, which is not available")
+        self.f = open(index_path, "rb")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.f.close()
+
+    def _key(self, i):
+        self.f.seek(i * self.record_size)
+        return self.f.read(self.key_length).rstrip()
+
+    def _record(self, i):
+        self.f.seek(i * self.record_size + self.key_length)
+        chunk, line, global_index = RECORD_TAIL.unpack(self.f.read(RECORD_TAIL.size))
+        return {"chunk": os.path.join(self.input_dir, self.chunks[chunk]), "line": line, "index": global_index,
+                "page": global_index // PER_PAGE + 1, "position": global_index % PER_PAGE + 1}
+
+    # 正準形 canonical の最初のレコードの位置（二分探索）/ Position of the first record >= canonical (binary search)
+    def _lower_bound(self, key):
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    # 正準形に一致するレコードのリスト（同型なものが重複して入っていれば複数）
+    # Records matching a canonical form (several if the store holds isomorphic duplicates)
+    def find(self, canonical):
+        key = canonical.encode()
+        i = self._lower_bound(key)
+        matches = []
+        while i < self.count and self._key(i) == key:
+            matches.append(self._record(i))
+            i += 1
+        return matches
+
+    # 任意のラベル付けの graph6 行の列をまとめて引き、行ごとのレコードのリストを返す
+    # Look up a batch of graph6 lines in any labelling and return the list of records per line
+    def lookup(self, lines):
+        return [self.find(canonical) for canonical in canonical_lines(lines, self.use_labelg)]
+
+
+# 問い合わせ（graph6、"[(1, 2), ...]" の辺リスト、Cytoscape JSON ファイルのパス）を graph6 にする関数
+# Turn a query (graph6, an edge list "[(1, 2), ...]" or the path of a Cytoscape JSON file) into graph6
+def query_graph6(query):
+    query = query.strip()
+    if query.endswith(".json"):
+        with open(query) as f:
+            return json_to_graph6(json.load(f))
+    if query.startswith("["):
+        edges = ast.literal_eval(query)
+        vertices = sorted({v for edge in edges for v in edge})
+        index = {v: i for i, v in enumerate(vertices)}
+        adj = [set() for _ in vertices]
+        for u, v in edges:
+            adj[index[u]].add(index[v])
+            adj[index[v]].add(index[u])
+        return encode_graph6(adj)
+    return query
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query a canonical-form index of a store.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build = subparsers.add_parser("build", help="build {dir}/n{n}.index")
+    build.add_argument("input_dir", help="input directory name (e.g., xtd3cpt)")
+    build.add_argument("n", type=int, help="number of vertices (e.g., 12)")
+    build.add_argument("-j", "--jobs", type=int, default=1, help="number of worker processes (default: 1)")
+    build.add_argument("--no-labelg", action="store_true", help="use the Python canonicaliser even if labelg exists")
+    query = subparsers.add_parser("query", help="look graphs up in {dir}/n{n}.index")
+    query.add_argument("input_dir", help="input directory name (e.g., xtd3cpt)")
+    query.add_argument("n", type=int, help="number of vertices (e.g., 12)")
+    query.add_argument("graphs", nargs="*", help="graph6 strings, edge lists \"[(1, 2), ...]\" or Cytoscape JSON files")
+    query.add_argument("--file", help="read further queries from this file (one per line)")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "build":
+            index_path, count = build_index(args.input_dir, args.n, args.jobs, not args.no_labelg)
+            print(f"Done. {count} graphs indexed in {index_path}")
+            return
+
+        queries = list(args.graphs)
+        if args.file:
+            with open(args.file) as f:
+                queries += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+        with StoreIndex(args.input_dir, args.n) as index:
+            results = index.lookup([query_graph6(q) for q in queries])
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}")
+        exit(1)
+
+    # 問い合わせごとに結果を出力（通し番号は draw.py の "(idx)" と同じ 1 始まり）
+    # Print the result per query (the index is 1-based, as in the "(idx)" captions of draw.py)
+    found = 0
+    for q, matches in zip(queries, results):
+        if not matches:
+            print(f"{q} : not found")
+            continue
+        found += 1
+        for m in matches:
+            print(f"{q} : ({m['index'] + 1}) page {m['page']} position {m['position']}  [{m['chunk']} line {m['line'] + 1}]")
+    print(f"\n{found} of {len(queries)} graphs found in {args.input_dir} n={args.n}")
+
+
+if __name__ == "__main__":
+    main()
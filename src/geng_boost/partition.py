@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+
+import os                   # ファイル・ディレクトリ操作 / For file and directory handling
+import lzma                 # .xz 圧縮ファイルの読み書き / For reading and writing .xz compressed files
+import shutil               # 一時ディレクトリの削除 / For removing the temporary directory
+import argparse             # コマンドライン引数の解析 / For parsing command-line arguments
+from coords import sidecar_path  # サイドカーのパス / Path of the sidecars
+from store import (require_input_files, read_graph6, graph6_edge_count,  # ストアの読み書き / For reading stores
+                   partition_path, remove_store)
+
+# 辺数で分けた配置への書き換え：ストア {dir}/n{n}（単一ファイルまたはチャンク）のグラフを辺数 m ごとの
+# サブストア {dir}/n{n}/m{m}/*.g6.xz に振り分ける。各サブストアの中の順序は元のストアの順序のまま。
+# すべての入力ファイルにあるサイドカー（座標 .xy、族 .fam、面ベクトル .fv、双対 .dual など）は行と一緒に運ぶ。
+# 書き終えてから一時ディレクトリを n{n} に置き換えるので、途中で止まっても元のストアは壊れない。
+# Re-partition by edge count: distribute the graphs of the store {dir}/n{n} (single file or chunks) into
+# sub-stores {dir}/n{n}/m{m}/*.g6.xz, one per edge count m, keeping the store order within each sub-store.
+# Sidecars present for every input file (coordinates .xy, families .fam, face vectors .fv, duals .dual, ...)
+# travel with their lines. A temporary directory replaces n{n} only when complete, so an interrupted run
+# leaves the original store intact.
+#   例 / e.g.  python partition.py d3cpt 11 --lines 50000
+#              python count.py d3cpt 11 --edges 25:27
+
+# 1 チャンクの行数 / Lines per chunk
+CHUNK_LINES = 10000
+
+
+# graph6 ファイルの隣にあるサイドカーの種類（xy, fam, fv, dual, ...）を返す関数
+# Return the kinds of the sidecars next to a graph6 file (xy, fam, fv, dual, ...)
+def sidecar_kinds(g6_path):
+    directory, fname = os.path.split(g6_path)
+    stem = fname[:-len(".g6.xz")] + "."
+    return {name[len(stem):-len(".xz")] for name in os.listdir(directory or ".")
+            if name.startswith(stem) and name.endswith(".xz") and name != fname}
+
+
+class PartitionWriter:
+    """
+    辺数ごとのサブストアに、chunk_lines 行ごとのチャンク（とサイドカー）を書き出すクラス
+    A class writing chunks of chunk_lines lines (and their sidecars) into one sub-store per edge count.
+    """
+    def __init__(self, root, n, kinds, chunk_lines=CHUNK_LINES):
+        self.root = root
+        self.n = n
+        self.kinds = sorted(kinds)
+        self.chunk_lines = chunk_lines
+        self.files = {}     # m → (行数, チャンク番号, {種類: ファイル}) / m → (lines, chunk index, {kind: file})
+        self.counts = {}
+
+    def _open(self, m, index):
+        path = partition_path(self.root, self.n, m, index)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        files = {"g6": lzma.open(path, "wt")}
+        for kind in self.kinds:
+            files[kind] = lzma.open(sidecar_path(path, kind), "wt")
+        return files
+
+    def write(self, m, line, sidecar_lines):
+        lines, index, files = self.files.get(m, (0, -1, None))
+        if files is None or lines >= self.chunk_lines:
+            if files is not None:
+                for f in files.values():
+                    f.close()
+            lines, index, files = 0, index + 1, self._open(m, index + 1)
+        files["g6"].write(line + "\n")
+        for kind in self.kinds:
+            files[kind].write(sidecar_lines[kind].rstrip("\n") + "\n")
+        self.files[m] = (lines + 1, index, files)
+        self.counts[m] = self.counts.get(m, 0) + 1
+
+    # すべてのファイルを閉じ、{辺数: 個数} を返す / Close every file and return {edge count: count}
+    def close(self):
+        for _, _, files in self.files.values():
+            for f in files.values():
+                f.close()
+        return dict(sorted(self.counts.items()))
+
+
+# ストア input_dir の n 頂点グラフを output_dir/n{n}/m{m}/ に振り分ける関数（既定はその場で置き換える）
+# Split the graphs on n vertices of input_dir into output_dir/n{n}/m{m}/ (in place by default)
+def partition_store(input_dir, n, output_dir=None, chunk_lines=CHUNK_LINES):
+    output_dir = output_dir or input_dir
+    paths = require_input_files(input_dir, n)
+
+    # すべての入力ファイルにあるサイドカーだけを運ぶ（一部にしかないものは行がそろわない）
+    # Carry only the sidecars every input file has (others would not stay aligned)
+    kinds = set.intersection(*(sidecar_kinds(path) for path in paths)) if paths else set()
+
+    # 一時ディレクトリに書く / Write into a temporary directory
+    tmp_dir = os.path.join(output_dir, f".n{n}.partition")
+    if os.path.isdir(tmp_dir):
+        shutil.rmtree(tmp_dir)
+    writer = PartitionWriter(tmp_dir, n, kinds, chunk_lines)
+    try:
+        for path in paths:
+            print(f"Processing: {path}")
+            sidecars = {kind: lzma.open(sidecar_path(path, kind), "rt") for kind in kinds}
+            try:
+                for line in read_graph6(path):
+                    writer.write(graph6_edge_count(line), line, {kind: f.readline() for kind, f in sidecars.items()})
+            finally:
+                for f in sidecars.values():
+                    f.close()
+    finally:
+        counts = writer.close()
+
+    # 元のストア（その場で置き換える場合）または出力先の古い n{n} を削除してから置き換える
+    # Remove the original store (when in place) or the old n{n} of the output, then move the result in
+    remove_store(output_dir, n)
+    os.makedirs(output_dir, exist_ok=True)
+    os.replace(os.path.join(tmp_dir, f"n{n}"), os.path.join(output_dir, f"n{n}"))
+    os.rmdir(tmp_dir)
+    return counts, sorted(kinds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Split a store into one sub-store per edge count ({dir}/n{n}/m{m}/).")
+    parser.add_argument("input_dir", help="input directory name (e.g., d3cpt)")
+    parser.add_argument("n", type=int, help="number of vertices (e.g., 11)")
+    parser.add_argument("--output-dir", help="output directory (default: rewrite input_dir in place)")
+    parser.add_argument("--lines", type=int, default=CHUNK_LINES, help=f"lines per chunk (default: {CHUNK_LINES})")
+    args = parser.parse_args()
+
+    try:
+        counts, kinds = partition_store(args.input_dir, args.n, args.output_dir, args.lines)
+    except FileNotFoundError as e:
+        # 入力ファイルもチャンクも存在しない場合はエラー
+        # If neither a file nor a chunk directory exists, show an error
+        print(f"Error: {e}")
+        exit(1)
+
+    # 辺数ごとの個数を出力 / Print the count per edge count
+    if kinds:
+        print(f"Sidecars carried over: {', '.join(kinds)}")
+    print("Graphs per number of edges:")
+    for m, count in counts.items():
+        print(f"  m={m}: {count}")
+    print(f"Done. {sum(counts.values())} graphs in {len(counts)} sub-stores under "
+          f"{os.path.join(args.output_dir or args.input_dir, f'n{args.n}')}")
+
+
+if __name__ == "__main__":
+    main()
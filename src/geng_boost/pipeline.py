@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+
+import os                   # ファイルの存在確認 / For checking file existence
+import lzma                 # .xz 圧縮ファイルの読み書き / For reading and writing .xz compressed files
+import time                 # 各段の時間の計測 / For timing each part
+import queue                # スレッド間の有界キュー / Bounded queues between threads
+import threading            # 読み込み・絞り込みのスレッド / Reader and filter threads
+from coords import sidecar_path  # 座標サイドカーのパス / Path of the coordinate sidecar
+from instrument import NullTracer  # 任意の計測フック / Opt-in instrumentation hooks
+
+# ステージの実行基盤：1 つのファイルについて、読み込みスレッド（xz の展開）・絞り込みワーカースレッド・
+# 書き込み（呼び出し元のスレッドで xz の圧縮）を有界キューでつなぎ、graph6 行（bytes）のまとまりを流す。
+# xz の展開・圧縮は GIL を解放するので、絞り込みと重なって実行され、1 チャンクだけでも速くなる。
+# 出力の順序は入力と同じ（まとまりの通し番号で並べ直す）。座標サイドカーは行と組にして運ぶ。
+# Stage runtime: for one file, a reader thread (xz decompression), filter worker threads and the writer
+# (xz compression on the calling thread) are connected by bounded queues carrying batches of graph6 lines
+# as bytes. xz releases the GIL, so decompression and compression overlap with filtering, which speeds up
+# even a single chunk. The output keeps the input order (batches are reordered by sequence number), and the
+# coordinate sidecar travels paired with its line.
+# transform の中の内訳（NetworkX への変換 decode、C++ へのパイプ ipc、C++ の実行待ち subprocess_wait など）は
+# phase(name) で計り、まとまりと一緒に書き込み側へ運んでトレーサーに足す（残りの時間は filter に入る）。
+# The parts of a transform (NetworkX decoding "decode", the pipe to the C++ binary "ipc", waiting for the
+# binary "subprocess_wait", ...) are timed with phase(name), carried to the writer with their batch and
+# added to the tracer there (the rest of the transform time goes to "filter").
+
+# 1 まとまりの行数 / Lines per batch
+BATCH_LINES = 2048
+
+# キューに入れておけるまとまりの数（メモリの上限）/ Batches a queue may hold (bounds the memory)
+QUEUE_BATCHES = 8
+
+
+# 絞り込みスレッドごとの、処理中のまとまりの内訳の時間 / Per filter thread: the timings of the batch in progress
+_batch = threading.local()
+
+
+class _BatchPhase:
+    """
+    処理中のまとまりの name フェーズに経過時間を積算するコンテキストマネージャ（パイプラインの外では何もしない）
+    A context manager adding the elapsed time to the phase name of the batch in progress (a no-op outside a
+    pipeline).
+    """
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        timers = getattr(_batch, "timers", None)
+        if timers is not None:
+            timers[self.name] = timers.get(self.name, 0.0) + time.perf_counter() - self.start
+        return False
+
+
+# transform の中の内訳を計る / Time a part of a transform
+def phase(name):
+    return _BatchPhase(name)
+
+
+class _Failure:
+    """
+    スレッドで起きた例外を書き込み側に運ぶ入れ物
+    Carries an exception raised on a thread over to the writer.
+    """
+    def __init__(self, error):
+        self.error = error
+
+
+# 止める合図があるまで待ちながら put する関数（止まったら False）
+# put, waiting until there is room or the pipeline is stopped (False if stopped)
+def _put(q, item, stopped):
+    while not stopped.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(q, stopped):
+    while not stopped.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return None
+
+
+# 入力ファイル（と座標サイドカー）を読み、(通し番号, [(行, 座標行 or None)], 展開時間) を流すスレッド
+# Reader thread: read the input file (and coordinate sidecar) and emit (sequence, [(line, xy or None)], seconds)
+def _reader(raw, input_path, read_xy, batch_lines, in_q, out_q, workers, stopped):
+    try:
+        xy_in = lzma.open(sidecar_path(input_path), "rb") if read_xy else None
+        with lzma.open(raw, "rb") as f_in:
+            seq = 0
+            batch = []
+            start = time.perf_counter()
+            for line in f_in:
+                line = line.strip()
+                if not line or line.startswith(b"#"):
+                    continue
+                xy = xy_in.readline().rstrip(b"\n") if read_xy else None
+                batch.append((line, xy))
+                if len(batch) >= batch_lines:
+                    if not _put(in_q, (seq, batch, time.perf_counter() - start), stopped):
+                        return
+                    seq, batch, start = seq + 1, [], time.perf_counter()
+            if batch and not _put(in_q, (seq, batch, time.perf_counter() - start), stopped):
+                return
+        if xy_in is not None:
+            xy_in.close()
+    except Exception as e:
+        _put(out_q, _Failure(e), stopped)
+    finally:
+        for _ in range(workers):
+            _put(in_q, None, stopped)
+
+
+# まとまりに transform を適用し、(通し番号, 残す [(行, 座標行 or None)], 入力行数, {フェーズ: 時間}) を流すスレッド
+# （transform の時間のうち phase() で計った内訳以外を filter とする）
+# Worker thread: apply transform to batches and emit (sequence, kept [(line, xy or None)], input size,
+# {phase: seconds}) (the transform time not covered by phase() counts as "filter")
+def _worker(transform, in_q, out_q, stopped):
+    while True:
+        item = _get(in_q, stopped)
+        if item is None:
+            _put(out_q, None, stopped)
+            return
+        seq, batch, read_seconds = item
+        _batch.timers = timers = {"decompress": read_seconds}
+        try:
+            start = time.perf_counter()
+            kept = transform(batch)
+            elapsed = time.perf_counter() - start
+        except Exception as e:
+            _put(out_q, _Failure(e), stopped)
+            return
+        finally:
+            _batch.timers = None
+        timers["filter"] = max(elapsed - sum(v for k, v in timers.items() if k != "decompress"), 0.0)
+        if not _put(out_q, (seq, kept, len(batch), timers), stopped):
+            return
+
+
+# 1 つのファイルを、読み込み → transform → 書き込みの重なったパイプラインで処理する関数（残した個数を返す）
+#   transform(batch) は [(行 bytes, 座標行 bytes or None)] を受け取り、出力する組のリストを返す
+#   read_xy なら入力の座標サイドカーを行と組にして読み、write_xy なら出力の座標サイドカーを書く
+# Process one file with overlapped reading → transform → writing (returns the number of kept graphs)
+#   transform(batch) takes [(line bytes, xy bytes or None)] and returns the pairs to write
+#   With read_xy the input coordinate sidecar is read paired with its lines; with write_xy one is written
+def run_pipeline(input_path, output_path, transform, read_xy=False, write_xy=False, workers=1,
+                 batch_lines=BATCH_LINES, tracer=None):
+    tracer = tracer or NullTracer()
+    in_q = queue.Queue(QUEUE_BATCHES)
+    out_q = queue.Queue(QUEUE_BATCHES)
+    stopped = threading.Event()
+    read_xy = read_xy and os.path.exists(sidecar_path(input_path))
+
+    raw = tracer.open_input(input_path)
+    threads = [threading.Thread(target=_reader, daemon=True,
+                                args=(raw, input_path, read_xy, batch_lines, in_q, out_q, workers, stopped))]
+    threads += [threading.Thread(target=_worker, daemon=True, args=(transform, in_q, out_q, stopped))
+                for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+
+    # 書き込み：通し番号の順に並べ直して書く（トレーサーはこのスレッドからだけ触る）
+    # Writer: write in sequence order (the tracer is only touched from this thread)
+    count = 0
+    pending = {}
+    next_seq = 0
+    finished = 0
+    f_out = lzma.open(output_path, "wb")
+    xy_out = lzma.open(sidecar_path(output_path), "wb") if write_xy else None
+    try:
+        while finished < workers:
+            item = out_q.get()
+            if item is None:
+                finished += 1
+                continue
+            if isinstance(item, _Failure):
+                raise item.error
+            seq, kept, size, timers = item
+            for name, seconds in timers.items():
+                tracer.add_time(name, seconds)
+            pending[seq] = (kept, size)
+            while next_seq in pending:
+                kept, size = pending.pop(next_seq)
+                with tracer.phase("write"):
+                    for line, xy in kept:
+                        f_out.write(line + b"\n")
+                        if xy_out is not None:
+                            xy_out.write(xy + b"\n")
+                count += len(kept)
+                next_seq += 1
+                tracer.tick(size)
+    finally:
+        stopped.set()
+        for thread in threads:
+            thread.join()
+        with tracer.phase("compress"):
+            f_out.close()
+            if xy_out is not None:
+                xy_out.close()
+    tracer.count("accepted", count)
+    return count
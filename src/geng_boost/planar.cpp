@@ -4,14 +4,138 @@
 #include <sstream>
 #include <boost/graph/adjacency_list.hpp>
 #include <boost/graph/boyer_myrvold_planar_test.hpp>
+#include <boost/graph/make_connected.hpp>
+#include <boost/graph/make_biconnected_planar.hpp>
+#include <boost/graph/make_maximal_planar.hpp>
+#include <boost/graph/planar_canonical_ordering.hpp>
+#include <boost/graph/chrobak_payne_drawing.hpp>
+#include <boost/graph/planar_face_traversal.hpp>
 
 using namespace std;
 using namespace boost;
 
-int main() {
-    // Boost グラフライブラリの基本グラフ型を定義
-    // Define the basic graph type using Boost's adjacency list
-    using Graph = adjacency_list<vecS, vecS, undirectedS>;
+// Boost グラフライブラリの基本グラフ型を定義（埋め込み計算のため辺番号を持たせる）
+// Define the basic graph type using Boost's adjacency list (with edge indices for embeddings)
+using Graph = adjacency_list<vecS, vecS, undirectedS,
+                             property<vertex_index_t, int>,
+                             property<edge_index_t, int>>;
+using Edge = graph_traits<Graph>::edge_descriptor;
+using Vertex = graph_traits<Graph>::vertex_descriptor;
+
+// 平面埋め込み（各頂点の周りの辺の巡回順）の型
+// Types for a planar embedding (cyclic order of edges around each vertex)
+using EmbeddingStorage = vector<vector<Edge>>;
+using Embedding = iterator_property_map<EmbeddingStorage::iterator,
+                                        property_map<Graph, vertex_index_t>::type>;
+
+// 直線描画の座標の型
+// Types for the straight-line drawing coordinates
+struct Coord {
+    size_t x;
+    size_t y;
+};
+using DrawingStorage = vector<Coord>;
+using Drawing = iterator_property_map<DrawingStorage::iterator,
+                                      property_map<Graph, vertex_index_t>::type>;
+
+// 辺を追加した後に辺番号を振り直す
+// Re-number the edge indices after edges have been added
+void reindex_edges(Graph& G) {
+    int i = 0;
+    graph_traits<Graph>::edge_iterator ei, ei_end;
+    for (tie(ei, ei_end) = edges(G); ei != ei_end; ++ei) {
+        put(edge_index, G, *ei, i++);
+    }
+}
+
+// 平面グラフ G の埋め込みを求める（平面でなければ false）
+// Compute a planar embedding of G (returns false if G is not planar)
+bool embed(Graph& G, EmbeddingStorage& storage) {
+    storage.assign(num_vertices(G), vector<Edge>());
+    Embedding embedding(storage.begin(), get(vertex_index, G));
+    return boyer_myrvold_planarity_test(boyer_myrvold_params::graph = G,
+                                        boyer_myrvold_params::embedding = embedding);
+}
+
+// 平面グラフの直線描画を計算し、"x0 y0 x1 y1 ..." の形式の文字列で返す
+// Compute a straight-line drawing of a planar graph as "x0 y0 x1 y1 ..."
+string straight_line_drawing(Graph G) {
+    int n = num_vertices(G);
+    if (n < 3) {
+        // 3 頂点未満は一直線上に並べる / Fewer than 3 vertices: place them on a line
+        ostringstream oss;
+        for (int v = 0; v < n; ++v) oss << (v ? " " : "") << v << " 0";
+        return oss.str();
+    }
+
+    // 連結化・2 連結化・極大平面化を順に行う（元の辺の描画はそのまま平面的）
+    // Make the graph connected, biconnected and maximal planar; the original edges stay crossing-free
+    EmbeddingStorage storage;
+    make_connected(G);
+    reindex_edges(G);
+    embed(G, storage);
+    make_biconnected_planar(G, Embedding(storage.begin(), get(vertex_index, G)));
+    reindex_edges(G);
+    embed(G, storage);
+    make_maximal_planar(G, Embedding(storage.begin(), get(vertex_index, G)));
+    reindex_edges(G);
+    embed(G, storage);
+    Embedding embedding(storage.begin(), get(vertex_index, G));
+
+    // 正準順序を求め、Chrobak–Payne アルゴリズムで格子上に描画する
+    // Compute a canonical ordering and draw on the grid with the Chrobak–Payne algorithm
+    vector<Vertex> ordering;
+    planar_canonical_ordering(G, embedding, back_inserter(ordering));
+    DrawingStorage drawing_storage(n);
+    Drawing drawing(drawing_storage.begin(), get(vertex_index, G));
+    chrobak_payne_straight_line_drawing(G, embedding, ordering.begin(), ordering.end(), drawing);
+
+    ostringstream oss;
+    for (int v = 0; v < n; ++v) {
+        oss << (v ? " " : "") << drawing_storage[v].x << " " << drawing_storage[v].y;
+    }
+    return oss.str();
+}
+
+// 面をたどりながら、各面の頂点列を集めるビジター
+// Visitor collecting the vertex sequence of every face during the traversal
+struct FaceCollector : public planar_face_traversal_visitor {
+    vector<vector<int>>& faces;
+    explicit FaceCollector(vector<vector<int>>& f) : faces(f) {}
+    void begin_face() { faces.emplace_back(); }
+    template <typename V> void next_vertex(V v) { faces.back().push_back(v); }
+};
+
+// 平面グラフの埋め込みの面を求め、"v v v;v v v;..." の形式の文字列で返す
+// （3-連結なら埋め込みは一意なので、面はグラフの不変量になる）
+// Compute the faces of the planar embedding as "v v v;v v v;..."
+// (for a 3-connected graph the embedding is unique, so the faces are invariants of the graph)
+string face_list(Graph& G) {
+    EmbeddingStorage storage;
+    embed(G, storage);
+    vector<vector<int>> faces;
+    FaceCollector visitor(faces);
+    planar_face_traversal(G, Embedding(storage.begin(), get(vertex_index, G)), visitor);
+
+    ostringstream oss;
+    for (size_t f = 0; f < faces.size(); ++f) {
+        if (f) oss << ";";
+        for (size_t i = 0; i < faces[f].size(); ++i) oss << (i ? " " : "") << faces[f][i];
+    }
+    return oss.str();
+}
+
+int main(int argc, char* argv[]) {
+    // "--drawing" が指定されたら、graph6 文字列の後ろに直線描画の座標を付けて出力する
+    // "--faces" が指定されたら、さらに " | " の後ろに埋め込みの面を付けて出力する
+    // With "--drawing", append straight-line drawing coordinates after each graph6 string
+    // With "--faces", further append the faces of the embedding after " | "
+    bool output_drawing = false;
+    bool output_faces = false;
+    for (int i = 1; i < argc; ++i) {
+        if (string(argv[i]) == "--drawing") output_drawing = true;
+        if (string(argv[i]) == "--faces") output_faces = true;
+    }
 
     string line;                    // 1 行ずつ読み込む文字列 / String to read each line
     vector<pair<int, int>> edges;   // 辺の集合（u, v） / List of edges (u, v)
@@ -24,17 +148,27 @@ int main() {
         // 空行が来たときの処理（1 つのグラフ情報の終端を示す）
         // When a blank line is encountered (end of one graph block)
         if (line.empty()) {
-            // 辺の情報から Boost グラフを構築
-            // Build Boost graph from edge list
-            Graph G(n);
-            for (auto& [u, v] : edges) add_edge(u, v, G);
-
-            // グラフの平面性を判定
-            // Test whether the graph is planar
-            if (boyer_myrvold_planarity_test(G)) {
-                // 平面グラフであれば graph6 文字列を出力
-                // If planar, output the original graph6 string
-                cout << graph6_line << "\n";
+            // 辺数が平面グラフの上限 3n-6 を超えれば、グラフを作るまでもなく平面でない
+            // More than 3n-6 edges is non-planar, without even building the graph
+            bool within_edge_bound = n < 3 || (int)edges.size() <= 3 * n - 6;
+
+            if (within_edge_bound) {
+                // 辺の情報から Boost グラフを構築
+                // Build Boost graph from edge list
+                Graph G(n);
+                for (auto& [u, v] : edges) add_edge(u, v, G);
+                reindex_edges(G);
+
+                // グラフの平面性を判定
+                // Test whether the graph is planar
+                if (boyer_myrvold_planarity_test(G)) {
+                    // 平面グラフであれば graph6 文字列を出力（必要なら座標と面も）
+                    // If planar, output the original graph6 string (and coordinates and faces if requested)
+                    cout << graph6_line;
+                    if (output_drawing) cout << " " << straight_line_drawing(G);
+                    if (output_faces) cout << " | " << face_list(G);
+                    cout << "\n";
+                }
             }
 
             // 次のグラフの入力に備えて情報をリセット
@@ -1,104 +1,195 @@
 #!/usr/bin/env python3
 
 import os                   # ファイル操作 / For file and directory handling
-import lzma                 # .xz 圧縮ファイルの読み書き / For reading and writing .xz compressed files
 import subprocess           # 外部 C++ プログラムの実行 / For invoking external C++ program
+import threading            # 出力の受信スレッド / For the thread receiving results
+import argparse             # コマンドライン引数の解析 / For parsing command-line arguments
 import networkx as nx       # グラフ構造操作ライブラリ / For graph operations with NetworkX
+from instrument import get_tracer  # 任意の計測フック / Opt-in instrumentation hooks
+from prefilter import Cascade, PLANAR_TESTS  # 安い前段の判定 / Cheap pre-filter cascade
+from pipeline import run_pipeline, phase  # 展開・判定・圧縮を重ねる実行基盤 / Overlapped decompress/filter/compress runtime
+from predcache import PredicateCache, DEFAULT_CACHE_PATH  # 判定結果の永続キャッシュ / Persistent predicate cache
+from store import stage_files  # 入出力ファイルの対応付け / For pairing input and output files
+
+# Boost による平面性判定を行う C++ バイナリ（このスクリプトと同じディレクトリ）
+# The Boost-based C++ binary for planarity checking (next to this script)
+PLANAR_BIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "planar")
+
+
+# graph6 行のまとまりを C++ バイナリで一括判定し、平面なものを (graph6, 座標 or None) で返す関数
+# （辺数の上限などの安い前段 cascade で明らかに平面でないものは C++ に送らない）
+# Test a batch of graph6 lines with the C++ binary and return the planar ones as (graph6, coords or None)
+# (graphs that the cheap pre-filter cascade, e.g. the edge bound, rejects are not sent to the C++ side)
+# pipeline.py の中では、変換 decode・送信 ipc・C++ の実行待ち subprocess_wait の時間をまとまりごとに記録する
+# Inside pipeline.py, the time of decoding (decode), sending (ipc) and waiting for the binary
+# (subprocess_wait) is recorded per batch
+def planar_lines(lines, n, write_drawing=False, cascade=None):
+    cascade = cascade or Cascade(PLANAR_TESTS)
+    payload = []
+    for line in lines:
+        with phase("decode"):
+            G = nx.from_graph6_bytes(line.encode())
+        if cascade.reject(G):
+            continue
+        with phase("decode"):
+            payload.append(f"# {n} {G.number_of_edges()}\n")
+            payload.extend(f"{u} {v}\n" for u, v in G.edges())
+            payload.append(f"{line}\n\n")
+
+    # 座標付きの出力でパイプが詰まらないよう、受信は別スレッドで行う
+    # Receive on a separate thread, so the larger drawing output cannot fill the pipe and deadlock
+    planar_cmd = [PLANAR_BIN, "--drawing"] if write_drawing else [PLANAR_BIN]
+    proc = subprocess.Popen(planar_cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    output = []
+    receiver = threading.Thread(target=lambda: output.append(proc.stdout.read()))
+    receiver.start()
+    try:
+        with phase("ipc"):
+            proc.stdin.write("".join(payload))
+            proc.stdin.close()
+    finally:
+        with phase("subprocess_wait"):
+            receiver.join()
+            proc.stdout.close()
+            returncode = proc.wait()
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, planar_cmd)
+
+    accepted = []
+    for result_line in output[0].splitlines():
+        if write_drawing:
+            graph6, xy = result_line.split(" ", 1)
+            accepted.append((graph6, xy))
+        else:
+            accepted.append((result_line, None))
+    return accepted
 
-# 入力ディレクトリ名と、頂点数 n をユーザー入力から受け取る
-# Prompt the user for the input directory name and the number of vertices
-input_dir = input("Enter input directory name (e.g., d3c): ").strip()
-n = int(input("Enter the number of vertices (e.g., 11): ").strip())
-
-# 出力ディレクトリは、入力ディレクトリ名に 'p' を付けた名前（例: d3cp）
-# The output directory is named by appending 'p' to the input directory (e.g., d3cp)
-output_dir = input_dir + "p"
-
-# 単一の .g6.xz ファイルのパス（ファイルが分割されていない場合）
-# Path for the single .g6.xz file if not split
-single_input_path = os.path.join(input_dir, f"n{n}.g6.xz")
-single_output_path = os.path.join(output_dir, f"n{n}.g6.xz")
-
-# 分割されたファイルが格納されたディレクトリ（大規模な入力時）
-# Directory containing split chunk files (used when the input is large)
-chunk_input_dir = os.path.join(input_dir, f"n{n}")
-chunk_output_dir = os.path.join(output_dir, f"n{n}")
-
-# 出力ディレクトリが存在しなければ作成する
-# Create the output directory if it doesn't exist
-os.makedirs(output_dir, exist_ok=True)
 
 # 指定された .g6.xz ファイルまたはチャンクファイルを処理して平面グラフのみを出力する関数
+# （展開・判定・圧縮は pipeline.py のスレッドで重ねて実行し、判定はまとまりごとに C++ バイナリで行う。
+#   workers を増やすと C++ バイナリが並列に動く。cache を渡すと、判定済みのグラフは C++ に送らない）
 # This function processes the specified .g6.xz file and writes only planar graphs to the output
-def process_file(input_path, output_path, n):
-    with lzma.open(input_path, "rt") as f_in, lzma.open(output_path, "wt") as f_out:
-        # Boost による平面性判定を行う C++ バイナリを起動
-        # Launch the Boost-based C++ binary for planarity checking
-        proc = subprocess.Popen(
-            ["./planar"],
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            text=True
-        )
-
-        count = 0  # 平面グラフの個数をカウント / Counter for planar graphs
-
-        # 入力ファイルを 1 行ずつ読み取りながら処理
-        # Process each line (graph) from the input file
-        for line in f_in:
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
-
-            # graph6 文字列を NetworkX グラフに変換
-            # Convert the graph6 string to a NetworkX graph
-            G = nx.from_graph6_bytes(line.encode())
-            edges = list(G.edges())
-
-            # エッジリストとともに、C++ 側にグラフ情報を送信
-            # Send the graph info and edge list to the C++ process
-            proc.stdin.write(f"# {n} {len(edges)}\n")
-            for u, v in edges:
-                proc.stdin.write(f"{u} {v}\n")
-            proc.stdin.write(f"{line}\n")
-            proc.stdin.write("\n")
-
-        # 入力が終了したことを C++ 側に伝える
-        # Close the input stream to signal end of input
-        proc.stdin.close()
-
-        # 出力を受け取りながら、平面なグラフだけを書き出す
-        # Receive and write back the planar graphs only
-        for result_line in proc.stdout:
-            f_out.write(result_line)
-            count += 1
-
-        proc.stdout.close()
-        proc.wait()
-
-        # 結果を表示
-        # Print result summary
-        print(f"  -> {count} planar graphs saved to {output_path}")
-
-# 単一ファイルが存在すれば、それを処理
-# If the single file exists, process it
-if os.path.exists(single_input_path):
-    print(f"Processing: {single_input_path}")
-    process_file(single_input_path, single_output_path, n)
-
-# それ以外の場合、チャンクされたファイル群が存在するか確認し、すべて処理する
-# Otherwise, if chunked files exist, process each one
-elif os.path.isdir(chunk_input_dir):
-    os.makedirs(chunk_output_dir, exist_ok=True)
-    for fname in sorted(os.listdir(chunk_input_dir)):
-        if not fname.endswith(".g6.xz"):
-            continue
-        input_path = os.path.join(chunk_input_dir, fname)
-        output_path = os.path.join(chunk_output_dir, fname)
-        print(f"Processing chunk: {input_path}")
-        process_file(input_path, output_path, n)
-
-# 入力ファイルもチャンクも存在しない場合はエラー
-# If neither a file nor a chunk directory exists, show an error
-else:
-    print("Error: No valid input file or chunk directory found.")
+# (decompression, testing and compression overlap on the threads of pipeline.py, and every batch is tested
+#  by the C++ binary; more workers run several binaries in parallel. With a cache, graphs tested before are
+#  not sent to the C++ side)
+def process_file(input_path, output_path, n, write_drawing=False, tracer=None, workers=1, cascade=None,
+                 cache=None):
+    cascade = cascade or Cascade(PLANAR_TESTS)
+    passed = Cascade([])    # 前段を通過済みのグラフ用（判定なし）/ For graphs that already passed the pre-filters (no tests)
+
+    # graph6 行（str）を NetworkX のグラフにする（pipeline.py の中では decode の時間として記録する）
+    # Decode a graph6 line (str) into a NetworkX graph (recorded as decode time inside pipeline.py)
+    def decode(line):
+        with phase("decode"):
+            return nx.from_graph6_bytes(line.encode())
+
+    # graph6 行（bytes）のまとまりを判定し、平面なものを (graph6, 座標 or None) の bytes で返す
+    # Test a batch of graph6 lines (bytes) and return the planar ones as (graph6, coords or None) bytes
+    def keep_planar(batch):
+        lines = [line.decode() for line, _ in batch]
+        if cache is None:
+            accepted = planar_lines(lines, n, write_drawing, cascade)
+        else:
+            # 安い前段で落ちたものはキャッシュを引かずに捨て、残ったものだけを正準化してキャッシュを引く
+            # Graphs rejected by the cheap pre-filters are dropped without a lookup; only the survivors are
+            # canonicalised and looked up
+            lines = [line for line in lines if not cascade.reject(decode(line))]
+
+            # キャッシュにないものだけを（前段を繰り返さずに）判定し、そのとき得た描画はとっておく
+            # Test only the lines missing from the cache (without repeating the pre-filters), keeping the
+            # drawings obtained on the way
+            drawings = {}
+            def test(missing):
+                found = dict(planar_lines(missing, n, write_drawing, passed))
+                drawings.update(found)
+                return [line in found for line in missing]
+            planar = [line for line, flag in zip(lines, cache.resolve("planar", lines, test)) if flag]
+
+            # 座標を保存する場合、キャッシュから平面と分かったグラフの描画は C++ 側で求める
+            # When saving coordinates, the drawings of graphs known planar from the cache come from the C++ side
+            if write_drawing:
+                redraw = [line for line in planar if line not in drawings]
+                if redraw:
+                    drawings.update(planar_lines(redraw, n, True, passed))
+            accepted = [(line, drawings.get(line)) for line in planar]
+        return [(graph6.encode(), xy.encode() if xy is not None else None) for graph6, xy in accepted]
+
+    # 座標を保存する場合は、C++ 側の直線描画を座標サイドカーに書く
+    # When saving coordinates, the straight-line drawing of the C++ side goes to the coordinate sidecar
+    count = run_pipeline(input_path, output_path, keep_planar, write_xy=write_drawing, workers=workers,
+                         tracer=tracer)
+
+    # 結果を表示
+    # Print result summary
+    print(f"  -> {count} planar graphs saved to {output_path}")
+    return count
+
+
+# ストア input_dir の n 頂点グラフから平面グラフを抽出する関数（出力は既定で input_dir + 'p'）
+# （cache に PredicateCache を渡すと、ほかの族やストアで判定済みのグラフの結果を再利用する）
+# Keep the planar graphs on n vertices of input_dir (output defaults to input_dir + 'p')
+# (pass a PredicateCache as cache to reuse the results of graphs tested in other families or stores)
+def planar_filter(input_dir, n, write_drawing=False, output_dir=None, trace=None, workers=1, cache=None):
+    # 出力ディレクトリは、入力ディレクトリ名に 'p' を付けた名前（例: d3cp）
+    # The output directory is named by appending 'p' to the input directory (e.g., d3cp)
+    output_dir = output_dir or input_dir + "p"
+    pairs = stage_files(input_dir, output_dir, n)
+
+    # 計測フック（--trace または環境変数 PIPELINE_TRACE が設定されたときだけ記録する）
+    # Instrumentation hooks (records only when --trace or PIPELINE_TRACE is set)
+    tracer = get_tracer("planar", trace)
+    tracer.begin([input_path for input_path, _ in pairs])
+
+    # 前段の判定ごとに落とした個数を、全ファイルで数える
+    # Count the rejections of every pre-filter over all files
+    cascade = Cascade(PLANAR_TESTS)
+
+    total = 0
+    for input_path, output_path in pairs:
+        print(f"Processing: {input_path}")
+        total += process_file(input_path, output_path, n, write_drawing, tracer, workers, cascade, cache)
+    print(f"Pre-filter: {cascade.summary()}")
+    cascade.record(tracer)
+    if cache is not None:
+        print(f"Predicate cache: {cache.summary()}")
+        cache.record(tracer)
+    tracer.close()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep only planar graphs (Boyer-Myrvold via ./planar).")
+    parser.add_argument("input_dir", help="input directory name (e.g., d3c)")
+    parser.add_argument("n", type=int, help="number of vertices (e.g., 11)")
+    parser.add_argument("--drawing", action="store_true",
+                        help="also save straight-line drawing coordinates in .xy.xz sidecars")
+    parser.add_argument("--output-dir", help="output directory (default: input_dir + 'p')")
+    parser.add_argument("--trace", help="write a JSON-lines instrumentation trace to this file")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="filter threads per file, overlapped with xz decompression and compression (default: 1)")
+    parser.add_argument("--cache", action="store_true", help="reuse planarity results from the predicate cache")
+    parser.add_argument("--cache-path", default=DEFAULT_CACHE_PATH,
+                        help=f"predicate cache file (default: {DEFAULT_CACHE_PATH})")
+    parser.add_argument("--cache-max-mb", type=int, default=1024, help="cache size limit in MB (default: 1024)")
+    parser.add_argument("--no-labelg", action="store_true", help="use the Python canonicaliser even if labelg exists")
+    args = parser.parse_args()
+
+    try:
+        cache = PredicateCache(args.cache_path, args.cache_max_mb << 20, not args.no_labelg) if args.cache else None
+    except ValueError as e:
+        parser.error(str(e))
+
+    try:
+        planar_filter(args.input_dir, args.n, args.drawing, args.output_dir, args.trace, args.workers, cache)
+    except FileNotFoundError as e:
+        # 入力ファイルもチャンクも存在しない場合はエラー
+        # If neither a file nor a chunk directory exists, show an error
+        print(f"Error: {e}")
+        exit(1)
+    finally:
+        if cache is not None:
+            cache.close()
+
+
+if __name__ == "__main__":
+    main()
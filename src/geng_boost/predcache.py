@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+
+import os                   # ファイル操作 / For file handling
+import json                 # 判定結果の直列化 / For serialising predicate results
+import sqlite3              # 永続的なキー・値ストア / Persistent key-value store
+import argparse             # コマンドライン引数の解析 / For parsing command-line arguments
+import threading            # 絞り込みスレッドからの同時アクセス / For concurrent access from filter threads
+from canon import canonical_lines, canonicalizer_name  # graph6 の正準化 / graph6 canonicalisation
+
+# 判定結果キャッシュ：正準形の graph6 をキーにして、グラフごとの判定結果（平面性 "planar"、3-連結性
+# "triconnected"、面ベクトル "face_vector" など）を SQLite のファイルに保存し、ステージや族をまたいで再利用する。
+# 族はたがいに大きく重なる（xtd3c や xfkd3c は d3c の部分集合）ので、処理済みの族から取り出した族を
+# 絞り込み直すときはほとんどがキャッシュヒットになる。使うたびに世代番号を 1 つ進めて参照した行に記録し、
+# ファイルが上限を超えたら世代の古い行から削除する。正準化の方法が違うと正準形が変わるので混ぜない。
+# Predicate cache: per-graph predicate results (planarity "planar", 3-connectivity "triconnected", face vector
+# "face_vector", ...) are stored in an SQLite file keyed by the canonical graph6, and reused across stages
+# and families. Families overlap heavily (xtd3c and xfkd3c are subsets of d3c), so re-filtering a family
+# drawn from an already processed one is mostly cache hits. Every use advances a generation number that is
+# stamped on the rows it touches; when the file exceeds its limit, the rows of the oldest generations go
+# first. Canonical forms differ between canonicalisers, so they are never mixed.
+#   例 / e.g.  python triconnected.py xtd3cp 12 --cache
+#              python predcache.py --max-mb 512
+
+# 既定のキャッシュファイル（環境変数 PREDICATE_CACHE で変更可）
+# Default cache file (can be changed with the PREDICATE_CACHE environment variable)
+DEFAULT_CACHE_PATH = os.environ.get("PREDICATE_CACHE", "predicate_cache.sqlite")
+
+# 既定のキャッシュサイズ上限（バイト）/ Default cache size limit (bytes)
+DEFAULT_MAX_BYTES = 1 << 30
+
+# 1 回の SQL で問い合わせるキーの数（SQLite の変数の上限より小さく）
+# Keys per SQL query (below SQLite's limit on host parameters)
+QUERY_KEYS = 500
+
+
+class PredicateCache:
+    """
+    正準形の graph6 をキーにした判定結果の永続キャッシュ（スレッドセーフ）
+    A persistent cache of predicate results keyed by canonical graph6 (thread-safe).
+    """
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES, use_labelg=True, warn=True):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.use_labelg = use_labelg
+        self.stats = {}     # 判定名 → [ヒット数, ミス数] / Predicate → [hits, misses]
+        self._lock = threading.Lock()
+
+        self.db = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT, predicate TEXT, value TEXT, stamp INTEGER, "
+                        "PRIMARY KEY (key, predicate)) WITHOUT ROWID")
+        self.db.execute("CREATE INDEX IF NOT EXISTS results_stamp ON results (stamp)")
+
+        # 正準化の方法を確かめ、世代番号を進める
+        # Check the canonicaliser and advance the generation number
+        name = canonicalizer_name(use_labelg)
+        if warn and name == "python":
+            # Python 実装の正準化は判定そのものより遅いことがあるので、labelg がなければ知らせる
+            # The Python canonicaliser can cost more than the predicates it saves, so say so without labelg
+            print("Warning: labelg is not available; the predicate cache canonicalises with the slower "
+                  "Python implementation and may not pay off")
+        with self.db:
+            meta = dict(self.db.execute("SELECT name, value FROM meta"))
+            if meta.setdefault("canonicalizer", name) != name:
+                raise ValueError(f"The predicate cache {path} was built with {meta['canonicalizer']}, "
+                                 f"but {name} is in use")
+            self.generation = int(meta.get("generation", 0)) + 1
+            self.db.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                                [("canonicalizer", name), ("generation", str(self.generation))])
+
+    def _count(self, predicate, hits, misses):
+        with self._lock:
+            counts = self.stats.setdefault(predicate, [0, 0])
+            counts[0] += hits
+            counts[1] += misses
+
+    # 正準形 keys の判定結果を {正準形: 値} で返す（参照した行の世代を更新する）
+    # Return the cached results of the canonical forms keys as {canonical form: value} (refreshing their stamps)
+    def get_many(self, predicate, keys):
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        with self._lock, self.db:
+            for start in range(0, len(keys), QUERY_KEYS):
+                chunk = keys[start:start + QUERY_KEYS]
+                marks = ",".join("?" * len(chunk))
+                rows = self.db.execute(f"SELECT key, value FROM results WHERE predicate = ? AND key IN ({marks})",
+                                       [predicate, *chunk]).fetchall()
+                found.update((key, json.loads(value)) for key, value in rows)
+                self.db.execute(f"UPDATE results SET stamp = ? WHERE predicate = ? AND key IN ({marks})",
+                                [self.generation, predicate, *chunk])
+        return found
+
+    # {正準形: 値} の判定結果を保存する / Store the results {canonical form: value}
+    def put_many(self, predicate, results):
+        with self._lock, self.db:
+            self.db.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                                [(key, predicate, json.dumps(value), self.generation)
+                                 for key, value in results.items()])
+
+    def resolve(self, predicate, lines, compute):
+        """
+        graph6 行のリスト lines の判定結果を入力と同じ順序で返す。キャッシュにないものだけを
+        compute（graph6 行のリスト → 値のリスト）で求めて保存する。
+        Return the predicate results of the graph6 lines in input order. Only the lines missing from the
+        cache are computed with compute (list of graph6 lines → list of values) and then stored.
+        呼び出し側は、安い前段で落ちるグラフを先に除いてから渡す（正準化はそれより高くつく）。
+        Callers drop graphs that cheap pre-filters reject beforehand (canonicalisation costs more than those).
+        """
+        keys = list(canonical_lines(lines, self.use_labelg))
+        found = self.get_many(predicate, keys)
+        missing = [i for i, key in enumerate(keys) if key not in found]
+        if missing:
+            values = compute([lines[i] for i in missing])
+            computed = {keys[i]: value for i, value in zip(missing, values)}
+            self.put_many(predicate, computed)
+            found.update(computed)
+        self._count(predicate, len(keys) - len(missing), len(missing))
+        return [found[key] for key in keys]
+
+    # 別プロセスのキャッシュのヒット数・ミス数を合算する / Merge the hits and misses of a cache in another process
+    def add_stats(self, stats):
+        for predicate, (hits, misses) in stats.items():
+            self._count(predicate, hits, misses)
+
+    # 判定ごとのヒット数・ミス数を計測フックのカウンタにも記録する / Also record hits and misses as tracer counters
+    def record(self, tracer):
+        for predicate, (hits, misses) in self.stats.items():
+            tracer.count(f"cache_{predicate}_hits", hits)
+            tracer.count(f"cache_{predicate}_misses", misses)
+
+    # "planar 900/1000 hits (90.0%)" の形式の要約 / Summary such as "planar 900/1000 hits (90.0%)"
+    def summary(self):
+        parts = []
+        for predicate, (hits, misses) in sorted(self.stats.items()):
+            total = hits + misses
+            parts.append(f"{predicate} {hits}/{total} hits ({100 * hits / total if total else 0:.1f}%)")
+        return ", ".join(parts) or "no lookups"
+
+    # 使用中のバイト数（空きページを除く）/ Bytes in use (excluding free pages)
+    def used_bytes(self):
+        with self._lock:
+            pages = self.db.execute("PRAGMA page_count").fetchone()[0]
+            free = self.db.execute("PRAGMA freelist_count").fetchone()[0]
+            size = self.db.execute("PRAGMA page_size").fetchone()[0]
+        return (pages - free) * size
+
+    # 判定ごとの行数 / Number of rows per predicate
+    def entries(self):
+        with self._lock:
+            return dict(self.db.execute("SELECT predicate, COUNT(*) FROM results GROUP BY predicate"))
+
+    def evict(self):
+        # 上限を超えていれば、世代の古い行から上限の 9 割まで削除する（空いたページは再利用される）
+        # If over the limit, remove the rows of the oldest generations down to 90% of it (free pages are reused)
+        used = self.used_bytes()
+        if used <= self.max_bytes:
+            return 0
+        with self._lock, self.db:
+            rows = self.db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            remove = rows - int(rows * 0.9 * self.max_bytes / used)
+            self.db.execute("DELETE FROM results WHERE (key, predicate) IN "
+                            "(SELECT key, predicate FROM results ORDER BY stamp LIMIT ?)", (remove,))
+        return remove
+
+    def close(self, evict=True):
+        if evict:
+            self.evict()
+        with self._lock:
+            self.db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show or shrink the predicate result cache.")
+    parser.add_argument("--cache-path", default=DEFAULT_CACHE_PATH,
+                        help=f"cache file (default: {DEFAULT_CACHE_PATH})")
+    parser.add_argument("--max-mb", type=int, help="evict the oldest entries down to this size in MB")
+    parser.add_argument("--clear", action="store_true", help="remove every entry")
+    parser.add_argument("--no-labelg", action="store_true", help="the cache was built with the Python canonicaliser")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.cache_path):
+        print(f"Error: {args.cache_path} not found")
+        exit(1)
+    try:
+        cache = PredicateCache(args.cache_path, DEFAULT_MAX_BYTES if args.max_mb is None else args.max_mb << 20,
+                               not args.no_labelg, warn=False)
+    except ValueError as e:
+        print(f"Error: {e}")
+        exit(1)
+
+    if args.clear:
+        with cache.db:
+            cache.db.execute("DELETE FROM results")
+    elif args.max_mb is not None:
+        print(f"Evicted {cache.evict()} entries")
+    if args.clear or args.max_mb is not None:
+        cache.db.execute("VACUUM")
+
+    # 判定ごとの行数と使用サイズを出力 / Print the rows per predicate and the size in use
+    for predicate, count in sorted(cache.entries().items()):
+        print(f"{predicate}: {count} graphs")
+    print(f"{cache.used_bytes() / (1 << 20):.1f} MB in use ({args.cache_path}, {canonicalizer_name(cache.use_labelg)})")
+    cache.close(evict=False)
+
+
+if __name__ == "__main__":
+    main()
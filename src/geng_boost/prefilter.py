@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+import threading            # 複数スレッドからのカウンタ更新 / For counter updates from several threads
+import networkx as nx       # グラフ構造操作ライブラリ / For graph operations with NetworkX
+
+# 安い前段の判定（カスケード）：高価な判定（Boyer–Myrvold の平面性判定、node_connectivity）の前に、
+# O(n+m) で「明らかに条件を満たさない」と分かるグラフを順に落とし、判定ごとに落とした個数を数える。
+# どの判定も「落とす」ことしかしないので、残ったグラフは必ず本来の判定にかける（結果は変わらない）。
+# Cheap pre-filter cascade: before the expensive checks (Boyer–Myrvold planarity, node_connectivity),
+# graphs that clearly fail are rejected by an ordered list of O(n+m) tests, counting the rejections per test.
+# The tests only ever reject, so every surviving graph still goes through the real check (same results).
+
+
+# 平面グラフの辺数の上限 m <= 3n-6（n >= 3）を超えるか
+# Whether the planar edge bound m <= 3n-6 (n >= 3) is exceeded
+def exceeds_planar_edge_bound(G):
+    n = G.number_of_nodes()
+    return n >= 3 and G.number_of_edges() > 3 * n - 6
+
+
+# 三角形のない平面グラフの上限 m <= 2n-4 を超える二部グラフか（二部グラフには三角形がない）
+# Whether the graph is bipartite (hence triangle-free) and exceeds the triangle-free planar bound m <= 2n-4
+def exceeds_bipartite_edge_bound(G):
+    n = G.number_of_nodes()
+    return n >= 3 and G.number_of_edges() > 2 * n - 4 and nx.is_bipartite(G)
+
+
+# 最小次数が 3 未満か（3-連結グラフの最小次数は 3 以上）
+# Whether the minimum degree is below 3 (3-connected graphs have minimum degree at least 3)
+def has_low_degree(G):
+    return any(d < 3 for _, d in G.degree())
+
+
+# 関節点（切断点）があるか（連結でないグラフも落とす）
+# Whether there is an articulation point (disconnected graphs are rejected too)
+def has_articulation_point(G):
+    if not nx.is_connected(G):
+        return True
+    return next(nx.articulation_points(G), None) is not None
+
+
+# 平面性判定の前段：(名前, 落とすなら True を返す判定) の順序付きリスト
+# Pre-filters of the planarity test: ordered list of (name, test returning True to reject)
+PLANAR_TESTS = [
+    ("edge_bound", exceeds_planar_edge_bound),
+    ("bipartite_edge_bound", exceeds_bipartite_edge_bound),
+]
+
+# 3-連結性判定の前段 / Pre-filters of the 3-connectivity test
+TRICONNECTED_TESTS = [
+    ("too_few_vertices", lambda G: G.number_of_nodes() < 4),
+    ("edge_bound", lambda G: 2 * G.number_of_edges() < 3 * G.number_of_nodes()),
+    ("min_degree", has_low_degree),
+    ("articulation_point", has_articulation_point),
+]
+
+
+class Cascade:
+    """
+    前段の判定を順に適用し、判定ごとに落とした個数と通過した個数を数えるクラス（スレッドセーフ）
+    A class applying the pre-filters in order and counting rejections per test and passes (thread-safe).
+    """
+    def __init__(self, tests):
+        self.tests = tests
+        self.counts = {name: 0 for name, _ in tests}
+        self.counts["passed"] = 0
+        self._lock = threading.Lock()
+
+    # 最初に落とした判定の名前を返す（すべて通過すれば None）
+    # Return the name of the first test rejecting G (None if all pass)
+    def reject(self, G):
+        for name, test in self.tests:
+            if test(G):
+                with self._lock:
+                    self.counts[name] += 1
+                return name
+        with self._lock:
+            self.counts["passed"] += 1
+        return None
+
+    # 判定ごとの個数を計測フックのカウンタにも記録する / Also record the counts as tracer counters
+    def record(self, tracer):
+        for name, count in self.counts.items():
+            tracer.count(f"prefilter_{name}", count)
+
+    # "edge_bound 120, min_degree 3, passed 30" の形式の要約 / Summary such as "edge_bound 120, passed 30"
+    def summary(self):
+        return ", ".join(f"{name} {count}" for name, count in self.counts.items())
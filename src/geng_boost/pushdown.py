@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+
+import argparse             # コマンドライン引数の解析 / For parsing command-line arguments
+from degree import parse_constraints  # 次数条件の解析 / For parsing degree constraints
+from geng import generate, option_dir_name  # geng の実行 / For running geng
+
+# 制約の押し下げ：degree.py と同じ次数条件から、条件を満たし得る多面体グラフだけを含む最も狭い geng の
+# 引数（最小次数 -d・最大次数 -D・辺数範囲 mine:maxe）を求め、その縮小した geng を geng.py 経由で実行する。
+# 多面体グラフは連結で次数 3 以上、辺数は 3n/2 <= m <= 3n-6 なので、その範囲に切り詰める。
+# Constraint push-down: from the same degree constraints as degree.py, derive the tightest geng arguments
+# (min degree -d, max degree -D, edge range mine:maxe) that still admit every matching polyhedral graph,
+# and run the reduced geng job through geng.py. Polyhedral graphs are connected with minimum degree 3
+# and 3n/2 <= m <= 3n-6, so the bounds are clipped to that range.
+#   例 / e.g.  python pushdown.py 11 -c n-2:2        (→ geng -c -d3 11 23:27)
+
+
+# 次数条件 [(次数, 個数)] から geng の引数を求める関数（条件を満たすグラフがあり得なければ ValueError）
+# Derive geng arguments from degree conditions [(degree, count)] (ValueError if nothing can match)
+def plan_geng(n, degree_conditions):
+    min_allowed, max_allowed = 3, n - 1  # 多面体グラフの次数の範囲 / Degree range of polyhedral graphs
+
+    # 個数 0 の条件は「その次数の頂点がない」という意味なので、残りの頂点の次数から除くだけ
+    # A condition with count 0 means "no vertex of that degree", so it only removes that degree for the rest
+    constrained = {}
+    for deg, cnt in degree_conditions:
+        if constrained.get(deg, cnt) != cnt:
+            raise ValueError(f"Conflicting counts for degree {deg}")
+        constrained[deg] = cnt
+    for deg, cnt in constrained.items():
+        if cnt < 0 or (cnt > 0 and not min_allowed <= deg <= max_allowed):
+            raise ValueError(f"No polyhedral graph on {n} vertices has {cnt} vertices of degree {deg}")
+
+    # 条件で次数が決まる頂点と、残りの（条件にない次数を持つ）頂点
+    # Vertices whose degree is fixed by the conditions, and the remaining vertices (other degrees)
+    fixed = sum(constrained.values())
+    free = n - fixed
+    if free < 0:
+        raise ValueError(f"The conditions fix {fixed} vertices, but there are only {n}")
+    free_degrees = [d for d in range(min_allowed, max_allowed + 1) if d not in constrained]
+    if free > 0 and not free_degrees:
+        raise ValueError("No degree is left for the unconstrained vertices")
+
+    # 最小次数・最大次数
+    # Minimum and maximum degree
+    degrees = [deg for deg, cnt in constrained.items() if cnt > 0]
+    if free > 0:
+        degrees += [free_degrees[0], free_degrees[-1]]
+    min_deg, max_deg = min(degrees), max(degrees)
+
+    # 次数和から辺数の範囲を求め、多面体グラフの範囲 3n/2 <= m <= 3n-6 に切り詰める
+    # Edge range from the degree sum, clipped to the polyhedral range 3n/2 <= m <= 3n-6
+    fixed_sum = sum(deg * cnt for deg, cnt in constrained.items())
+    min_sum = fixed_sum + free * (free_degrees[0] if free else 0)
+    max_sum = fixed_sum + free * (free_degrees[-1] if free else 0)
+    min_edges = max((min_sum + 1) // 2, (3 * n + 1) // 2)
+    max_edges = min(max_sum // 2, 3 * n - 6)
+    if min_edges > max_edges:
+        raise ValueError(f"No edge count is possible (needs {min_sum}..{max_sum} degree sum on {n} vertices)")
+
+    options = ["-c", f"-d{min_deg}"]
+    if max_deg < n - 1:
+        options.append(f"-D{max_deg}")
+    return options, (min_edges, max_edges)
+
+
+# 次数条件の文字列から計画を立て、縮小した geng を実行する関数（dry_run なら実行しない）
+# Plan from constraint strings and run the reduced geng job (not run when dry_run)
+def pushdown(n, specs, base_dir=None, dry_run=False):
+    degree_conditions = parse_constraints(specs, n)
+    options, edge_range = plan_geng(n, degree_conditions)
+    base_dir = base_dir or option_dir_name(options, edge_range)
+    command = " ".join(["geng"] + options + [str(n), f"{edge_range[0]}:{edge_range[1]}"])
+    if dry_run:
+        return command, base_dir, None, None
+    output_path, count = generate(options, n, base_dir, edge_range)
+    return command, base_dir, output_path, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Push degree constraints down into the geng arguments and run geng.")
+    parser.add_argument("n", type=int, help="number of vertices (e.g., 11)")
+    parser.add_argument("-c", "--constraint", action="append", default=[], metavar="DEG:COUNT",
+                        help="constraint, repeatable (e.g., -c n-2:2 -c 3:n-2)")
+    parser.add_argument("--output-dir", help="output directory (default: derived from the geng arguments)")
+    parser.add_argument("--dry-run", action="store_true", help="only print the planned geng command")
+    args = parser.parse_args()
+    if not args.constraint:
+        parser.error("at least one -c DEG:COUNT is required")
+
+    try:
+        command, base_dir, output_path, count = pushdown(args.n, args.constraint, args.output_dir, args.dry_run)
+    except ValueError as e:
+        parser.error(str(e))
+
+    # 計画と結果を表示（続けて planar.py → triconnected.py → degree.py を base_dir に適用する）
+    # Print the plan and result (then apply planar.py → triconnected.py → degree.py to base_dir)
+    print(f"Planned: {command}")
+    if output_path is not None:
+        print(f"  -> Saved {count} graphs to {output_path}")
+    constraints = " ".join(f"-c {spec}" for spec in args.constraint)
+    print(f"Next: planar.py {base_dir} {args.n} && triconnected.py {base_dir}p {args.n} && "
+          f"degree.py {base_dir}pt {args.n} {constraints}")
+
+
+if __name__ == "__main__":
+    main()
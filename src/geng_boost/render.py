@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+
+import os                   # ファイル操作 / For file and directory handling
+import zlib                 # PDF のコンテンツストリームの圧縮 / For compressing PDF content streams
+import networkx as nx       # 座標がないグラフのレイアウト / For laying out graphs without coordinates
+from math import sqrt       # 節点の半径 / For the node radius
+from multiprocessing import Pool  # 並列処理 / For parallel processing
+
+# 軽量なベクター描画：節点の座標と辺のリストから、PDF または SVG のページを直接書き出す。
+# matplotlib の Figure や Artist を作らないので、draw.py と同じ見た目（5×7 のグリッド、黒い 40 の節点と黒い辺、
+# 下に "(番号)"）のページを、ページ単位で並列に大量に書ける。PDF は 1 ページだけのファイルで、
+# 文字は PDF 標準の Helvetica を使う（フォントを埋め込まない）。
+# Lightweight vector renderer: PDF or SVG pages are written directly from node coordinates and edge lists.
+# No matplotlib figures or artists are created, so pages with the look of draw.py (5x7 grid, black nodes of
+# size 40 and black edges, "(index)" below) can be written in bulk, one page per task in parallel. Every PDF
+# holds a single page and uses the standard PDF font Helvetica (no font is embedded).
+
+# グリッド設定（draw.py と同じ）/ Grid layout (the same as draw.py)
+COLS = 5                    # 横方向のグラフ数 / Number of graphs per row
+ROWS = 7                    # 縦方向のグラフ数 / Number of graphs per column
+PER_PAGE = COLS * ROWS      # 1 ページあたりの最大グラフ数 / Max number of graphs per page
+
+# ページの寸法（ポイント）：matplotlib の 12.5×17.5 インチの Figure の各 Axes とその間隔に合わせる
+# Page geometry (points), matching the axes and spacing of the 12.5x17.5 inch matplotlib figure
+CELL = 120                  # 1 つのグラフの描画領域の一辺 / Side of the drawing area of one graph
+GAP = 24                    # 描画領域の間隔 / Space between drawing areas
+MARGIN = 12                 # ページの余白 / Page margin
+FONT_SIZE = 13              # 番号の文字サイズ / Font size of the index
+CAPTION = 16                # 最下段の番号のための余白 / Room for the captions of the bottom row
+NODE_RADIUS = sqrt(40) / 2  # node_size=40（面積 pt^2）の円の半径 / Radius of a node_size=40 (pt^2) marker
+LINE_WIDTH = 1.0            # 辺の太さ / Edge width
+PAGE_WIDTH = 2 * MARGIN + COLS * CELL + (COLS - 1) * GAP
+PAGE_HEIGHT = 2 * MARGIN + ROWS * CELL + (ROWS - 1) * GAP + CAPTION
+
+# Helvetica の字幅（1000 分率、番号に使う文字だけ）/ Helvetica glyph widths (per mille, index characters only)
+HELVETICA_WIDTHS = {"(": 333, ")": 333, **{d: 556 for d in "0123456789"}}
+
+# 円を 4 本の 3 次ベジェ曲線で近似するときの係数 / Constant approximating a circle with four cubic Béziers
+KAPPA = 0.5523
+
+
+# 座標がなければ平面レイアウト（失敗時は spring_layout）で配置する関数
+# Lay the graph out with the planar layout (spring_layout on failure) when no coordinates are given
+def default_layout(G, pos=None):
+    if pos is not None:
+        return pos
+    try:
+        return nx.planar_layout(G)
+    except nx.NetworkXException:
+        return nx.spring_layout(G, seed=42)
+
+
+# 1 つのグラフの座標を、左上が (left, top) の描画領域（y 軸は下向き）に収める関数
+# （matplotlib の自動スケールと同じく x と y を別々に伸ばし、5% の余白を取る）
+# Fit the coordinates of one graph into the drawing area with top-left corner (left, top) (y axis downwards)
+# (x and y are scaled separately with 5% margins, like matplotlib's autoscaling)
+def fit_cell(pos, left, top):
+    xs = [x for x, _ in pos.values()]
+    ys = [y for _, y in pos.values()]
+    inner = CELL - 2 * NODE_RADIUS
+
+    def scale(lo, hi):
+        span = hi - lo
+        if span <= 0:
+            return lambda v: CELL / 2
+        lo, span = lo - 0.05 * span, 1.1 * span
+        return lambda v: NODE_RADIUS + inner * (v - lo) / span
+
+    sx, sy = scale(min(xs), max(xs)), scale(min(ys), max(ys))
+    return {v: (left + sx(x), top + CELL - sy(y)) for v, (x, y) in pos.items()}
+
+
+# ページ上の i 番目の描画領域の左上の座標（y 軸は下向き）/ Top-left corner of the i-th area (y axis downwards)
+def cell_origin(i):
+    row, col = divmod(i, COLS)
+    return MARGIN + col * (CELL + GAP), MARGIN + row * (CELL + GAP)
+
+
+# 1 ページ分のグラフを、(描画領域内の座標, 辺のリスト, 番号の文字列, 番号の中心 x, 番号の上端 y) にする関数
+# Turn the graphs of one page into (area coordinates, edge list, caption, caption centre x, caption top y)
+def page_items(graphs, positions, first_index):
+    items = []
+    for i, (G, pos) in enumerate(zip(graphs, positions)):
+        left, top = cell_origin(i)
+        xy = fit_cell(default_layout(G, pos), left, top)
+        caption_top = top + CELL + 0.02 * CELL
+        items.append((xy, list(G.edges()), f"({first_index + i + 1})", left + CELL / 2, caption_top))
+    return items
+
+
+# 1 ページの PDF を書く関数 / Write a single-page PDF
+def write_pdf(path, items):
+    # PDF の y 軸は上向きなので、ページの高さから引く / The PDF y axis points upwards, so flip it
+    def fy(y):
+        return PAGE_HEIGHT - y
+
+    ops = [f"{LINE_WIDTH} w 0 g 0 G 1 J"]
+    for xy, edges, caption, cx, caption_top in items:
+        # 辺（節点の下に描く）/ Edges (drawn below the nodes)
+        ops.extend(f"{xy[u][0]:.2f} {fy(xy[u][1]):.2f} m {xy[w][0]:.2f} {fy(xy[w][1]):.2f} l" for u, w in edges)
+        if edges:
+            ops.append("S")
+
+        # 節点（4 本のベジェ曲線の円）/ Nodes (circles made of four Bézier curves)
+        r, k = NODE_RADIUS, NODE_RADIUS * KAPPA
+        for x, y in xy.values():
+            y = fy(y)
+            ops.append(f"{x + r:.2f} {y:.2f} m "
+                       f"{x + r:.2f} {y + k:.2f} {x + k:.2f} {y + r:.2f} {x:.2f} {y + r:.2f} c "
+                       f"{x - k:.2f} {y + r:.2f} {x - r:.2f} {y + k:.2f} {x - r:.2f} {y:.2f} c "
+                       f"{x - r:.2f} {y - k:.2f} {x - k:.2f} {y - r:.2f} {x:.2f} {y - r:.2f} c "
+                       f"{x + k:.2f} {y - r:.2f} {x + r:.2f} {y - k:.2f} {x + r:.2f} {y:.2f} c f")
+
+        # 番号（中央揃え、ベースラインは上端から字の高さぶん下。対になった括弧はエスケープ不要）
+        # Caption (centred, baseline one cap height below its top; balanced parentheses need no escaping)
+        width = sum(HELVETICA_WIDTHS[c] for c in caption) * FONT_SIZE / 1000
+        ops.append(f"BT /F1 {FONT_SIZE} Tf {cx - width / 2:.2f} {fy(caption_top + 0.72 * FONT_SIZE):.2f} Td "
+                   f"({caption}) Tj ET")
+    content = zlib.compress("\n".join(ops).encode())
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+         f"/Resources << /Font << /F1 5 0 R >> >> /Contents 4 0 R >>").encode(),
+        f"<< /Length {len(content)} /Filter /FlateDecode >>\nstream\n".encode() + content + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    data = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(data))
+        data += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(data)
+    data += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    data += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    data += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+# 1 ページの SVG を書く関数 / Write a single-page SVG
+def write_svg(path, items):
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{PAGE_WIDTH}pt" height="{PAGE_HEIGHT}pt" '
+             f'viewBox="0 0 {PAGE_WIDTH} {PAGE_HEIGHT}">',
+             '<rect width="100%" height="100%" fill="white"/>']
+    for xy, edges, caption, cx, caption_top in items:
+        if edges:
+            d = " ".join(f"M{xy[u][0]:.2f} {xy[u][1]:.2f}L{xy[w][0]:.2f} {xy[w][1]:.2f}" for u, w in edges)
+            parts.append(f'<path d="{d}" stroke="black" stroke-width="{LINE_WIDTH}" stroke-linecap="round"/>')
+        parts.extend(f'<circle cx="{x:.2f}" cy="{y:.2f}" r="{NODE_RADIUS:.2f}"/>' for x, y in xy.values())
+        parts.append(f'<text x="{cx:.2f}" y="{caption_top + 0.72 * FONT_SIZE:.2f}" text-anchor="middle" '
+                     f'font-family="Helvetica, Arial, sans-serif" font-size="{FONT_SIZE}">{caption}</text>')
+    parts.append("</svg>\n")
+    with open(path, "w") as f:
+        f.write("\n".join(parts))
+
+
+# 1 ページを描く関数（並列に呼ばれる）/ Render one page (called in parallel)
+def render_page(args):
+    path, fmt, graphs, positions, first_index = args
+    items = page_items(graphs, positions, first_index)
+    (write_svg if fmt == "svg" else write_pdf)(path, items)
+    return path
+
+
+# グラフを 5×7 のグリッドで PDF/SVG のページに描く関数（ページ単位で jobs 並列、描いたページのパスを順に返す）
+# positions の要素が None のグラフは平面レイアウトで配置する
+# Draw graphs on PDF/SVG pages in a 5x7 grid (jobs pages in parallel, yielding the page paths in order)
+# Graphs whose entry of positions is None are placed with the planar layout
+def render_pages(graphs, positions, draw_dir, n, fmt="pdf", jobs=1):
+    os.makedirs(draw_dir, exist_ok=True)
+    tasks = [(os.path.join(draw_dir, f"n{n}_page{page + 1}.{fmt}"), fmt,
+              graphs[start:start + PER_PAGE], positions[start:start + PER_PAGE], start)
+             for page, start in enumerate(range(0, len(graphs), PER_PAGE))]
+    if jobs == 1:
+        yield from map(render_page, tasks)
+        return
+    with Pool(jobs) as pool:
+        yield from pool.imap(render_page, tasks, chunksize=max(1, min(16, len(tasks) // (4 * jobs))))
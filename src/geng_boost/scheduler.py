@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+
+import os                   # CPU 数・ファイル操作 / For CPU count and file handling
+import lzma                 # .xz 圧縮ファイルの読み書き / For reading and writing .xz compressed files
+import time                 # バッチ処理時間の計測 / For timing batches
+import argparse             # コマンドライン引数の解析 / For parsing command-line arguments
+import networkx as nx       # グラフ構造操作ライブラリ / For graph operations with NetworkX
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED  # ワーカープロセス / Worker processes
+from coords import sidecar_path  # 座標サイドカーのパス / Path of the coordinate sidecar
+from instrument import get_tracer  # 任意の計測フック / Opt-in instrumentation hooks
+from prefilter import Cascade, TRICONNECTED_TESTS  # 安い前段の判定 / Cheap pre-filter cascade
+from store import stage_files  # 入出力ファイルの対応付け / For pairing input and output files
+import planar               # 平面性フィルタ / Planarity filter
+import triconnected         # 3-連結性フィルタ / 3-connectivity filter
+import degree               # 次数フィルタ / Degree filter
+
+# スケジューラ：入力（単一ファイルでもチャンクでも）を「目標実行時間」に合わせた大きさの範囲（バッチ）に
+# 切り分け、空いたワーカーが残りの範囲を次々に取っていく。バッチの大きさは完了したバッチの
+# 1 グラフあたりの実測時間から適応的に決めるので、n やステージによってコストが大きく違っても偏らない。
+# 出力は入力と同じ配置・同じ順序で書き出す（座標サイドカーも引き継ぐ）。
+# Scheduler: cut the input (single file or chunks alike) into ranges (batches) sized to a target
+# runtime; idle workers keep taking the remaining ranges. The batch size adapts to the measured
+# per-graph time of completed batches, so runs stay balanced however the cost varies with n and stage.
+# Output is written in the same layout and order as the input (coordinate sidecars are carried over).
+#   例 / e.g.  python scheduler.py triconnected d3cp 12 -j 8 --target-seconds 2
+
+# 各ステージの既定の出力サフィックス / Default output suffix of each stage
+STAGE_SUFFIX = {"planar": "p", "triconnected": "t", "degree": "d"}
+
+MIN_BATCH = 16          # バッチの最小行数 / Minimum lines per batch
+MAX_BATCH = 200000      # バッチの最大行数 / Maximum lines per batch
+FIRST_BATCH = 256       # 実測前の最初のバッチの行数 / Lines in the first batches, before any measurement
+SMOOTHING = 0.3         # 1 グラフあたり時間の指数移動平均の重み / Weight of the per-graph time moving average
+
+
+# ワーカープロセスで 1 つのバッチを処理し、(残した (graph6, 座標) の組, 処理時間) を返す関数
+# Run one batch in a worker process and return (kept (graph6, coords) pairs, elapsed seconds)
+def run_batch(stage, n, params, items):
+    start = time.perf_counter()
+    if stage == "planar":
+        kept = planar.planar_lines([line for line, _ in items], n, params.get("write_drawing", False))
+    elif stage == "triconnected":
+        # 安い前段で落ちなかったものだけを node_connectivity で判定する
+        # Only graphs surviving the cheap pre-filters reach node_connectivity
+        cascade = Cascade(TRICONNECTED_TESTS)
+        kept = []
+        for line, xy in items:
+            G = nx.from_graph6_bytes(line.encode())
+            if not cascade.reject(G) and triconnected.is_triconnected(G):
+                kept.append((line, xy))
+    elif stage == "degree":
+        kept = [(line, xy) for line, xy in items
+                if degree.matches_degree_conditions(nx.from_graph6_bytes(line.encode()),
+                                                    params["degree_conditions"])]
+    else:
+        raise ValueError(f"Unknown stage: {stage}")
+    return kept, time.perf_counter() - start
+
+
+class BatchSizer:
+    """
+    完了したバッチの実測時間から、次のバッチの行数を目標実行時間に合わせて決めるクラス
+    A class choosing the number of lines of the next batch from the measured time of completed batches.
+    """
+    def __init__(self, target_seconds):
+        self.target_seconds = target_seconds
+        self.per_graph = None  # 1 グラフあたりの秒数（移動平均）/ Seconds per graph (moving average)
+
+    def observe(self, num_items, elapsed):
+        if num_items == 0:
+            return
+        sample = elapsed / num_items
+        if self.per_graph is None:
+            self.per_graph = sample
+        else:
+            self.per_graph += SMOOTHING * (sample - self.per_graph)
+
+    def size(self):
+        if self.per_graph is None:
+            return FIRST_BATCH
+        return max(MIN_BATCH, min(MAX_BATCH, int(self.target_seconds / max(self.per_graph, 1e-9))))
+
+
+# 入力ファイルを順に読み、(ファイル番号, [(graph6, 座標行 or None)]) のバッチを出すジェネレータ
+# （各ファイルの最後には、空でもよいバッチを必ず 1 つ出し、出力ファイルが必ず作られるようにする）
+# Generator reading the input files in order and yielding (file index, [(graph6, coords line or None)])
+# (each file ends with one possibly empty batch, so that every output file is created)
+def read_batches(pairs, sizer, tracer):
+    for file_index, (input_path, _) in enumerate(pairs):
+        has_xy = os.path.exists(sidecar_path(input_path))
+        xy_in = lzma.open(sidecar_path(input_path), "rt") if has_xy else None
+        with lzma.open(tracer.open_input(input_path), "rt") as f_in:
+            batch = []
+            limit = sizer.size()
+            for line in f_in:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                batch.append((line, xy_in.readline().rstrip("\n") if has_xy else None))
+                if len(batch) >= limit:
+                    yield file_index, batch
+                    batch = []
+                    limit = sizer.size()
+            yield file_index, batch
+        if has_xy:
+            xy_in.close()
+
+
+class OrderedWriter:
+    """
+    バッチの結果を読み込み順に、入力と同じ配置の出力ファイル（と座標サイドカー）へ書き出すクラス
+    A class writing batch results, in input order, to output files (and sidecars) mirroring the input.
+    """
+    def __init__(self, pairs, write_xy):
+        self.pairs = pairs
+        self.write_xy = write_xy
+        self.file_index = None
+        self.f_out = None
+        self.xy_out = None
+        self.counts = [0] * len(pairs)
+        self.opened = []    # この実行で書き始めた出力ファイル / Output files started by this run
+
+    def write(self, file_index, kept):
+        if file_index != self.file_index:
+            self.close()
+            self.file_index = file_index
+            output_path = self.pairs[file_index][1]
+            self.opened.append(output_path)
+            self.f_out = lzma.open(output_path, "wt")
+            if self.write_xy[file_index]:
+                self.xy_out = lzma.open(sidecar_path(output_path), "wt")
+        for line, xy in kept:
+            self.f_out.write(line + "\n")
+            if self.xy_out is not None:
+                self.xy_out.write(xy + "\n")
+        self.counts[file_index] += len(kept)
+
+    def close(self):
+        if self.f_out is not None:
+            self.f_out.close()
+            print(f"  -> {self.counts[self.file_index]} graphs saved to {self.pairs[self.file_index][1]}")
+        if self.xy_out is not None:
+            self.xy_out.close()
+        self.f_out = self.xy_out = None
+
+    # 実行が失敗したとき、書きかけを含めてこの実行の出力（と座標サイドカー）をすべて削除する
+    # When the run fails, remove every output of this run (and its sidecar), including the partial one
+    def discard(self):
+        for f in (self.f_out, self.xy_out):
+            if f is not None:
+                f.close()
+        self.f_out = self.xy_out = None
+        for output_path in self.opened:
+            for path in (output_path, sidecar_path(output_path)):
+                if os.path.exists(path):
+                    os.remove(path)
+        self.opened = []
+
+
+# ステージ stage を、適応的なバッチと jobs 個のワーカーで実行する関数（残したグラフの総数を返す）
+# Run the stage with adaptive batches on jobs workers (returns the total number of kept graphs)
+def schedule(stage, input_dir, n, output_dir=None, jobs=None, target_seconds=2.0, params=None, trace=None):
+    if stage not in STAGE_SUFFIX:
+        raise ValueError(f"Unknown stage: {stage}")
+    params = params or {}
+    jobs = jobs or os.cpu_count() or 1
+    output_dir = output_dir or input_dir + STAGE_SUFFIX[stage]
+    pairs = stage_files(input_dir, output_dir, n)
+
+    # 座標サイドカーを書くか：planar は --drawing のとき、それ以外は入力にサイドカーがあるとき
+    # Whether to write a sidecar: for planar with --drawing, otherwise when the input has one
+    if stage == "planar":
+        write_xy = [params.get("write_drawing", False)] * len(pairs)
+    else:
+        write_xy = [os.path.exists(sidecar_path(input_path)) for input_path, _ in pairs]
+
+    tracer = get_tracer(f"schedule-{stage}", trace)
+    tracer.begin([input_path for input_path, _ in pairs])
+
+    sizer = BatchSizer(target_seconds)
+    batches = read_batches(pairs, sizer, tracer)
+    writer = OrderedWriter(pairs, write_xy)
+
+    # 書き出し待ちを含め、同時に抱えるバッチ数の上限（順序どおりの書き出しでメモリが膨らまないように）
+    # Cap on batches held at once, including those waiting to be written (bounds memory of ordered output)
+    window = 4 * jobs
+    pending = {}        # 通し番号 → (ファイル番号, 行数, Future) / Sequence number → (file index, lines, Future)
+    next_seq = 0        # 次に投入するバッチの通し番号 / Sequence number of the next batch to submit
+    next_write = 0      # 次に書き出すバッチの通し番号 / Sequence number of the next batch to write
+    exhausted = False
+
+    # 完了したバッチの実測時間を記録する（失敗・取り消しのバッチは除く。例外は書き出し側で扱う）
+    # Record the measured time of a completed batch (not of failed or cancelled ones; the writer handles errors)
+    def observe(future, num_items):
+        if not future.cancelled() and future.exception() is None:
+            sizer.observe(num_items, future.result()[1])
+
+    # 失敗したら残りのバッチを取り消し、書きかけの出力を削除する（書き出しと計測は必ず閉じる）
+    # On failure, cancel the remaining batches and remove the partial outputs (the writer and tracer are
+    # always closed)
+    executor = ProcessPoolExecutor(max_workers=jobs)
+    completed = False
+    try:
+        while True:
+            # 空いた分だけ、残りの範囲から次のバッチを切り出して投入する
+            # Cut and submit the next batches from the remaining ranges while there is room
+            while not exhausted and len(pending) < window:
+                with tracer.phase("read"):
+                    item = next(batches, None)
+                if item is None:
+                    exhausted = True
+                    break
+                file_index, batch = item
+                future = executor.submit(run_batch, stage, n, params, batch)
+                future.add_done_callback(lambda f, k=len(batch): observe(f, k))
+                pending[next_seq] = (file_index, len(batch), future)
+                next_seq += 1
+            if not pending:
+                break
+
+            # どれかのバッチが終わるまで待ち、その実測時間で次のバッチの大きさを調整する
+            # Wait for any batch to finish and use its measured time to size the next batches
+            with tracer.phase("wait"):
+                running = [future for _, _, future in pending.values() if not future.done()]
+                if running and not pending[next_write][2].done():
+                    wait(running, return_when=FIRST_COMPLETED)
+
+            # 先頭から順に、終わったバッチを書き出す
+            # Write finished batches in order from the head
+            while next_write in pending and pending[next_write][2].done():
+                file_index, num_items, future = pending.pop(next_write)
+                kept, elapsed = future.result()
+                with tracer.phase("write"):
+                    writer.write(file_index, kept)
+                tracer.add_time("compute", elapsed)
+                tracer.count("batches")
+                tracer.count("accepted", len(kept))
+                tracer.tick(num_items)
+                next_write += 1
+        completed = True
+    finally:
+        for _, _, future in pending.values():
+            future.cancel()
+        executor.shutdown()
+        if completed:
+            writer.close()
+        else:
+            writer.discard()
+        tracer.close()
+    return sum(writer.counts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a filter stage with adaptive batches on a pool of workers.")
+    parser.add_argument("stage", choices=sorted(STAGE_SUFFIX), help="filter stage to run")
+    parser.add_argument("input_dir", help="input directory name (e.g., d3c)")
+    parser.add_argument("n", type=int, help="number of vertices (e.g., 11)")
+    parser.add_argument("-j", "--jobs", type=int, help="number of worker processes (default: CPU count)")
+    parser.add_argument("--target-seconds", type=float, default=2.0, help="target runtime of one batch (default: 2)")
+    parser.add_argument("--output-dir", help="output directory (default: input_dir + stage suffix)")
+    parser.add_argument("--drawing", action="store_true", help="planar: also write straight-line drawings")
+    parser.add_argument("-c", "--constraint", action="append", default=[], metavar="DEG:COUNT",
+                        help="degree: constraint, repeatable (e.g., -c 3:n-2 -c n-1:2)")
+    parser.add_argument("--trace", help="write a JSON-lines instrumentation trace to this file")
+    args = parser.parse_args()
+
+    params = {"write_drawing": args.drawing}
+    if args.stage == "degree":
+        if not args.constraint:
+            parser.error("degree needs at least one -c DEG:COUNT")
+        try:
+            params["degree_conditions"] = degree.parse_constraints(args.constraint, args.n)
+        except ValueError as e:
+            parser.error(str(e))
+
+    try:
+        total = schedule(args.stage, args.input_dir, args.n, args.output_dir, args.jobs,
+                         args.target_seconds, params, args.trace)
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        exit(1)
+
+    # 結果を表示
+    # Print result summary
+    print(f"Done. {total} graphs kept by {args.stage}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+
+import os                   # ファイル・ディレクトリ操作 / For file and directory handling
+import lzma                 # .xz 圧縮ファイルの読み書き / For reading and writing .xz compressed files
+import heapq                # ソート済みランの k-way マージ / For k-way merging of sorted runs
+import tempfile             # 一時ランファイルの保存先 / For temporary run files
+import argparse             # コマンドライン引数の解析 / For parsing command-line arguments
+from canon import canonical_lines, canonicalizer_name  # graph6 の正準化 / graph6 canonicalisation
+from store import read_store  # ストアの読み込み / For reading stores
+
+# 一度に同時に開くランファイルの最大数（これを超えると多段マージ）
+# Maximum number of run files merged at once (more runs are merged in several passes)
+MERGE_FAN_IN = 64
+
+
+# ソート済みの行をランファイルに書き出す関数
+# Write sorted lines to a new run file in tmp_dir
+def write_run(lines, tmp_dir):
+    fd, path = tempfile.mkstemp(suffix=".run", dir=tmp_dir)
+    with os.fdopen(fd, "w") as f_out:
+        for line in lines:
+            f_out.write(line + "\n")
+    return path
+
+
+# ランファイルを 1 行ずつ読み出すジェネレータ
+# Generator reading a run file line by line
+def read_run(path):
+    with open(path) as f_in:
+        for line in f_in:
+            yield line.rstrip("\n")
+
+
+# 重複を取り除きながらソート済みストリームを流すジェネレータ
+# Generator dropping consecutive duplicates from a sorted stream
+def unique(sorted_lines):
+    prev = None
+    for line in sorted_lines:
+        if line != prev:
+            yield line
+            prev = line
+
+
+# 外部ソート：正準形をメモリ上限 run_size 行ごとにソートしてランに書き、多段マージする
+# External sort: sort canonical forms in runs of at most run_size lines, then merge in passes
+def external_sort(lines, tmp_dir, run_size):
+    runs = []
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= run_size:
+            buffer.sort()
+            runs.append(write_run(unique(buffer), tmp_dir))
+            buffer = []
+    if buffer:
+        buffer.sort()
+        runs.append(write_run(unique(buffer), tmp_dir))
+
+    # ランが多すぎる場合は MERGE_FAN_IN 個ずつ中間マージする
+    # When there are too many runs, merge them MERGE_FAN_IN at a time
+    while len(runs) > MERGE_FAN_IN:
+        merged = []
+        for i in range(0, len(runs), MERGE_FAN_IN):
+            group = runs[i:i + MERGE_FAN_IN]
+            merged.append(write_run(unique(heapq.merge(*[read_run(p) for p in group])), tmp_dir))
+            for path in group:
+                os.remove(path)
+        runs = merged
+
+    return unique(heapq.merge(*[read_run(p) for p in runs]))
+
+
+# 2 つのソート済み一意ストリームをマージ結合して集合演算を行うジェネレータ
+# Generator merge-joining two sorted unique streams for a set operation
+def merge_join(op, a_lines, b_lines):
+    a = next(a_lines, None)
+    b = next(b_lines, None)
+    while a is not None or b is not None:
+        if b is None or (a is not None and a < b):
+            # a のみに含まれる / Only in A
+            if op in ("union", "difference"):
+                yield a
+            a = next(a_lines, None)
+        elif a is None or b < a:
+            # b のみに含まれる / Only in B
+            if op == "union":
+                yield b
+            b = next(b_lines, None)
+        else:
+            # 両方に含まれる / In both A and B
+            if op in ("union", "intersection"):
+                yield a
+            a = next(a_lines, None)
+            b = next(b_lines, None)
+
+
+# ストアの正準形をソートして一意なストリームとして返す関数
+# Return the canonical forms of a store as a sorted unique stream
+def sorted_store(input_dir, n, tmp_dir, run_size, use_labelg=True):
+    return external_sort(canonical_lines(read_store(input_dir, n), use_labelg), tmp_dir, run_size)
+
+
+# 集合演算を実行し、結果を output_dir/n{n}.g6.xz に書き出す関数
+# Run a set operation and write the result to output_dir/n{n}.g6.xz
+def set_operation(op, dir_a, dir_b, n, output_dir, run_size=100000, use_labelg=True):
+    os.makedirs(output_dir, exist_ok=True)
+    output_path = os.path.join(output_dir, f"n{n}.g6.xz")
+    count = 0
+    with tempfile.TemporaryDirectory(dir=output_dir) as tmp_dir:
+        a_lines = sorted_store(dir_a, n, tmp_dir, run_size, use_labelg)
+        if op == "dedup":
+            result = a_lines
+        else:
+            b_lines = sorted_store(dir_b, n, tmp_dir, run_size, use_labelg)
+            result = merge_join(op, a_lines, b_lines)
+
+        with lzma.open(output_path, "wt") as f_out:
+            for line in result:
+                f_out.write(line + "\n")
+                count += 1
+    return output_path, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Set operations on graph6 stores by canonical form.")
+    parser.add_argument("op", choices=["union", "intersection", "difference", "dedup"], help="set operation")
+    parser.add_argument("dir_a", help="first input directory name (e.g., xfd3cpt)")
+    parser.add_argument("dir_b", nargs="?", help="second input directory name (not used by dedup)")
+    parser.add_argument("n", type=int, help="number of vertices (e.g., 12)")
+    parser.add_argument("-o", "--output-dir", required=True, help="output directory name")
+    parser.add_argument("--run-size", type=int, default=100000, help="lines sorted in memory per run")
+    parser.add_argument("--no-labelg", action="store_true", help="use the Python canonicaliser even if labelg exists")
+    args = parser.parse_args()
+    if args.op != "dedup" and args.dir_b is None:
+        parser.error(f"{args.op} needs two input directories")
+
+    use_labelg = not args.no_labelg
+    print(f"Canonical forms computed by: {canonicalizer_name(use_labelg)}")
+    try:
+        output_path, count = set_operation(args.op, args.dir_a, args.dir_b, args.n, args.output_dir,
+                                           args.run_size, use_labelg)
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        exit(1)
+
+    # 結果を表示
+    # Print result summary
+    print(f"  -> {count} graphs ({args.op}) saved to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+
+import os                   # ファイル・ディレクトリ操作 / For file and directory handling
+import lzma                 # .xz 圧縮ファイルの書き込み / For writing .xz compressed files
+import tempfile             # 外部ソートの一時ランファイル / For temporary run files of the external sort
+import argparse             # コマンドライン引数の解析 / For parsing command-line arguments
+from itertools import chain  # バッチ結果の連結 / For chaining batch results
+from multiprocessing import Pool  # 並列処理 / For parallel processing
+from faces import rotation_system  # 平面埋め込みの回転系 / Rotation system of the planar embedding
+from canon import decode_graph6, encode_graph6, canonical_lines, canonicalizer_name  # graph6 と正準化 / graph6 and canonical forms
+from setop import external_sort  # 正準形の外部ソート・重複除去 / External sort and dedup of canonical forms
+from store import input_files, read_store  # ストアの読み込み / For reading stores
+
+# 多面体グラフ（3-連結平面グラフ）を K4 から直接生成する。
+# Tutte の定理（Diestel 定理 3.2.2）より、3-連結グラフはすべて K4 から「分割後の 2 頂点の次数が
+# ともに 3 以上になる頂点分割」を繰り返して得られ、逆にそのような分割は 3-連結性を保つ。
+# 平面グラフのマイナーは平面的なので、n 頂点の多面体グラフはすべて n-1 頂点の多面体グラフの
+# 平面的な頂点分割として得られる。3-連結平面グラフの埋め込みは一意なので、平面的な分割は
+# 回転系の中で連続する 2 つの区間（両端の近傍は両方に属してもよい）に近傍を分けるものに限られる。
+# Generate polyhedral (3-connected planar) graphs directly from K4.
+# By Tutte's theorem (Diestel, Thm 3.2.2) every 3-connected graph arises from K4 by vertex splits that
+# leave both new vertices with degree >= 3, and every such split preserves 3-connectivity.
+# Minors of planar graphs are planar, so every polyhedral graph on n vertices is a planar split of one
+# on n-1 vertices. A 3-connected planar graph has a unique embedding, so planar splits are exactly those
+# dividing the rotation at a vertex into two contiguous intervals (the two boundary neighbours may be shared).
+#   例 / e.g.  python steinitz.py 10 --output-dir d3cpt
+
+# 1 ワーカーにまとめて渡す入力グラフ数 / Input graphs handed to a worker at once
+BATCH_SIZE = 64
+
+# K4 の graph6 / graph6 of K4
+K4 = "C~"
+
+
+# 頂点 v を、近傍 A を持つ v と近傍 B を持つ新しい頂点に分割した graph6 を返す関数
+# Return the graph6 of splitting v into v (keeping neighbours A) and a new vertex (taking neighbours B)
+def split_vertex(adj, v, A, B):
+    new = len(adj)
+    adj2 = [set(s) for s in adj] + [set()]
+    for w in adj[v]:
+        if w not in A:
+            adj2[v].discard(w)
+            adj2[w].discard(v)
+    for w in B:
+        adj2[new].add(w)
+        adj2[w].add(new)
+    adj2[v].add(new)
+    adj2[new].add(v)
+    return encode_graph6(adj2)
+
+
+# 1 つの多面体グラフの平面的な頂点分割（新しい 2 頂点の次数がともに 3 以上）をすべて出すジェネレータ
+# Generator yielding every planar vertex split of one polyhedral graph (both new vertices of degree >= 3)
+def planar_splits(line):
+    adj = decode_graph6(line)
+    rotation = rotation_system(adj)
+    for v, r in enumerate(rotation):
+        d = len(r)
+        for i in range(d):
+            # A は回転の連続区間 r[i .. i+k-1]、B は残りの区間に A の両端を任意に加えたもの
+            # A is the contiguous interval r[i .. i+k-1]; B is the rest, optionally plus either end of A
+            for k in range(2, d + 1):
+                A = [r[(i + t) % d] for t in range(k)]
+                rest = [r[(i + t) % d] for t in range(k, d)]
+                for share_last in (False, True):
+                    for share_first in (False, True):
+                        B = ([A[-1]] if share_last else []) + rest + ([A[0]] if share_first else [])
+                        if len(B) < 2 or len(set(B)) < len(B):
+                            continue
+                        yield split_vertex(adj, v, A, B)
+
+
+# 入力グラフのまとまりの分割をすべて正準化し、ソート済みの一意なリストで返す関数（ワーカー用）
+# Canonicalise all splits of a batch of input graphs and return them sorted and unique (for workers)
+def canonical_splits(args):
+    lines, use_labelg = args
+    splits = chain.from_iterable(planar_splits(line) for line in lines)
+    return sorted(set(canonical_lines(splits, use_labelg)))
+
+
+# 反復可能オブジェクトを size 個ずつのリストに分けるジェネレータ
+# Generator cutting an iterable into lists of size items
+def batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# n-1 頂点の多面体グラフから n 頂点の多面体グラフを生成し、output_dir/n{n}.g6.xz に書き出す関数
+# Generate the polyhedral graphs on n vertices from those on n-1 and write output_dir/n{n}.g6.xz
+def expand(output_dir, n, jobs=1, run_size=100000, use_labelg=True):
+    os.makedirs(output_dir, exist_ok=True)
+    output_path = os.path.join(output_dir, f"n{n}.g6.xz")
+    batches = ((batch, use_labelg) for batch in batched(read_store(output_dir, n - 1), BATCH_SIZE))
+
+    count = 0
+    with tempfile.TemporaryDirectory(dir=output_dir) as tmp_dir:
+        if jobs > 1:
+            with Pool(jobs) as pool:
+                results = pool.imap_unordered(canonical_splits, batches)
+                unique_lines = external_sort(chain.from_iterable(results), tmp_dir, run_size)
+                count = write_lines(output_path, unique_lines)
+        else:
+            results = map(canonical_splits, batches)
+            unique_lines = external_sort(chain.from_iterable(results), tmp_dir, run_size)
+            count = write_lines(output_path, unique_lines)
+    return output_path, count
+
+
+# 行を .g6.xz ファイルに書き出し、行数を返す関数
+# Write lines to a .g6.xz file and return the number of lines
+def write_lines(output_path, lines):
+    count = 0
+    with lzma.open(output_path, "wt") as f_out:
+        for line in lines:
+            f_out.write(line + "\n")
+            count += 1
+    return count
+
+
+# K4 から始めて、n 頂点までの多面体グラフを output_dir に揃える関数（既にある n は再利用する）
+# Build the polyhedral graphs up to n vertices in output_dir, starting at K4 (existing orders are reused)
+def generate_polyhedra(n, output_dir="d3cpt", jobs=1, run_size=100000, use_labelg=True):
+    if n < 4:
+        raise ValueError("Polyhedral graphs have at least 4 vertices.")
+    os.makedirs(output_dir, exist_ok=True)
+    if input_files(output_dir, 4) is None:
+        write_lines(os.path.join(output_dir, "n4.g6.xz"), [K4])
+
+    results = []
+    for k in range(5, n + 1):
+        if input_files(output_dir, k) is not None and k < n:
+            continue
+        output_path, count = expand(output_dir, k, jobs, run_size, use_labelg)
+        print(f"  -> {count} polyhedral graphs on {k} vertices saved to {output_path}")
+        results.append((output_path, count))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate polyhedral graphs by planar vertex splits from K4.")
+    parser.add_argument("n", type=int, help="number of vertices (>= 4)")
+    parser.add_argument("--output-dir", default="d3cpt", help="output directory (default: d3cpt)")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="number of worker processes (default: 1)")
+    parser.add_argument("--run-size", type=int, default=100000, help="lines sorted in memory per run")
+    parser.add_argument("--no-labelg", action="store_true", help="use the Python canonicaliser even if labelg exists")
+    args = parser.parse_args()
+
+    use_labelg = not args.no_labelg
+    print(f"Canonical forms computed by: {canonicalizer_name(use_labelg)}")
+    try:
+        generate_polyhedra(args.n, args.output_dir, args.jobs, args.run_size, use_labelg)
+    except ValueError as e:
+        print(f"Error: {e}")
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+
+import os       # ファイル・ディレクトリ操作 / For file and directory handling
+import lzma     # .xz 圧縮ファイルの読み込み / For reading .xz compressed files
+import shutil   # チャンクディレクトリの削除 / For removing chunk directories
+from coords import read_coords  # 座標サイドカーの読み込み / For reading the coordinate sidecar
+
+# グラフストアの配置：{dir}/n{n}.g6.xz（単一ファイル）または {dir}/n{n}/*.g6.xz（チャンク）、
+# または辺数で分けた {dir}/n{n}/m{m}/*.g6.xz（m 辺のグラフだけを持つサブストア、partition.py で作る）
+# Store layout: {dir}/n{n}.g6.xz (single file) or {dir}/n{n}/*.g6.xz (chunk files),
+# or split by edge count as {dir}/n{n}/m{m}/*.g6.xz (sub-stores holding the graphs with m edges, see partition.py)
+
+
+# 辺数の指定 "30"、"30:33"、"30,32:34" を辺数の集合にする関数
+# Parse an edge-count selector such as "30", "30:33" or "30,32:34" into a set of edge counts
+def parse_edge_selector(spec):
+    edges = set()
+    for part in spec.split(","):
+        lo, _, hi = part.partition(":")
+        try:
+            edges.update(range(int(lo), int(hi or lo) + 1))
+        except ValueError:
+            raise ValueError(f"Invalid edge selector: {spec} (expected e.g. 30, 30:33 or 30,32:34)")
+    return frozenset(edges)
+
+
+# graph6 行の辺数（上三角のビットを数える。末尾の詰め物のビットは 0）
+# Number of edges of a graph6 line (counts the upper-triangle bits; the padding bits are 0)
+def graph6_edge_count(line):
+    data = line.encode() if isinstance(line, str) else line
+    return sum(bin(byte - 63).count("1") for byte in data[1:])
+
+
+# 辺数で分けたストアなら {辺数: サブストアのディレクトリ}（辺数の昇順）、そうでなければ None を返す関数
+# Return {edge count: sub-store directory} (ascending) for a store split by edge count, otherwise None
+def edge_partitions(input_dir, n):
+    chunk_input_dir = os.path.join(input_dir, f"n{n}")
+    if not os.path.isdir(chunk_input_dir):
+        return None
+    partitions = {int(name[1:]): os.path.join(chunk_input_dir, name) for name in os.listdir(chunk_input_dir)
+                  if name[:1] == "m" and name[1:].isdigit() and os.path.isdir(os.path.join(chunk_input_dir, name))}
+    return dict(sorted(partitions.items())) or None
+
+
+# 辺数の集合を出力ディレクトリ名にする関数（連続なら m30-33、そうでなければ m30_32_34）
+# Directory name for a set of edge counts (m30-33 when contiguous, otherwise m30_32_34)
+def edge_selector_name(edges):
+    edges = sorted(edges)
+    if edges[-1] - edges[0] + 1 == len(edges):
+        return f"m{edges[0]}" if len(edges) == 1 else f"m{edges[0]}-{edges[-1]}"
+    return "m" + "_".join(str(m) for m in edges)
+
+
+# 辺数で分けたストアの m 辺のサブストアの index 番目のチャンクのパス
+# Path of chunk `index` of the sub-store with m edges in a store split by edge count
+def partition_path(input_dir, n, m, index=0):
+    return os.path.join(input_dir, f"n{n}", f"m{m}", f"{index:05d}.g6.xz")
+
+
+# ストアの n 頂点のグラフ（単一ファイルとそのサイドカー、またはチャンクディレクトリ）を削除する関数
+# Remove the graphs on n vertices of a store (the single file with its sidecars, or the chunk directory)
+def remove_store(input_dir, n):
+    prefix = f"n{n}."
+    if os.path.isdir(input_dir):
+        for fname in os.listdir(input_dir):
+            if fname.startswith(prefix) and fname.endswith(".xz"):
+                os.remove(os.path.join(input_dir, fname))
+    chunk_input_dir = os.path.join(input_dir, f"n{n}")
+    if os.path.isdir(chunk_input_dir):
+        shutil.rmtree(chunk_input_dir)
+
+
+# ディレクトリ内のチャンクファイル（"." で始まる書きかけの一時ファイルは除く）
+# Chunk files of a directory (excluding temporary files in progress, whose names start with ".")
+def _g6_files(directory):
+    return [os.path.join(directory, fname) for fname in sorted(os.listdir(directory))
+            if fname.endswith(".g6.xz") and not fname.startswith(".")]
+
+
+# 頂点数 n の入力ファイル群（単一ファイルまたはチャンク）を返す関数（見つからなければ None）
+# 辺数で分けたストアで edges（辺数の集合）を指定すると、その辺数のサブストアだけを返す
+# Return the input files for n (single file or chunk files), or None if there are none
+# For a store split by edge count, edges (a set of edge counts) selects only those sub-stores
+def input_files(input_dir, n, edges=None):
+    single_input_path = os.path.join(input_dir, f"n{n}.g6.xz")
+    chunk_input_dir = os.path.join(input_dir, f"n{n}")
+    if os.path.exists(single_input_path):
+        return [single_input_path]
+    if os.path.isdir(chunk_input_dir):
+        partitions = edge_partitions(input_dir, n)
+        if partitions is None:
+            return _g6_files(chunk_input_dir)
+        return [path for m, directory in partitions.items() if edges is None or m in edges
+                for path in _g6_files(directory)]
+    return None
+
+
+# 入力ファイル群を読み、見つからなければ例外を送出する関数
+# Return the input files for n, raising an error if neither layout exists
+def require_input_files(input_dir, n, edges=None):
+    paths = input_files(input_dir, n, edges)
+    if paths is None:
+        raise FileNotFoundError(f"No valid input file or chunk directory found for n={n} in {input_dir}")
+    return paths
+
+
+# 入力ファイルと、同じ配置の出力ファイルの組を返す関数（出力ディレクトリも作成する）
+# Return (input, output) path pairs mirroring the input layout (and create output directories)
+def stage_files(input_dir, output_dir, n, edges=None):
+    paths = require_input_files(input_dir, n, edges)
+    pairs = []
+    for input_path in paths:
+        output_path = os.path.join(output_dir, os.path.relpath(input_path, input_dir))
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        pairs.append((input_path, output_path))
+    return pairs
+
+
+# 1 つの .g6.xz ファイルから graph6 行を読み出すジェネレータ（edges を指定するとその辺数の行だけ）
+# Generator yielding graph6 lines from one .g6.xz file (only lines with an edge count in edges, if given)
+def read_graph6(path, edges=None):
+    with lzma.open(path, "rt") as f_in:
+        for line in f_in:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                if edges is None or graph6_edge_count(line) in edges:
+                    yield line
+
+
+# ストア全体の graph6 行を順に読み出すジェネレータ
+# （edges を指定すると、辺数で分けたストアでは該当するサブストアだけを読む）
+# Generator yielding all graph6 lines of a store in order
+# (with edges, a store split by edge count reads only the matching sub-stores)
+def read_store(input_dir, n, edges=None):
+    for path in require_input_files(input_dir, n, edges):
+        yield from read_graph6(path, edges)
+
+
+# ストア全体の graph6 行と、座標サイドカーの座標（なければ None）を組で読み出すジェネレータ
+# Generator yielding (graph6 line, sidecar coordinates or None) for the whole store
+def read_store_with_coords(input_dir, n, edges=None):
+    for path in require_input_files(input_dir, n, edges):
+        xy = read_coords(path)
+        for line in read_graph6(path):
+            pos = next(xy)
+            if edges is None or graph6_edge_count(line) in edges:
+                yield line, pos
@@ -1,79 +1,137 @@
 #!/usr/bin/env python3
 
 import os                   # ファイル操作 / For file and directory handling
-import lzma                 # .xz 圧縮ファイルの読み書き / For reading and writing .xz compressed files
+import argparse             # コマンドライン引数の解析 / For parsing command-line arguments
 import networkx as nx       # グラフ構造操作ライブラリ / For graph operations with NetworkX
+from coords import sidecar_path  # 座標サイドカーのパス / Path of the coordinate sidecar
+from instrument import get_tracer  # 任意の計測フック / Opt-in instrumentation hooks
+from prefilter import Cascade, TRICONNECTED_TESTS  # 安い前段の判定 / Cheap pre-filter cascade
+from pipeline import run_pipeline, phase  # 展開・判定・圧縮を重ねる実行基盤 / Overlapped decompress/filter/compress runtime
+from predcache import PredicateCache, DEFAULT_CACHE_PATH  # 判定結果の永続キャッシュ / Persistent predicate cache
+from store import stage_files  # 入出力ファイルの対応付け / For pairing input and output files
 
-# 入力ディレクトリ名と、頂点数 n をユーザー入力から受け取る
-# Prompt the user for the input directory name and the number of vertices
-input_dir = input("Enter input directory name (e.g., d3cp): ").strip()
-n = int(input("Enter the number of vertices (e.g., 11): ").strip())
 
-# 出力ディレクトリは、入力ディレクトリ名に 't' を付けた名前（例: d3cpt）
-# The output directory is named by appending 't' to the input directory (e.g., d3cpt)
-output_dir = input_dir + "t"
+# グラフが 3-連結か（頂点連結度 ≥ 3）を判定する関数
+# Check 3-connectivity (node connectivity ≥ 3)
+def is_triconnected(G):
+    return nx.node_connectivity(G) >= 3
 
-# 単一の .g6.xz ファイルのパス（ファイルが分割されていない場合）
-# Path for the single .g6.xz file if not split
-single_input_path = os.path.join(input_dir, f"n{n}.g6.xz")
-single_output_path = os.path.join(output_dir, f"n{n}.g6.xz")
-
-# 分割されたファイルが格納されたディレクトリ（大規模な入力時）
-# Directory containing split chunk files (used when the input is large)
-chunk_input_dir = os.path.join(input_dir, f"n{n}")
-chunk_output_dir = os.path.join(output_dir, f"n{n}")
-
-# 出力ディレクトリが存在しなければ作成する
-# Create the output directory if it doesn't exist
-os.makedirs(output_dir, exist_ok=True)
 
 # 指定された .g6.xz ファイルまたはチャンクファイルを処理して3連結なグラフのみを出力する関数
+# （展開・判定・圧縮は pipeline.py のスレッドで重ねて実行する）
 # This function processes the specified .g6.xz file and writes only 3-connected graphs to the output
-def process_file(input_path, output_path, n):
-    with lzma.open(input_path, "rt") as f_in, lzma.open(output_path, "wt") as f_out:
-        count = 0  # 3-連結なグラフの個数をカウント / Counter for 3-connected graphs
-
-        # 入力ファイルを 1 行ずつ読み取りながら処理
-        # Process each line (graph) from the input file
-        for line in f_in:
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
-
-            # graph6 文字列を NetworkX グラフに変換
-            # Convert the graph6 string to a NetworkX graph
-            G = nx.from_graph6_bytes(line.encode())
-
-            # 3-連結性の確認（頂点連結度 ≥ 3）
-            # Check 3-connectivity (node connectivity ≥ 3)
-            if nx.node_connectivity(G) >= 3:
-                f_out.write(line + '\n')
-                count += 1
-
-        # 結果を表示
-        # Print result summary
-        print(f"  -> {count} 3-connected planar graphs saved to {output_path}")
-
-
-# 単一ファイルが存在すれば、それを処理
-# If the single file exists, process it
-if os.path.exists(single_input_path):
-    print(f"Processing: {single_input_path}")
-    process_file(single_input_path, single_output_path, n)
-
-# それ以外の場合、チャンクされたファイル群が存在するか確認し、すべて処理する
-# Otherwise, if chunked files exist, process each one
-elif os.path.isdir(chunk_input_dir):
-    os.makedirs(chunk_output_dir, exist_ok=True)
-    for fname in sorted(os.listdir(chunk_input_dir)):
-        if not fname.endswith(".g6.xz"):
-            continue
-        input_path = os.path.join(chunk_input_dir, fname)
-        output_path = os.path.join(chunk_output_dir, fname)
-        print(f"Processing chunk: {input_path}")
-        process_file(input_path, output_path, n)
-
-# 入力ファイルもチャンクも存在しない場合はエラー
-# If neither a file nor a chunk directory exists, show an error
-else:
-    print("Error: No valid input file or chunk directory found.")
+# (decompression, testing and compression overlap on the threads of pipeline.py)
+def process_file(input_path, output_path, n, tracer=None, workers=1, cascade=None, cache=None):
+    cascade = cascade or Cascade(TRICONNECTED_TESTS)
+
+    # graph6 行（str）を NetworkX のグラフにする（pipeline.py の中では decode の時間として記録する）
+    # Decode a graph6 line (str) into a NetworkX graph (recorded as decode time inside pipeline.py)
+    def decode(line):
+        with phase("decode"):
+            return nx.from_graph6_bytes(line.encode())
+
+    # graph6 行（str）のリストの各グラフが 3-連結かを判定する
+    # Test whether each graph of a list of graph6 lines (str) is 3-connected
+    def test(lines):
+        flags = []
+        for line in lines:
+            G = decode(line)
+            flags.append(not cascade.reject(G) and is_triconnected(G))
+        return flags
+
+    # graph6 行（bytes）のまとまりから 3-連結なものだけを残す（座標サイドカーの行も一緒に運ぶ）
+    # 最小次数や関節点などの安い前段で落ちなかったものだけを node_connectivity で判定する
+    # cache を渡すと、前段を通過したもののうちキャッシュにないものだけを判定する
+    # Keep the 3-connected graphs of a batch of graph6 lines (bytes), with their coordinate sidecar lines
+    # Only graphs surviving the cheap pre-filters (minimum degree, articulation points, ...) reach node_connectivity
+    # With a cache, only graphs passing the pre-filters and missing from the cache are tested
+    def keep_triconnected(batch):
+        if cache is None:
+            flags = test([line.decode() for line, _ in batch])
+            return [item for item, flag in zip(batch, flags) if flag]
+
+        # 安い前段で落ちたものはキャッシュを引かずに捨て、残ったものだけを正準化してキャッシュを引く
+        # Graphs rejected by the cheap pre-filters are dropped without a lookup; only the survivors are
+        # canonicalised and looked up
+        batch = [(line, xy) for line, xy in batch if not cascade.reject(decode(line.decode()))]
+        flags = cache.resolve("triconnected", [line.decode() for line, _ in batch],
+                              lambda lines: [is_triconnected(decode(line)) for line in lines])
+        return [item for item, flag in zip(batch, flags) if flag]
+
+    # 入力に座標サイドカーがあれば、残したグラフの座標も引き継ぐ
+    # If the input has a coordinate sidecar, carry the coordinates of kept graphs over
+    has_xy = os.path.exists(sidecar_path(input_path))
+    count = run_pipeline(input_path, output_path, keep_triconnected, has_xy, has_xy, workers, tracer=tracer)
+
+    # 結果を表示
+    # Print result summary
+    print(f"  -> {count} 3-connected planar graphs saved to {output_path}")
+    return count
+
+
+# ストア input_dir の n 頂点グラフから 3-連結グラフを抽出する関数（出力は既定で input_dir + 't'）
+# （cache に PredicateCache を渡すと、ほかの族やストアで判定済みのグラフの結果を再利用する）
+# Keep the 3-connected graphs on n vertices of input_dir (output defaults to input_dir + 't')
+# (pass a PredicateCache as cache to reuse the results of graphs tested in other families or stores)
+def triconnected_filter(input_dir, n, output_dir=None, trace=None, workers=1, cache=None):
+    # 出力ディレクトリは、入力ディレクトリ名に 't' を付けた名前（例: d3cpt）
+    # The output directory is named by appending 't' to the input directory (e.g., d3cpt)
+    output_dir = output_dir or input_dir + "t"
+    pairs = stage_files(input_dir, output_dir, n)
+
+    # 計測フック（--trace または環境変数 PIPELINE_TRACE が設定されたときだけ記録する）
+    # Instrumentation hooks (records only when --trace or PIPELINE_TRACE is set)
+    tracer = get_tracer("triconnected", trace)
+    tracer.begin([input_path for input_path, _ in pairs])
+
+    # 前段の判定ごとに落とした個数を、全ファイルで数える
+    # Count the rejections of every pre-filter over all files
+    cascade = Cascade(TRICONNECTED_TESTS)
+
+    total = 0
+    for input_path, output_path in pairs:
+        print(f"Processing: {input_path}")
+        total += process_file(input_path, output_path, n, tracer, workers, cascade, cache)
+    print(f"Pre-filter: {cascade.summary()}")
+    cascade.record(tracer)
+    if cache is not None:
+        print(f"Predicate cache: {cache.summary()}")
+        cache.record(tracer)
+    tracer.close()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep only 3-connected graphs.")
+    parser.add_argument("input_dir", help="input directory name (e.g., d3cp)")
+    parser.add_argument("n", type=int, help="number of vertices (e.g., 11)")
+    parser.add_argument("--output-dir", help="output directory (default: input_dir + 't')")
+    parser.add_argument("--trace", help="write a JSON-lines instrumentation trace to this file")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="filter threads per file, overlapped with xz decompression and compression (default: 1)")
+    parser.add_argument("--cache", action="store_true", help="reuse 3-connectivity results from the predicate cache")
+    parser.add_argument("--cache-path", default=DEFAULT_CACHE_PATH,
+                        help=f"predicate cache file (default: {DEFAULT_CACHE_PATH})")
+    parser.add_argument("--cache-max-mb", type=int, default=1024, help="cache size limit in MB (default: 1024)")
+    parser.add_argument("--no-labelg", action="store_true", help="use the Python canonicaliser even if labelg exists")
+    args = parser.parse_args()
+
+    try:
+        cache = PredicateCache(args.cache_path, args.cache_max_mb << 20, not args.no_labelg) if args.cache else None
+    except ValueError as e:
+        parser.error(str(e))
+
+    try:
+        triconnected_filter(args.input_dir, args.n, args.output_dir, args.trace, args.workers, cache)
+    except FileNotFoundError as e:
+        # 入力ファイルもチャンクも存在しない場合はエラー
+        # If neither a file nor a chunk directory exists, show an error
+        print(f"Error: {e}")
+        exit(1)
+    finally:
+        if cache is not None:
+            cache.close()
+
+
+if __name__ == "__main__":
+    main()
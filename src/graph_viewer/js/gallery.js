@@ -0,0 +1,223 @@
+// js/gallery.js
+
+// サムネイル一覧（仮想化グリッド）：見えている行のタイルだけを DOM に置き、
+// そのタイルの JSON だけを取得してキャンバスに簡易描画する。数千個のグラフでも軽く動く。
+// Thumbnail gallery (virtualized grid): only the tiles of visible rows are kept in the DOM,
+// and only their JSON files are fetched and drawn on small canvases. Stays responsive for thousands of graphs.
+
+const TILE_SIZE = 160;        // タイル 1 辺の大きさ（px）/ Tile size (px)
+const TILE_GAP = 8;           // タイル間の余白（px）/ Gap between tiles (px)
+const BUFFER_ROWS = 2;        // 画面外に余分に描く行数 / Extra rows rendered off screen
+const MAX_FETCHES = 6;        // 同時に取得する JSON の上限 / Maximum concurrent JSON fetches
+const CACHE_LIMIT = 1000;     // 取得済み JSON を保持する上限 / Maximum number of cached JSON files
+
+// ギャラリーの状態 / Gallery state
+const gallery = {
+  container: null,            // スクロールする外枠 / Scrolling container
+  spacer: null,               // 全体の高さを持つ内側の要素 / Inner element holding the full height
+  dir: '',                    // json/{type}/{n} / Directory of the JSON files
+  files: [],                  // 表示するファイル名の一覧 / File names to show
+  tiles: new Map(),           // 番号 → 表示中のタイル要素 / Index → tile element on screen
+  cache: new Map(),           // パス → 取得済み JSON（挿入順で古いものから捨てる）/ Path → fetched JSON (oldest dropped first)
+  queue: [],                  // 取得待ちの番号 / Indices waiting to be fetched
+  active: 0,                  // 取得中の件数 / Number of fetches in flight
+  onOpen: null,               // タイルをクリックしたときの処理 / Handler for a tile click
+  frame: null                 // requestAnimationFrame の ID / requestAnimationFrame id
+};
+
+// ギャラリーを初期化する関数（container はスクロールする div）
+// Initialize the gallery (container is the scrolling div)
+function initGallery(container, onOpen) {
+  gallery.container = container;
+  gallery.onOpen = onOpen;
+  gallery.spacer = document.createElement('div');
+  gallery.spacer.style.position = 'relative';
+  container.appendChild(gallery.spacer);
+
+  // スクロール・リサイズのたびに、次のフレームでまとめて描き直す
+  // Re-render once per frame on scroll and resize
+  const schedule = () => {
+    if (gallery.frame === null) {
+      gallery.frame = requestAnimationFrame(() => {
+        gallery.frame = null;
+        renderVisibleTiles();
+      });
+    }
+  };
+  container.addEventListener('scroll', schedule);
+  window.addEventListener('resize', schedule);
+}
+
+// 指定したディレクトリのファイル一覧をギャラリーに表示する関数
+// Show the files of one directory in the gallery
+function showGallery(dir, files) {
+  gallery.dir = dir;
+  gallery.files = files;
+  gallery.queue = [];
+  gallery.tiles.forEach(tile => tile.remove());
+  gallery.tiles.clear();
+  gallery.container.scrollTop = 0;
+  renderVisibleTiles();
+}
+
+// 1 行あたりのタイル数 / Number of tiles per row
+function galleryColumns() {
+  return Math.max(1, Math.floor((gallery.container.clientWidth + TILE_GAP) / (TILE_SIZE + TILE_GAP)));
+}
+
+// 見えている範囲のタイルだけを作り、範囲外のタイルを取り除く関数
+// Create the tiles in the visible range and remove those outside it
+function renderVisibleTiles() {
+  const cols = galleryColumns();
+  const rows = Math.ceil(gallery.files.length / cols);
+  const pitch = TILE_SIZE + TILE_GAP;
+  gallery.spacer.style.height = `${rows * pitch}px`;
+
+  const firstRow = Math.max(0, Math.floor(gallery.container.scrollTop / pitch) - BUFFER_ROWS);
+  const lastRow = Math.min(rows - 1,
+    Math.ceil((gallery.container.scrollTop + gallery.container.clientHeight) / pitch) + BUFFER_ROWS);
+  const first = firstRow * cols;
+  const last = Math.min(gallery.files.length - 1, (lastRow + 1) * cols - 1);
+
+  // 範囲外のタイルを削除 / Remove tiles outside the range
+  gallery.tiles.forEach((tile, idx) => {
+    if (idx < first || idx > last) {
+      tile.remove();
+      gallery.tiles.delete(idx);
+    }
+  });
+
+  // 範囲内のタイルを作成（位置は列数が変わったときのために毎回更新）
+  // Create tiles in the range (positions are refreshed in case the column count changed)
+  for (let idx = first; idx <= last; idx++) {
+    let tile = gallery.tiles.get(idx);
+    if (!tile) {
+      tile = createTile(idx);
+      gallery.tiles.set(idx, tile);
+      gallery.spacer.appendChild(tile);
+      requestThumbnail(idx);
+    }
+    tile.style.left = `${(idx % cols) * pitch}px`;
+    tile.style.top = `${Math.floor(idx / cols) * pitch}px`;
+  }
+  pumpFetches();
+}
+
+// タイル要素（キャンバス + 番号）を作る関数
+// Create a tile element (canvas + index caption)
+function createTile(idx) {
+  const tile = document.createElement('div');
+  tile.className = 'tile';
+  tile.style.width = `${TILE_SIZE}px`;
+  tile.style.height = `${TILE_SIZE}px`;
+
+  const canvas = document.createElement('canvas');
+  const ratio = window.devicePixelRatio || 1;
+  canvas.width = TILE_SIZE * ratio;
+  canvas.height = (TILE_SIZE - 20) * ratio;
+  canvas.style.width = `${TILE_SIZE}px`;
+  canvas.style.height = `${TILE_SIZE - 20}px`;
+  tile.appendChild(canvas);
+
+  const caption = document.createElement('div');
+  caption.className = 'tile-caption';
+  caption.textContent = `(${idx + 1})`;
+  tile.appendChild(caption);
+
+  tile.addEventListener('click', () => gallery.onOpen(gallery.files[idx]));
+  return tile;
+}
+
+// サムネイルを描く：取得済みならすぐ描き、なければ取得待ちに入れる
+// Draw a thumbnail right away if fetched, otherwise queue the fetch
+function requestThumbnail(idx) {
+  const path = `${gallery.dir}/${gallery.files[idx]}`;
+  if (gallery.cache.has(path)) {
+    drawThumbnail(idx, gallery.cache.get(path));
+  } else {
+    gallery.queue.push(idx);
+  }
+}
+
+// 同時取得数の上限まで取得を開始する関数（既に画面外になったタイルは飛ばす）
+// Start fetches up to the concurrency limit (skipping tiles that have left the screen)
+function pumpFetches() {
+  while (gallery.active < MAX_FETCHES && gallery.queue.length > 0) {
+    const idx = gallery.queue.shift();
+    if (!gallery.tiles.has(idx)) continue;
+
+    const dir = gallery.dir;
+    const path = `${dir}/${gallery.files[idx]}`;
+    gallery.active++;
+    fetch(path)
+      .then(response => {
+        if (!response.ok) throw new Error(`HTTP ${response.status}`);
+        return response.json();
+      })
+      .then(data => {
+        gallery.cache.set(path, data);
+        if (gallery.cache.size > CACHE_LIMIT) {
+          gallery.cache.delete(gallery.cache.keys().next().value);
+        }
+        // 取得中に別のディレクトリへ切り替わっていなければ描画
+        // Draw unless the gallery switched to another directory meanwhile
+        if (gallery.dir === dir) drawThumbnail(idx, data);
+      })
+      .catch(err => console.error('[gallery] error:', path, err))
+      .finally(() => {
+        gallery.active--;
+        pumpFetches();
+      });
+  }
+}
+
+// Cytoscape 形式の JSON をタイルのキャンバスに簡易描画する関数（黒い辺と頂点）
+// Draw Cytoscape-style JSON on the tile canvas (black edges and nodes)
+function drawThumbnail(idx, data) {
+  const tile = gallery.tiles.get(idx);
+  if (!tile) return;
+  const canvas = tile.querySelector('canvas');
+  const ctx = canvas.getContext('2d');
+  const ratio = window.devicePixelRatio || 1;
+  const width = canvas.width / ratio;
+  const height = canvas.height / ratio;
+  ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+  ctx.clearRect(0, 0, width, height);
+
+  // 座標をキャンバスに収まるように拡大縮小（縦横比は保つ）
+  // Scale positions to fit the canvas (keeping the aspect ratio)
+  const pos = {};
+  const xs = data.nodes.map(node => node.position.x);
+  const ys = data.nodes.map(node => node.position.y);
+  const minX = Math.min(...xs), maxX = Math.max(...xs);
+  const minY = Math.min(...ys), maxY = Math.max(...ys);
+  const margin = 8;
+  const scale = Math.min((width - 2 * margin) / ((maxX - minX) || 1),
+                         (height - 2 * margin) / ((maxY - minY) || 1));
+  const offsetX = (width - (maxX - minX) * scale) / 2;
+  const offsetY = (height - (maxY - minY) * scale) / 2;
+  data.nodes.forEach(node => {
+    pos[node.data.id] = [
+      offsetX + (node.position.x - minX) * scale,
+      offsetY + (node.position.y - minY) * scale
+    ];
+  });
+
+  ctx.strokeStyle = '#000';
+  ctx.lineWidth = 1;
+  ctx.beginPath();
+  data.edges.forEach(edge => {
+    const [x1, y1] = pos[edge.data.source];
+    const [x2, y2] = pos[edge.data.target];
+    ctx.moveTo(x1, y1);
+    ctx.lineTo(x2, y2);
+  });
+  ctx.stroke();
+
+  ctx.fillStyle = '#000';
+  Object.values(pos).forEach(([x, y]) => {
+    ctx.beginPath();
+    ctx.arc(x, y, 2.5, 0, 2 * Math.PI);
+    ctx.fill();
+  });
+}
@@ -264,9 +264,46 @@ window.onload = () => {
   // Update file options when the n selection changes
   nSelect.addEventListener('change', updateFileOptions);
 
+  // Cytoscape 表示とギャラリー表示を切り替える関数
+  // Functions to switch between the Cytoscape view and the gallery view
+  const cyDiv      = document.getElementById('cy');
+  const galleryDiv = document.getElementById('gallery');
+  const galleryBtn = document.getElementById('galleryBtn');
+  let galleryVisible = false;
+
+  const showEditor = () => {
+    galleryVisible = false;
+    galleryDiv.style.display = 'none';
+    cyDiv.style.display = 'block';
+  };
+
+  const openGallery = () => {
+    galleryVisible = true;
+    cyDiv.style.display = 'none';
+    galleryDiv.style.display = 'block';
+    showGallery(`json/${typeSelect.value}/${nSelect.value}`, dataMap[typeSelect.value][nSelect.value]);
+  };
+
+  // タイルをクリックしたら、そのグラフを Cytoscape で開く
+  // Clicking a tile opens that graph in Cytoscape
+  initGallery(galleryDiv, file => {
+    fileSelect.value = file;
+    showEditor();
+    const path = `json/${typeSelect.value}/${nSelect.value}/${file}`;
+    console.log('[Gallery] path=', path);
+    loadGraph(path);
+  });
+  galleryBtn.addEventListener('click', openGallery);
+
+  // ギャラリー表示中に type / n を変えたら一覧も切り替える
+  // Refresh the gallery when type / n change while it is shown
+  typeSelect.addEventListener('change', () => { if (galleryVisible) openGallery(); });
+  nSelect.addEventListener('change', () => { if (galleryVisible) openGallery(); });
+
   // Draw ボタン押下時の処理
   // On Draw button click, construct path and load graph
   drawBtn.addEventListener('click', () => {
+    showEditor();
     const path = `json/${typeSelect.value}/${nSelect.value}/${fileSelect.value}`;
     console.log('[Draw] path=', path);
     loadGraph(path);
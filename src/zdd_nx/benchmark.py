@@ -0,0 +1,244 @@
+#! /usr/bin/env python
+
+import os
+import io
+import sys
+import json
+import time
+import resource
+import argparse
+import tempfile
+import tracemalloc
+import contextlib
+import multiprocessing
+import networkx as nx
+
+# geng_boost のステージと正準化を読み込む
+# Load the geng_boost stages and canonicaliser
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "geng_boost"))
+from canon import canonical_lines, canonicalizer_name
+from store import read_store
+
+# エンジン間のベンチマークと整合性検査：n = 4..N について
+#   zdd      : enumerate_polyhedral_graph.py（Graphillion + NetworkX）
+#   geng     : geng_boost（geng -c -d3 → planar → triconnected）
+#   steinitz : geng_boost/steinitz.py（K4 からの平面的な頂点分割）
+# を段ごとに実行し、壁時計時間と Python のピークメモリ（tracemalloc）、プロセスのピーク RSS を記録する。
+# さらに、個数が既知の値（OEIS A000944）と一致するか、正準形の集合がエンジン間で一致するかを確かめる。
+# 各 (エンジン, n) は新しいプロセスで実行するので、RSS は互いに影響しない。
+# Cross-engine benchmark and consistency suite: for n = 4..N, run
+#   zdd      : enumerate_polyhedral_graph.py (Graphillion + NetworkX)
+#   geng     : geng_boost (geng -c -d3 → planar → triconnected)
+#   steinitz : geng_boost/steinitz.py (planar vertex splits from K4)
+# stage by stage, recording wall time, peak Python memory (tracemalloc) and the peak RSS of the process.
+# Counts are checked against the known values (OEIS A000944) and the canonical sets against each other.
+# Every (engine, n) runs in a fresh process, so the RSS figures do not affect each other.
+#   例 / e.g.  python benchmark.py 9 --zdd-max-n 7 --json bench.json
+
+# 多面体グラフの個数（OEIS A000944、n = 4, 5, ...）
+# Number of polyhedral graphs (OEIS A000944, n = 4, 5, ...)
+KNOWN_COUNTS = {4: 1, 5: 2, 6: 7, 7: 34, 8: 257, 9: 2606, 10: 32300, 11: 440564, 12: 6384634}
+
+ENGINES = ("zdd", "geng", "steinitz")
+
+
+class StageTimer:
+    """
+    段ごとの壁時計時間と tracemalloc のピークを記録するクラス
+    A class recording wall time and the tracemalloc peak of every stage.
+    """
+    def __init__(self):
+        self.stages = []
+        tracemalloc.start()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        self.stages.append({"stage": name, "seconds": round(elapsed, 4), "py_peak_kb": peak // 1024})
+
+
+# ピーク RSS（KB、子プロセスの geng や planar も含む）/ Peak RSS in KB (including child processes such as geng and planar)
+def peak_rss_kb():
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(own, children)
+
+
+def run_zdd(n, timer, work_dir, use_labelg):
+    import enumerate_polyhedral_graph as zdd
+    with timer.stage("degree+connected"):
+        stage = zdd.zdd_stages(n)
+    with timer.stage("isomorphism"):
+        stage = zdd.IsomorphismRemoval(stage)
+    with timer.stage("planarity"):
+        stage = zdd.PlanarityRemoval(stage)
+    with timer.stage("connectivity"):
+        stage = zdd.PolyhedralRemoval(stage)
+
+    # 頂点 1..n を 0..n-1 に付け替えて graph6 にする / Relabel 1..n to 0..n-1 and encode as graph6
+    lines = []
+    for G in stage.graphs:
+        H = nx.convert_node_labels_to_integers(G, ordering="sorted")
+        lines.append(nx.to_graph6_bytes(H, header=False).decode().strip())
+    return lines
+
+
+def run_geng(n, timer, work_dir, use_labelg):
+    from geng import generate
+    from planar import planar_filter
+    from triconnected import triconnected_filter
+    base_dir = os.path.join(work_dir, "d3c")
+    with timer.stage("geng"):
+        generate(["-c", "-d3"], n, base_dir)
+    with timer.stage("planar"):
+        planar_filter(base_dir, n)
+    with timer.stage("triconnected"):
+        triconnected_filter(base_dir + "p", n)
+    return list(read_store(base_dir + "pt", n))
+
+
+def run_steinitz(n, timer, work_dir, use_labelg):
+    from steinitz import generate_polyhedra
+    output_dir = os.path.join(work_dir, "d3cpt")
+    with timer.stage("steinitz"):
+        generate_polyhedra(n, output_dir, use_labelg=use_labelg)
+    return list(read_store(output_dir, n))
+
+
+RUNNERS = {"zdd": run_zdd, "geng": run_geng, "steinitz": run_steinitz}
+
+
+# 1 つの (エンジン, n) を実行する関数（新しいプロセスで呼ばれる）
+# Run one (engine, n) (called in a fresh process)
+def run_engine(engine, n, use_labelg):
+    timer = StageTimer()
+    result = {"engine": engine, "n": n}
+    try:
+        with tempfile.TemporaryDirectory() as work_dir, contextlib.redirect_stdout(io.StringIO()):
+            lines = RUNNERS[engine](n, timer, work_dir, use_labelg)
+            with timer.stage("canonical"):
+                canonical = sorted(set(canonical_lines(lines, use_labelg)))
+    except (FileNotFoundError, OSError) as e:
+        result["error"] = str(e)
+        return result
+    result.update(stages=timer.stages, rss_kb=peak_rss_kb(), count=len(lines),
+                  seconds=round(sum(s["seconds"] for s in timer.stages), 4), canonical=canonical)
+    return result
+
+
+# タイムアウト付きで新しいプロセスで実行する関数 / Run in a fresh process with a timeout
+def run_isolated(engine, n, use_labelg, timeout):
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(1) as pool:
+        pending = pool.apply_async(run_engine, (engine, n, use_labelg))
+        try:
+            return pending.get(timeout)
+        except multiprocessing.TimeoutError:
+            return {"engine": engine, "n": n, "error": f"timeout after {timeout}s"}
+        except Exception as e:
+            # 子プロセスで起きたその他の例外も、そのエンジンの結果なしとして記録する
+            # Any other exception raised in the child is also recorded as no result for the engine
+            return {"engine": engine, "n": n, "error": f"{type(e).__name__}: {e}"}
+
+
+# 結果を比べて、不一致の説明のリストを返す関数（エラーやタイムアウトで結果のないエンジンも不一致に数える）
+# Compare the results and return a list of mismatches (engines without a result because of an error or a
+# timeout count as mismatches too)
+def check_consistency(results):
+    problems = []
+    by_n = {}
+    for result in results:
+        if "error" in result:
+            problems.append(f"n={result['n']}: {result['engine']} produced no result ({result['error']})")
+        elif "skipped" not in result:
+            by_n.setdefault(result["n"], []).append(result)
+    for n, runs in sorted(by_n.items()):
+        for result in runs:
+            known = KNOWN_COUNTS.get(n)
+            if known is not None and result["count"] != known:
+                problems.append(f"n={n}: {result['engine']} found {result['count']} graphs, expected {known}")
+            if len(result["canonical"]) != result["count"]:
+                problems.append(f"n={n}: {result['engine']} output contains isomorphic duplicates")
+        reference = runs[0]
+        for result in runs[1:]:
+            ref_set, other_set = set(reference["canonical"]), set(result["canonical"])
+            if ref_set != other_set:
+                problems.append(f"n={n}: {reference['engine']} and {result['engine']} differ "
+                                f"({len(ref_set - other_set)} only in {reference['engine']}, "
+                                f"{len(other_set - ref_set)} only in {result['engine']})")
+    return problems
+
+
+# エンジンと n の組を順に実行する関数（max_n はエンジンごとの上限）
+# Run every engine for n = min_n..max_n (limits caps n per engine)
+def benchmark(max_n, min_n=4, engines=ENGINES, limits=None, use_labelg=True, timeout=600):
+    limits = limits or {}
+    results = []
+    for n in range(min_n, max_n + 1):
+        for engine in engines:
+            if n > limits.get(engine, max_n):
+                # 上限を超えた n は実行せず、比べなかったことを記録する
+                # n above the limit is not run, but recorded as not compared
+                results.append({"engine": engine, "n": n, "skipped": f"above --{engine}-max-n {limits[engine]}"})
+                continue
+            result = run_isolated(engine, n, use_labelg, timeout)
+            results.append(result)
+            if "error" in result:
+                print(f"n={n:2d} {engine:9s} error: {result['error']}")
+                continue
+            stages = ", ".join(f"{s['stage']} {s['seconds']:.2f}s/{s['py_peak_kb']}KB" for s in result["stages"])
+            print(f"n={n:2d} {engine:9s} count={result['count']:8d} total={result['seconds']:8.2f}s "
+                  f"rss={result['rss_kb'] // 1024}MB  [{stages}]")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ZDD, geng and Steinitz engines and check they agree.")
+    parser.add_argument("n", type=int, help="largest number of vertices")
+    parser.add_argument("--min-n", type=int, default=4, help="smallest number of vertices (default: 4)")
+    parser.add_argument("--engines", default=",".join(ENGINES), help=f"comma-separated engines (default: {','.join(ENGINES)})")
+    parser.add_argument("--zdd-max-n", type=int, default=7, help="largest n for the zdd engine (default: 7)")
+    parser.add_argument("--timeout", type=int, default=600, help="seconds per engine and n (default: 600)")
+    parser.add_argument("--no-labelg", action="store_true", help="use the Python canonicaliser even if labelg exists")
+    parser.add_argument("--json", help="write the results (without the canonical sets) to this JSON file")
+    args = parser.parse_args()
+
+    engines = [e for e in args.engines.split(",") if e]
+    for engine in engines:
+        if engine not in ENGINES:
+            parser.error(f"unknown engine: {engine}")
+    use_labelg = not args.no_labelg
+    print(f"Canonical forms computed by: {canonicalizer_name(use_labelg)}")
+
+    results = benchmark(args.n, args.min_n, engines, {"zdd": args.zdd_max_n}, use_labelg, args.timeout)
+    problems = check_consistency(results)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump([{k: v for k, v in r.items() if k != "canonical"} for r in results], f, indent=2)
+
+    # 整合性の結果（不一致や結果のないエンジンがあれば終了コード 1、上限で省いた組は比べなかったと明示する）
+    # Consistency result (exit code 1 on any mismatch or missing result; runs left out by a limit are listed
+    # as not compared)
+    skipped = [r for r in results if "skipped" in r]
+    if skipped:
+        print("\nNot compared:")
+        for result in skipped:
+            print(f"  n={result['n']}: {result['engine']} ({result['skipped']})")
+    if problems:
+        print("\nInconsistencies:")
+        for problem in problems:
+            print(f"  {problem}")
+        exit(1)
+    if skipped:
+        print("\nAll engines that ran agree (counts and canonical sets).")
+    else:
+        print("\nAll engines agree (counts and canonical sets).")
+
+
+if __name__ == "__main__":
+    main()
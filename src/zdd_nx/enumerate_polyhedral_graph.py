@@ -3,7 +3,23 @@
 from graphillion import GraphSet
 import networkx as nx
 import os
+import sys
+import argparse
 import matplotlib.pyplot as plt
+from multiprocessing import Pool
+
+# geng_boost と共通の計測フックを読み込む
+# Load the instrumentation hooks shared with geng_boost
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "geng_boost"))
+from instrument import get_tracer, NullTracer
+from canon import canonical_lines, canonicalizer_name
+from compare_degree import parse_line, format_pattern
+from render import render_pages
+from zdd_cache import GraphSetCache, DEFAULT_CACHE_DIR
+
+# 計測フック（main() で環境変数 PIPELINE_TRACE に応じて差し替える）
+# Instrumentation hooks (replaced in main() depending on PIPELINE_TRACE)
+tracer = NullTracer()
 
 
 class BaseGraph:
@@ -38,6 +54,10 @@ class BaseGraph:
         self.base_graph = self
         self.graphs = GraphSet.universe()
 
+        # これまでに課した制約の指定（ZDD キャッシュのキーに使う）
+        # Spec of the constraints applied so far (used as the ZDD cache key)
+        self.spec = ()
+
     def print_universe(self):
         # エッジ集合を出力する
         # Print the universe of edges
@@ -51,7 +71,7 @@ class DegreeConstraint:
     次数制約を満たすグラフを列挙するクラス
     A class to enumerate graphs satisfying the degree constraints.
     """
-    def __init__(self, prev):
+    def __init__(self, prev, cache=None):
         # 前段のグラフ情報を受け取る
         # Receive the graph information from the previous class
         self.base_graph = prev.base_graph
@@ -59,11 +79,14 @@ class DegreeConstraint:
 
         # 各頂点の次数を 3 以上 (最大 n-1) に制限する制約を定義する
         # Define degree constraints to restrict each vertex to degree 3 or higher (up to n-1)
-        self.degree_constraints = {v: range(3, self.base_graph.n) for v in self.base_graph.vertices}
+        n = self.base_graph.n
+        self.degree_constraints = {v: range(3, n) for v in self.base_graph.vertices}
+        self.spec = prev.spec + (("degree", 3, n - 1),)
 
-        # 次数制約を満たすグラフを列挙する
-        # Enumerate graphs satisfying the degree constraints
-        self.graphs = GraphSet.graphs(degree_constraints=self.degree_constraints)
+        # 次数制約を満たすグラフを列挙する（キャッシュがあればそれを使う）
+        # Enumerate graphs satisfying the degree constraints (using the cache if given)
+        build = lambda: GraphSet.graphs(degree_constraints=self.degree_constraints)
+        self.graphs = cache.get_or_build(n, self.spec, build) if cache else build()
 
     def output_graphs(self):
         # 次数制約を満たすグラフの結果を出力する（デバッグ用）
@@ -85,19 +108,21 @@ class ConnectedConstraint:
     連結制約を満たすグラフを抽出するクラス
     A class to filter graphs satisfying the connected constraint.
     """
-    def __init__(self, prev):
+    def __init__(self, prev, cache=None):
         # 前段のグラフ情報を受け取る
         # Receive the graph information from the previous class
         self.base_graph = prev.base_graph
         self.graphs = prev.graphs
+        self.spec = prev.spec + (("connected",),)
 
         # 頂点集合を取得する
         # Get the set of vertices
         vertices = self.base_graph.vertices
 
-        # 連結なグラフだけを抽出する
-        # Filter graphs that are connected
-        self.graphs = self.graphs.including(GraphSet.connected_components(vertices))
+        # 連結なグラフだけを抽出する（キャッシュがあればそれを使う）
+        # Filter graphs that are connected (using the cache if given)
+        build = lambda: self.graphs.including(GraphSet.connected_components(vertices))
+        self.graphs = cache.get_or_build(self.base_graph.n, self.spec, build) if cache else build()
 
     def output_graphs(self):
         # 連結制約を満たすグラフの結果を出力する（デバッグ用）
@@ -114,6 +139,92 @@ class ConnectedConstraint:
             print(translated_graph)
 
 
+class DegreePatternConstraint:
+    """
+    次数分布パターン [[3, a], [4, b], ...] を持つ連結なグラフを抽出するクラス
+    （頂点 1..a を次数 3、続く b 頂点を次数 4、... と決めておく。どのラベルなしグラフもそのようなラベル付けを持つので
+      取りこぼしはなく、ラベル付きグラフの数は n! 通りから (a! b! ...) 通りに減る。辺数も次数和から決まる）
+    A class to filter connected graphs with the degree pattern [[3, a], [4, b], ...]
+    (vertices 1..a get degree 3, the next b vertices degree 4, and so on. Every unlabelled graph has such a
+     labelling, so nothing is missed, and the labellings drop from n! to a! b! ... The edge count follows
+     from the degree sum.)
+    """
+    def __init__(self, prev, pattern, cache=None):
+        # 前段のグラフ情報を受け取る
+        # Receive the graph information from the previous class
+        self.base_graph = prev.base_graph
+        self.graphs = prev.graphs
+        n = self.base_graph.n
+        vertices = self.base_graph.vertices
+
+        # パターンの次数を頂点に順に割り当てる
+        # Assign the degrees of the pattern to the vertices in order
+        degrees = [deg for deg, cnt in pattern for _ in range(cnt)]
+        if len(degrees) != n:
+            raise ValueError(f"The pattern has {len(degrees)} vertices, expected {n}")
+        degree_sum = sum(degrees)
+        if degree_sum % 2 or not 3 * n <= degree_sum <= 2 * (3 * n - 6) or min(degrees) < 3:
+            raise ValueError("No polyhedral graph has this degree pattern "
+                             f"(degree sum {degree_sum}, minimum degree {min(degrees)})")
+        self.degree_constraints = {v: range(d, d + 1) for v, d in zip(vertices, degrees)}
+        self.num_edges = degree_sum // 2
+        self.spec = prev.spec + (("pattern",) + tuple(degrees), ("connected",))
+
+        # 次数・連結性・辺数を 1 回の構築で課す（キャッシュがあればそれを使う）
+        # Impose the degrees, connectivity and edge count in one construction (using the cache if given)
+        build = lambda: GraphSet.graphs(vertex_groups=[vertices], degree_constraints=self.degree_constraints,
+                                        num_edges=self.num_edges)
+        self.graphs = cache.get_or_build(n, self.spec, build) if cache else build()
+
+
+class ZddStatistics:
+    """
+    グラフを列挙せずに ZDD 上で集計するクラス（総数・辺数ごとの個数・頂点ごとの次数ヒストグラム）
+    A class computing aggregates on the ZDD without iterating any graph
+    (total count, count per number of edges, per-vertex degree histograms).
+    """
+    def __init__(self, prev):
+        # 前段のグラフ情報を受け取る
+        # Receive the graph information from the previous class
+        self.base_graph = prev.base_graph
+        self.graphs = prev.graphs
+        n = self.base_graph.n
+
+        # 総数（ZDD 上の数え上げなので巨大でも一瞬）
+        # Total count (counted on the ZDD, so instant even when huge)
+        self.total = self.graphs.len()
+
+        # 辺数 m ごとの個数（graph_size で m 辺のグラフに絞る）
+        # Count per number of edges m (sliced with graph_size)
+        self.edge_counts = {}
+        for m in range(len(self.base_graph.edges) + 1):
+            count = self.graphs.graph_size(m).len()
+            if count:
+                self.edge_counts[m] = count
+
+        # 頂点 v の次数が d であるグラフの個数（v 以外は制約しない次数制約との共通部分）
+        # Number of graphs in which vertex v has degree d (intersection with a constraint on v only)
+        self.degree_histograms = {}
+        for v in self.base_graph.vertices:
+            histogram = {}
+            for d in range(n):
+                count = (self.graphs & GraphSet.graphs(degree_constraints={v: range(d, d + 1)})).len()
+                if count:
+                    histogram[d] = count
+            self.degree_histograms[v] = histogram
+
+    def output_statistics(self):
+        # 集計結果を出力する
+        # Output the aggregates
+        print(f"Total: {self.total}")
+        print("Graphs per number of edges:")
+        for m, count in self.edge_counts.items():
+            print(f"  m={m}: {count}")
+        print("Degree histogram per vertex (degree: count):")
+        for v, histogram in self.degree_histograms.items():
+            print(f"  v={v}: " + ", ".join(f"{d}: {count}" for d, count in histogram.items()))
+
+
 class IsomorphismRemoval:
     """
     同型なものを取り除くクラス
@@ -131,19 +242,24 @@ class IsomorphismRemoval:
 
         # すべてのグラフに対して同型判定を行う
         # Check all graphs for isomorphism
-        for edge_list in self.graphs:
+        tracer.begin(total_items=len(self.graphs))
+        for edge_list in tracer.timed_iter(self.graphs, "zdd_iterate"):
+            tracer.tick()
+
             # networkx のグラフオブジェクトを作成
             # Create a networkx Graph object
-            G = nx.Graph()
-            G.add_edges_from(edge_list)
+            with tracer.phase("decode"):
+                G = nx.Graph()
+                G.add_edges_from(edge_list)
 
             # 既存の unique_graphs に含まれるグラフと同型かどうかをチェック
             # Check if G is isomorphic to any graph already in unique_graphs
             is_new = True
-            for H in self.unique_graphs:
-                if nx.is_isomorphic(G, H):
-                    is_new = False
-                    break
+            with tracer.phase("isomorphism"):
+                for H in self.unique_graphs:
+                    if nx.is_isomorphic(G, H):
+                        is_new = False
+                        break
 
             # 同型でなければ追加
             # If not isomorphic to any existing graph, add G to unique_graphs
@@ -214,17 +330,120 @@ class PolyhedralRemoval:
             print(graph.edges())
 
 
+def partition_graphs(graphs, n, split="size", split_edges=4):
+    """
+    GraphSet を互いに素な部分族 [(名前, GraphSet)] に分ける
+      size  : 辺数 m ごと（平面グラフは m <= 3n-6 なので、それより多い辺数は ZDD 上で先に落とす）
+      edges : ユニバースの最初の split_edges 本の辺を含むか含まないか（2^split_edges 個）
+    Split a GraphSet into disjoint subfamilies [(name, GraphSet)]
+      size  : by edge count m (planar graphs have m <= 3n-6, so larger edge counts are dropped on the ZDD first)
+      edges : by including or excluding each of the first split_edges edges of the universe (2^split_edges parts)
+    """
+    graphs = graphs.smaller(3 * n - 5)
+    if split == "size":
+        parts = [(f"m={m}", graphs.graph_size(m)) for m in range(3 * n - 5)]
+    elif split == "edges":
+        fixed = list(GraphSet.universe())[:split_edges]
+        parts = []
+        for bits in range(1 << len(fixed)):
+            part = graphs
+            for i, edge in enumerate(fixed):
+                part = part.including(edge) if bits >> i & 1 else part.excluding(edge)
+            parts.append(("".join("1" if bits >> i & 1 else "0" for i in range(len(fixed))), part))
+    else:
+        raise ValueError(f"Unknown split: {split}")
+    return [(name, part) for name, part in parts if part.len()]
+
+
+def filter_part(args):
+    """
+    1 つの部分族を（別プロセスで）読み戻し、平面かつ 3-連結なグラフの正準形の集合を返す
+    （ZDD は同じ辺の順序のユニバースの下で dumps/loads する）
+    Load one subfamily (in a worker process) and return the set of canonical forms of its planar
+    3-connected graphs (the ZDD is passed with dumps/loads under a universe with the same edge order).
+    """
+    name, universe, dumped, use_labelg = args
+    GraphSet.set_universe(universe, traversal="as-is")
+    graphs = GraphSet.loads(dumped)
+    seen = [0]
+
+    def polyhedral_lines():
+        for edge_list in graphs:
+            seen[0] += 1
+            G = nx.Graph()
+            G.add_edges_from(edge_list)
+            if nx.check_planarity(G)[0] and nx.node_connectivity(G) >= 3:
+                H = nx.convert_node_labels_to_integers(G, ordering="sorted")
+                yield nx.to_graph6_bytes(H, header=False).decode().strip()
+
+    canonical = set(canonical_lines(polyhedral_lines(), use_labelg))
+    return name, seen[0], canonical
+
+
+class PartitionedRemoval:
+    """
+    ZDD を互いに素な部分族に分け、部分族ごとに別プロセスで平面性・3-連結性を判定して、
+    正準形で同型なものをまとめるクラス（IsomorphismRemoval・PlanarityRemoval・PolyhedralRemoval の並列版）
+    A class splitting the ZDD into disjoint subfamilies, testing planarity and 3-connectivity of each in its
+    own process and merging isomorphic graphs by canonical form (the parallel counterpart of
+    IsomorphismRemoval, PlanarityRemoval and PolyhedralRemoval).
+    """
+    def __init__(self, prev, jobs=1, split="size", split_edges=4, use_labelg=True):
+        # 前段のグラフ情報を受け取る
+        # Receive the graph information from the previous class
+        self.base_graph = prev.base_graph
+        n = self.base_graph.n
+
+        # 部分族に分け、ユニバースの辺の順序と一緒に渡す
+        # Split into subfamilies and pass them together with the edge order of the universe
+        parts = partition_graphs(prev.graphs, n, split, split_edges)
+        universe = list(GraphSet.universe())
+        tasks = [(name, universe, part.dumps(), use_labelg) for name, part in parts]
+        print(f"Split into {len(tasks)} parts by {split} ({jobs} processes, canonical forms by "
+              f"{canonicalizer_name(use_labelg)})")
+
+        # 部分族ごとの正準形の集合を合わせる（同じグラフが複数の部分族に現れうる）
+        # Merge the sets of canonical forms (the same graph may appear in several subfamilies)
+        canonical = set()
+        with Pool(jobs) as pool:
+            for name, seen, part_canonical in pool.imap_unordered(filter_part, tasks):
+                tracer.tick(seen)
+                canonical |= part_canonical
+                print(f"  part {name}: {seen} graphs, {len(part_canonical)} polyhedral up to isomorphism")
+
+        # 頂点を 1..n に付け直して networkx のグラフにする（正準形の順）
+        # Convert to networkx graphs with vertices 1..n (in canonical-form order)
+        self.graphs = []
+        for line in sorted(canonical):
+            G = nx.from_graph6_bytes(line.encode())
+            self.graphs.append(nx.relabel_nodes(G, {v: v + 1 for v in G}))
+
+    def output_graphs(self):
+        # 3-連結な平面グラフを出力する（デバッグ用）
+        # Output the 3-connected planar graphs (for debugging)
+        print("3-connected planar graphs:")
+        for graph in self.graphs:
+            print(graph.edges())
+
+
 class GraphDrawer:
     """
     グラフを描画してファイルに保存するクラス
+    （既定の "vector" は render.py で 5×7 のグリッドの PDF/SVG ページを jobs 並列に直接書き、
+      "matplotlib" は従来どおりグラフごとに 600 dpi の PNG を保存する）
     A class to draw graphs and save them as files.
+    (the default "vector" backend writes PDF/SVG pages in a 5x7 grid directly with render.py, jobs pages
+     in parallel; the "matplotlib" backend saves one 600-dpi PNG per graph as before)
     """
-    def __init__(self, prev, n, output_dir="polyhedral_graphs"):
+    def __init__(self, prev, n, output_dir="polyhedral_graphs", backend="vector", fmt="pdf", jobs=1):
         # 前段のグラフ情報を受け取る
         # Receive the graph information from the previous class
         self.graphs = prev.graphs
         self.n = n
         self.output_dir = output_dir
+        self.backend = backend
+        self.fmt = fmt
+        self.jobs = jobs
 
         # 出力先ディレクトリを作成する
         # Create the output directory if it doesn't exist
@@ -232,6 +451,14 @@ class GraphDrawer:
         os.makedirs(self.save_path, exist_ok=True)
 
     def draw_and_save(self):
+        # ベクター描画：平面レイアウトで配置し、ページ単位で書く
+        # Vector backend: place the graphs with the planar layout and write them page by page
+        if self.backend == "vector":
+            graphs = list(self.graphs)
+            for page_path in render_pages(graphs, [None] * len(graphs), self.save_path, self.n, self.fmt, self.jobs):
+                print(f"Saved {page_path}")
+            return
+
         # グラフを描画して保存する
         # Draw each graph and save it as a PNG file
         for idx, G in enumerate(self.graphs):
@@ -254,20 +481,20 @@ class GraphDrawer:
             print(f"Saved {filename}")
 
 
-def main():
-    # 頂点数をユーザー入力で受け取る
-    # Get the number of vertices from user input
-    n = int(input("Enter the number of vertices (>= 4): "))
-
+def zdd_stages(n, cache=None):
+    """
+    ZDD だけで済む段（元グラフ・次数制約・連結制約）を適用し、連結制約の段を返す
+    Apply the ZDD-only stages (base graph, degree and connected constraints) and return the connected stage.
+    """
     # 全ての頂点に次数 3 以上を課すためには、頂点数は少なくとも 4 以上である必要がある
     # n must be at least 4 to enforce a minimum degree of 3 on every vertex
     if n < 4:
-        print("Number of vertices must be at least 4 for degree >= 3 constraint.")
-        return
+        raise ValueError("Number of vertices must be at least 4 for degree >= 3 constraint.")
 
     # 元グラフを作成
     # Create the base graph
-    base_graph = BaseGraph(n)
+    with tracer.phase("universe"):
+        base_graph = BaseGraph(n)
 
     # 必要ならエッジ集合を出力する（デバッグ用）
     # Print the universe of edges (for debugging)
@@ -279,37 +506,181 @@ def main():
 
     # 次数制約を適用
     # Apply the degree constraint
-    constrained_graph = DegreeConstraint(constrained_graph)
-    print(f"Number of graphs after degree constraint: {len(constrained_graph.graphs)}")
+    with tracer.phase("degree_constraint"):
+        constrained_graph = DegreeConstraint(constrained_graph, cache)
+    tracer.count("degree_constraint", constrained_graph.graphs.len())
+    print(f"Number of graphs after degree constraint: {constrained_graph.graphs.len()}")
 
     # 連結制約を適用
     # Apply the connectivity constraint
-    constrained_graph = ConnectedConstraint(constrained_graph)
-    print(f"Number of graphs after connected constraint: {len(constrained_graph.graphs)}")
+    with tracer.phase("connected_constraint"):
+        constrained_graph = ConnectedConstraint(constrained_graph, cache)
+    tracer.count("connected_constraint", constrained_graph.graphs.len())
+    print(f"Number of graphs after connected constraint: {constrained_graph.graphs.len()}")
+    return constrained_graph
+
+
+def zdd_statistics(n, trace=None, cache=None):
+    """
+    グラフを列挙せずに、連結で次数 3 以上のラベル付きグラフの族を ZDD 上で集計する
+    Compute aggregates of the labelled connected min-degree-3 family on the ZDD, without enumeration.
+    """
+    global tracer
+    tracer = get_tracer("zdd_statistics", trace)
+    constrained_graph = zdd_stages(n, cache)
+    with tracer.phase("statistics"):
+        stats = ZddStatistics(constrained_graph)
+    tracer.close()
+    return stats
+
+
+def enumerate_polyhedral_graphs(n, trace=None, cache=None, jobs=1, split=None, split_edges=4, use_labelg=True):
+    """
+    n 頂点の多面体グラフ（3-連結平面グラフ）を列挙し、最後の段（PolyhedralRemoval）を返す
+    （cache に GraphSetCache を渡すと、次数制約・連結制約の ZDD をディスクから再利用する。
+      split に "size" か "edges" を渡すと、部分族に分けて jobs 個のプロセスで判定する PartitionedRemoval を返す）
+    Enumerate the polyhedral (3-connected planar) graphs on n vertices and return the last stage
+    (pass a GraphSetCache as cache to reuse the degree/connected ZDDs from disk.
+     With split "size" or "edges", return a PartitionedRemoval testing the subfamilies in `jobs` processes).
+    """
+    # 計測フック（--trace または環境変数 PIPELINE_TRACE が設定されたときだけ記録する）
+    # Instrumentation hooks (records only when --trace or PIPELINE_TRACE is set)
+    global tracer
+    tracer = get_tracer("enumerate_polyhedral_graph", trace)
+
+    # ZDD だけで済む段（次数制約・連結制約）
+    # The ZDD-only stages (degree and connected constraints)
+    constrained_graph = zdd_stages(n, cache)
+
+    # 分割モード：部分族ごとに並列に判定し、正準形でまとめる
+    # Partitioned mode: test the subfamilies in parallel and merge by canonical form
+    if split is not None:
+        tracer.begin(total_items=constrained_graph.graphs.len())
+        with tracer.phase("partitioned"):
+            constrained_graph = PartitionedRemoval(constrained_graph, jobs, split, split_edges, use_labelg)
+        tracer.count("polyhedral", len(constrained_graph.graphs))
+        print(f"Number of 3-connected graphs: {len(constrained_graph.graphs)}")
+        tracer.close()
+        return constrained_graph
 
     # 同型なものを取り除く
     # Remove isomorphic graphs
     constrained_graph = IsomorphismRemoval(constrained_graph)
+    tracer.count("non_isomorphic", len(constrained_graph.unique_graphs))
     print(f"Number of non-isomorphic graphs: {len(constrained_graph.unique_graphs)}")
 
     # 平面グラフでないものを取り除く
     # Remove non-planar graphs
-    constrained_graph = PlanarityRemoval(constrained_graph)
+    with tracer.phase("planarity"):
+        constrained_graph = PlanarityRemoval(constrained_graph)
+    tracer.count("planar", len(constrained_graph.graphs))
     print(f"Number of planar graphs: {len(constrained_graph.graphs)}")
 
     # 3-連結でないものを取り除く
     # Remove graphs that are not 3-connected
-    constrained_graph = PolyhedralRemoval(constrained_graph)
+    with tracer.phase("connectivity"):
+        constrained_graph = PolyhedralRemoval(constrained_graph)
+    tracer.count("polyhedral", len(constrained_graph.graphs))
     print(f"Number of 3-connected graphs: {len(constrained_graph.graphs)}")
+    tracer.close()
+    return constrained_graph
+
 
-    # # グラフを出力する（デバッグ用）
-    # # Output the graphs (for debugging)
-    # constrained_graph.output_graphs()
+def enumerate_degree_pattern(n, pattern, trace=None, cache=None, jobs=1, split_edges=4, use_labelg=True):
+    """
+    次数分布パターン [[3, a], [4, b], ...] を持つ n 頂点の多面体グラフだけを列挙し、PartitionedRemoval の段を返す
+    （n 全体を列挙せずに、compare_degree.py の予測したパターンを確かめるためのもの）
+    Enumerate only the polyhedral graphs on n vertices with the degree pattern [[3, a], [4, b], ...] and return
+    the PartitionedRemoval stage (to check a pattern predicted by compare_degree.py without a full run at n).
+    """
+    global tracer
+    tracer = get_tracer("enumerate_degree_pattern", trace)
+    if n < 4:
+        raise ValueError("Number of vertices must be at least 4 for degree >= 3 constraint.")
+
+    with tracer.phase("universe"):
+        base_graph = BaseGraph(n)
+
+    # 頂点ごとの次数・連結性・辺数を課す
+    # Impose the per-vertex degrees, connectivity and edge count
+    with tracer.phase("pattern_constraint"):
+        constrained_graph = DegreePatternConstraint(base_graph, pattern, cache)
+    tracer.count("pattern_constraint", constrained_graph.graphs.len())
+    print(f"Number of labelled graphs with pattern {format_pattern(pattern)}: {constrained_graph.graphs.len()}")
+
+    # 辺数は 1 つに決まっているので、最初の辺で分けて判定する
+    # The edge count is fixed, so split on the first edges for the tests
+    tracer.begin(total_items=constrained_graph.graphs.len())
+    with tracer.phase("partitioned"):
+        constrained_graph = PartitionedRemoval(constrained_graph, jobs, "edges", split_edges, use_labelg)
+    tracer.count("polyhedral", len(constrained_graph.graphs))
+    print(f"Number of 3-connected graphs: {len(constrained_graph.graphs)}")
+    tracer.close()
+    return constrained_graph
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Enumerate polyhedral graphs with Graphillion and NetworkX.")
+    parser.add_argument("n", type=int, help="number of vertices (>= 4)")
+    parser.add_argument("--output-graphs", action="store_true", help="print the edge lists (for debugging)")
+    parser.add_argument("--draw", action="store_true", help="draw every graph to polyhedral_graphs/n{n}/")
+    parser.add_argument("--draw-backend", choices=["vector", "matplotlib"], default="vector",
+                        help="vector: 5x7 PDF/SVG pages, matplotlib: one 600-dpi PNG per graph (default: vector)")
+    parser.add_argument("--draw-format", choices=["pdf", "svg"], default="pdf",
+                        help="page format of the vector backend (default: pdf)")
+    parser.add_argument("--trace", help="write a JSON-lines instrumentation trace to this file")
+    parser.add_argument("--stats", action="store_true",
+                        help="only print ZDD-level statistics (no enumeration of graphs)")
+    parser.add_argument("--cache", action="store_true", help="reuse the degree/connected ZDDs from an on-disk cache")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help=f"cache directory (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--cache-max-mb", type=int, default=1024, help="cache size limit in MB (default: 1024)")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="worker processes (also for --draw); more than 1 implies --split size (default: 1)")
+    parser.add_argument("--split", choices=["size", "edges"],
+                        help="split the ZDD into disjoint parts by edge count or by the first --split-edges edges")
+    parser.add_argument("--split-edges", type=int, default=4, help="edges fixed by --split edges (default: 4)")
+    parser.add_argument("--no-labelg", action="store_true", help="use the Python canonicaliser even if labelg exists")
+    parser.add_argument("--pattern", help='enumerate only graphs with this degree pattern, e.g. "[3,4] [4,3]"')
+    args = parser.parse_args()
+    split = args.split or ("size" if args.jobs > 1 else None)
+    pattern = parse_line(args.pattern) if args.pattern else None
+    if args.pattern and not pattern:
+        parser.error(f"Invalid degree pattern: {args.pattern} (expected e.g. \"[3,4] [4,3]\")")
+
+    cache = GraphSetCache(args.cache_dir, args.cache_max_mb << 20) if args.cache else None
+    try:
+        if args.stats:
+            # 統計モード：列挙が必要な段（同型除去・平面性・3-連結性）は実行しない
+            # Statistics mode: the stages that need enumeration (isomorphism, planarity, 3-connectivity) are skipped
+            zdd_statistics(args.n, args.trace, cache).output_statistics()
+        elif pattern:
+            # パターン指定モード：そのパターンを持つグラフだけを列挙する
+            # Pattern mode: enumerate only the graphs with that pattern
+            constrained_graph = enumerate_degree_pattern(args.n, pattern, args.trace, cache, args.jobs,
+                                                         args.split_edges, not args.no_labelg)
+        else:
+            constrained_graph = enumerate_polyhedral_graphs(args.n, args.trace, cache, args.jobs, split,
+                                                            args.split_edges, not args.no_labelg)
+    except ValueError as e:
+        print(f"Error: {e}")
+        exit(1)
+    if cache:
+        print(f"ZDD cache: {cache.hits} hits, {cache.misses} misses ({args.cache_dir})")
+
+    if args.stats:
+        return
 
-    # # グラフを描画して保存する
-    # # Draw and save the graphs
-    # drawer = GraphDrawer(constrained_graph, n)
-    # drawer.draw_and_save()
+    # グラフを出力する（デバッグ用）
+    # Output the graphs (for debugging)
+    if args.output_graphs:
+        constrained_graph.output_graphs()
+
+    # グラフを描画して保存する
+    # Draw and save the graphs
+    if args.draw:
+        drawer = GraphDrawer(constrained_graph, args.n, backend=args.draw_backend, fmt=args.draw_format,
+                             jobs=args.jobs)
+        drawer.draw_and_save()
 
 ####################
 if __name__ == "__main__":
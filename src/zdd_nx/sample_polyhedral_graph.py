@@ -0,0 +1,331 @@
+#! /usr/bin/env python
+
+import os
+import sys
+import math
+import random
+import argparse
+import subprocess
+import networkx as nx
+from collections import Counter, defaultdict
+from multiprocessing import Pool
+from statistics import NormalDist
+
+# geng_boost の判定と書式を読み込む
+# Load the geng_boost checks and formatting
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "geng_boost"))
+from count_degree_patterns import format_pattern
+from faces import automorphism_count
+from planar import planar_lines
+from prefilter import Cascade, TRICONNECTED_TESTS
+from triconnected import is_triconnected
+from zdd_cache import GraphSetCache, DEFAULT_CACHE_DIR
+import enumerate_polyhedral_graph as zdd
+
+# 多面体グラフの一様サンプリング：すべてを列挙できない n（n >= 14 など）について、
+# 次数分布パターンの頻度（degree_distribution/{n}.txt と同じもの）を信頼区間つきで推定し、逐次出力する。
+#   zdd  : 連結で次数 3 以上のラベル付きグラフの ZDD を辺数 m ごとに分け（平面グラフは m <= 3n-6）、
+#          各層から rand_iter で一様に引いて、平面かつ 3-連結でないものを棄却する。ラベルなしのグラフ G は
+#          n!/|Aut(G)| 通りのラベル付けで現れるので、採択したものに重み |Aut(G)| を付けて補正する。
+#   geng : geng -c -d3 n res/mod の分割（各ラベルなしグラフはちょうど 1 つの分割に入る）から
+#          res を無作為に選び、分割ごとに全数を数える（集落抽出）。分割の数 mod は、既定では 1 つの分割が
+#          geng の出力でおよそ 10^6 個（1 コアで数十秒から数分）になるように n から決める
+#          （n = 14 ではおよそ 8 億。mod = 1000 の分割 1 つは 10^12 個に近く、終わらない）。
+# 推定はどちらも（層化した）比推定で、信頼区間はデルタ法による正規近似。
+# 注：zdd は次数 3 以上の連結グラフの ZDD をまるごと作るので、メモリが n とともに急増する
+# （6 GB のマシンで n = 9 は約 615 MB、n = 10 はメモリ不足）。そのため zdd は n <= ZDD_MAX_N（9）に限り、
+# 既定のエンジンは n <= 9 なら zdd、それより大きければ geng にする（メモリの多いマシンでは --zdd-max-n で上げる）。
+# Uniform sampling of polyhedral graphs: for n too large to enumerate (n >= 14 and so on), estimate the
+# frequencies of the degree patterns (as in degree_distribution/{n}.txt) with confidence intervals,
+# reported as the samples stream in.
+#   zdd  : the ZDD of labelled connected min-degree-3 graphs is split by edge count m (planar needs
+#          m <= 3n-6); every stratum is drawn uniformly with rand_iter, and draws that are not planar and
+#          3-connected are rejected. An unlabelled graph G appears as n!/|Aut(G)| labelled graphs, so every
+#          accepted draw is weighted by |Aut(G)| to correct for that.
+#   geng : random residues of the geng -c -d3 n res/mod slices (every unlabelled graph lies in exactly one
+#          slice) are counted exhaustively (cluster sampling). By default the number of slices mod is derived
+#          from n so that one slice holds about 10^6 geng outputs (tens of seconds to minutes on one core;
+#          at n = 14 that is about 8 * 10^8 slices, whereas one slice of mod = 1000 holds close to 10^12
+#          graphs and never finishes).
+# Both use a (stratified) ratio estimator with delta-method normal confidence intervals.
+# Note: zdd builds the whole ZDD of connected min-degree-3 graphs, whose memory grows steeply with n
+# (n = 9 takes about 615 MB on a 6 GB machine, n = 10 runs out of memory). zdd is therefore limited to
+# n <= ZDD_MAX_N (9), and the default engine is zdd for n <= 9 and geng above (raise the limit with
+# --zdd-max-n on machines with more memory).
+#   例 / e.g.  python sample_polyhedral_graph.py 9 --samples 200000 --report-every 20000
+#              python sample_polyhedral_graph.py 14 --slices 50 -j 8
+
+ENGINES = ("zdd", "geng")
+
+# zdd エンジンで扱える最大の頂点数（6 GB のマシンで n = 10 はメモリ不足）
+# Largest number of vertices for the zdd engine (n = 10 runs out of memory on a 6 GB machine)
+ZDD_MAX_N = 9
+
+# geng の出力を planar.cpp に渡すまとまりの行数 / Lines of geng output passed to planar.cpp at a time
+BATCH_SIZE = 5000
+
+# geng エンジンの 1 つの分割で目標とする geng の出力数 / Target number of geng outputs per slice of the geng engine
+SLICE_OUTPUTS = 10 ** 6
+
+
+class PatternEstimator:
+    """
+    層化した比推定で、次数分布パターンの頻度とグラフの総数を逐次推定するクラス
+      層 h の標本単位ごとに x（多面体グラフの重み）と y_P（パターン P の重み）を加える。
+      size_h は層の母集団の大きさ（推定総数 = Σ size_h · mean(x)）
+    A class estimating the degree-pattern frequencies and the number of graphs by a stratified ratio
+    estimator, one sampling unit at a time.
+      Each unit of stratum h adds x (weight of polyhedral graphs) and y_P (weight of pattern P).
+      size_h is the population size of the stratum (estimated total = Σ size_h · mean(x)).
+    """
+    def __init__(self, confidence=0.95):
+        self.z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        self.strata = {}
+
+    def add_stratum(self, key, size, without_replacement=False):
+        self.strata[key] = {"size": size, "fpc": without_replacement, "units": 0, "sx": 0.0, "sxx": 0.0,
+                            "sy": defaultdict(float), "syy": defaultdict(float), "sxy": defaultdict(float)}
+
+    def add(self, key, x, ys):
+        s = self.strata[key]
+        s["units"] += 1
+        s["sx"] += x
+        s["sxx"] += x * x
+        for pattern, y in ys.items():
+            s["sy"][pattern] += y
+            s["syy"][pattern] += y * y
+            s["sxy"][pattern] += x * y
+
+    def units(self):
+        return sum(s["units"] for s in self.strata.values())
+
+    # 層 h の推定量の分散の係数 size_h^2 (1 - f_h) / k_h（標本が 2 つ未満なら None）
+    # Variance factor size_h^2 (1 - f_h) / k_h of stratum h (None with fewer than 2 units)
+    @staticmethod
+    def _factor(s):
+        k = s["units"]
+        if k < 2:
+            return None
+        fpc = 1 - k / s["size"] if s["fpc"] else 1
+        return s["size"] ** 2 * fpc / k
+
+    # 推定総数と信頼区間の半幅 / Estimated total and half-width of its confidence interval
+    def total(self):
+        estimate, variance = 0.0, 0.0
+        for s in self.strata.values():
+            factor = self._factor(s)
+            if factor is None:
+                return estimate, math.inf
+            k = s["units"]
+            estimate += s["size"] * s["sx"] / k
+            variance += factor * max(s["sxx"] - s["sx"] ** 2 / k, 0) / (k - 1)
+        return estimate, self.z * math.sqrt(variance)
+
+    # {パターン: (頻度, 信頼区間の半幅, 推定個数)} / {pattern: (frequency, half-width, estimated count)}
+    def frequencies(self):
+        total, _ = self.total()
+        patterns = {p for s in self.strata.values() for p in s["sy"]}
+        result = {}
+        for pattern in patterns:
+            count = sum(s["size"] * s["sy"].get(pattern, 0) / s["units"] for s in self.strata.values() if s["units"])
+            p = count / total if total else 0.0
+            # 残差 e = y - p x の層内分散から / From the within-stratum variance of the residual e = y - p x
+            variance = 0.0
+            for s in self.strata.values():
+                factor = self._factor(s)
+                if factor is None:
+                    variance = math.inf
+                    break
+                k = s["units"]
+                sy, syy, sxy = s["sy"].get(pattern, 0), s["syy"].get(pattern, 0), s["sxy"].get(pattern, 0)
+                se = sy - p * s["sx"]
+                see = syy - 2 * p * sxy + p * p * s["sxx"]
+                variance += factor * max(see - se * se / k, 0) / (k - 1)
+            half = self.z * math.sqrt(variance) / total if total else math.inf
+            result[pattern] = (p, half, count)
+        return result
+
+
+# 次数分布パターン ((次数, 個数), ...) / Degree pattern ((degree, count), ...)
+def degree_pattern(G):
+    return tuple(sorted(Counter(d for _, d in G.degree()).items()))
+
+
+# ZDD から引いたラベル付きグラフ（辺 (i, j)、頂点 1..n）を判定し、多面体なら (|Aut|, パターン) を返す関数
+# Classify a labelled draw from the ZDD (edges (i, j), vertices 1..n): (|Aut|, pattern) if polyhedral, else None
+def classify_draw(edges, n, cascade):
+    G = nx.Graph()
+    G.add_nodes_from(range(n))
+    G.add_edges_from((i - 1, j - 1) for i, j in edges)
+    is_planar, embedding = nx.check_planarity(G)
+    if not is_planar or cascade.reject(G) or not is_triconnected(G):
+        return None
+    rotation = [list(embedding.neighbors_cw_order(v)) for v in range(n)]
+    return automorphism_count(rotation), degree_pattern(G)
+
+
+# ZDD エンジン：辺数ごとの層から順番に 1 つずつ引き、report_every 回ごとに report(estimator) を呼ぶ
+# ZDD engine: draw from the edge-count strata in turn, calling report(estimator) every report_every draws
+def sample_zdd(n, samples, report, report_every=10000, confidence=0.95, cache=None):
+    estimator = PatternEstimator(confidence)
+    constrained_graph = zdd.zdd_stages(n, cache)
+    scale = math.factorial(n)
+    draws = {}
+    for m in range(math.ceil(3 * n / 2), 3 * n - 5):
+        stratum = constrained_graph.graphs.graph_size(m)
+        size = stratum.len()
+        if size:
+            # x = |Aut| なので、層の大きさを n! で割るとラベルなしの個数の推定になる
+            # x = |Aut|, so dividing the stratum size by n! estimates unlabelled counts
+            estimator.add_stratum(m, size / scale)
+            draws[m] = stratum.rand_iter()
+    print(f"Strata (edge counts): {', '.join(str(m) for m in draws)}")
+
+    cascade = Cascade(TRICONNECTED_TESTS)
+    accepted = 0
+    strata = list(draws)
+    for i in range(samples):
+        m = strata[i % len(strata)]
+        result = classify_draw(next(draws[m]), n, cascade)
+        if result is None:
+            estimator.add(m, 0, {})
+        else:
+            aut, pattern = result
+            estimator.add(m, aut, {pattern: aut})
+            accepted += 1
+        if (i + 1) % report_every == 0 or i + 1 == samples:
+            report(estimator, f"{i + 1} draws, {accepted} accepted ({accepted / (i + 1):.2%})")
+    return estimator
+
+
+# geng -c -d3 n ceil(3n/2):3n-6 の出力数の見積もり：ラベル付きグラフの数 C(n(n-1)/2, m) を n! で割って
+# 辺数 m について足す（最小次数の条件を無視するので多めだが、桁は合う。n = 10 で約 7 * 10^6）
+# Estimate the number of outputs of geng -c -d3 n ceil(3n/2):3n-6: the labelled graphs C(n(n-1)/2, m)
+# divided by n!, summed over the edge counts m (an overestimate, as it ignores the minimum degree, but of
+# the right order; about 7 * 10^6 at n = 10)
+def estimate_geng_outputs(n):
+    pairs = n * (n - 1) // 2
+    return sum(math.comb(pairs, m) for m in range(math.ceil(3 * n / 2), 3 * n - 5)) / math.factorial(n)
+
+
+# 1 つの分割が SLICE_OUTPUTS 個ほどになる分割の数 / Number of slices holding about SLICE_OUTPUTS graphs each
+def default_mod(n):
+    return max(1, round(estimate_geng_outputs(n) / SLICE_OUTPUTS))
+
+
+# geng の 1 つの分割 res/mod を全数処理し、(res, 多面体グラフの個数, {パターン: 個数}) を返す関数
+# Process the geng slice res/mod exhaustively and return (res, number of polyhedral graphs, {pattern: count})
+def count_slice(args):
+    n, res, mod = args
+    geng_cmd = ["geng", "-c", "-d3", "-q", str(n), f"{math.ceil(3 * n / 2)}:{3 * n - 6}", f"{res}/{mod}"]
+    cascade = Cascade(TRICONNECTED_TESTS)
+    counter = Counter()
+
+    def flush(batch):
+        for line, _ in planar_lines(batch, n):
+            G = nx.from_graph6_bytes(line.encode())
+            if not cascade.reject(G) and is_triconnected(G):
+                counter[degree_pattern(G)] += 1
+
+    with subprocess.Popen(geng_cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True) as proc:
+        batch = []
+        for line in proc.stdout:
+            line = line.strip()
+            if not line or line.startswith(">>"):
+                continue
+            batch.append(line)
+            if len(batch) >= BATCH_SIZE:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+    return res, sum(counter.values()), counter
+
+
+# geng エンジン：無作為に選んだ slices 個の分割を jobs 並列で数え、分割が終わるごとに report(estimator) を呼ぶ
+# geng engine: count `slices` random slices with `jobs` processes, calling report(estimator) after each slice
+def sample_geng(n, slices, mod, report, jobs=1, seed=None, confidence=0.95):
+    estimator = PatternEstimator(confidence)
+    estimator.add_stratum("slices", mod, without_replacement=True)
+    residues = random.Random(seed).sample(range(mod), min(slices, mod))
+    with Pool(jobs) as pool:
+        for res, total, counter in pool.imap_unordered(count_slice, [(n, res, mod) for res in residues]):
+            estimator.add("slices", total, counter)
+            report(estimator, f"{estimator.units()}/{len(residues)} slices of {mod} (last: {res}/{mod}, {total} graphs)")
+    return estimator
+
+
+# 推定値を頻度の降順で出力する関数（top 個まで、None ならすべて）
+# Print the estimates in descending order of frequency (up to `top`, all if None)
+def print_estimates(estimator, progress, top=None):
+    total, half = estimator.total()
+    print(f"\n[{progress}] estimated polyhedral graphs: {total:.6g} ± {half:.3g}")
+    estimates = sorted(estimator.frequencies().items(), key=lambda x: (-x[1][0], x[0]))
+    for pattern, (p, half, count) in estimates[:top]:
+        print(f"{format_pattern(pattern)} : {p:.6f} ± {half:.6f} (~{count:.4g})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estimate degree-pattern frequencies of polyhedral graphs by uniform sampling.")
+    parser.add_argument("n", type=int, help="number of vertices (>= 4)")
+    parser.add_argument("--engine", choices=ENGINES,
+                        help=f"sampling engine (default: zdd for n <= {ZDD_MAX_N}, geng above)")
+    parser.add_argument("--zdd-max-n", type=int, default=ZDD_MAX_N,
+                        help=f"largest n for the zdd engine, limited by memory (default: {ZDD_MAX_N})")
+    parser.add_argument("--samples", type=int, default=100000, help="zdd: number of draws (default: 100000)")
+    parser.add_argument("--report-every", type=int, default=10000, help="zdd: draws between reports (default: 10000)")
+    parser.add_argument("--mod", type=int,
+                        help=f"geng: number of res/mod slices (default: derived from n so that each slice holds "
+                             f"about {SLICE_OUTPUTS:.0e} geng outputs, tens of seconds to minutes per slice on one core)")
+    parser.add_argument("--slices", type=int, default=20, help="geng: number of slices to count (default: 20)")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="geng: parallel processes (default: 1)")
+    parser.add_argument("--seed", type=int, help="geng: random seed for choosing the slices")
+    parser.add_argument("--confidence", type=float, default=0.95, help="confidence level (default: 0.95)")
+    parser.add_argument("--top", type=int, default=20, help="patterns shown in progress reports (default: 20)")
+    parser.add_argument("--cache", action="store_true", help="zdd: reuse the degree/connected ZDDs from an on-disk cache")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help=f"cache directory (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--cache-max-mb", type=int, default=1024, help="cache size limit in MB (default: 1024)")
+    args = parser.parse_args()
+
+    # zdd のメモリが足りない n では、既定は geng にし、明示された zdd は実行前に止める
+    # Above the memory limit of zdd, default to geng and stop an explicit zdd before it starts
+    if args.engine is None:
+        args.engine = "zdd" if args.n <= args.zdd_max_n else "geng"
+    elif args.engine == "zdd" and args.n > args.zdd_max_n:
+        parser.error(f"the zdd engine is limited to n <= {args.zdd_max_n} by memory (n=10 runs out on a 6 GB machine); "
+                     f"use --engine geng, or raise --zdd-max-n on a machine with more memory")
+    print(f"Engine: {args.engine}")
+
+    # 分割 1 つあたりの geng の出力数を見積もって表示し、大きすぎる分割は実行前に止める
+    # Show the estimated geng outputs per slice, and stop before running slices that are far too large
+    if args.engine == "geng":
+        args.mod = args.mod or default_mod(args.n)
+        per_slice = estimate_geng_outputs(args.n) / args.mod
+        print(f"Slices: {args.mod} (about {per_slice:.2g} geng outputs each)")
+        if per_slice > 100 * SLICE_OUTPUTS:
+            parser.error(f"one slice of {args.mod} holds about {per_slice:.2g} geng outputs and would not finish; "
+                         f"use a larger --mod (about {default_mod(args.n)}) or leave it out")
+
+    report = lambda estimator, progress: print_estimates(estimator, progress, args.top)
+    try:
+        if args.engine == "zdd":
+            cache = GraphSetCache(args.cache_dir, args.cache_max_mb << 20) if args.cache else None
+            estimator = sample_zdd(args.n, args.samples, report, args.report_every, args.confidence, cache)
+        else:
+            estimator = sample_geng(args.n, args.slices, args.mod, report, args.jobs, args.seed, args.confidence)
+    except ValueError as e:
+        print(f"Error: {e}")
+        exit(1)
+    except FileNotFoundError as e:
+        # geng や planar バイナリが見つからない場合はエラー
+        # If geng or the planar binary is missing, show an error
+        print(f"Error: {e}")
+        exit(1)
+
+    # 最終結果（すべてのパターン）/ Final result (all patterns)
+    print("\nAll degree patterns and their estimated frequencies:")
+    print_estimates(estimator, "final")
+
+
+if __name__ == "__main__":
+    main()
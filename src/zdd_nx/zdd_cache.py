@@ -0,0 +1,101 @@
+#! /usr/bin/env python
+
+from graphillion import GraphSet
+import os
+import json
+import hashlib
+import tempfile
+
+# ZDD キャッシュ：GraphSet を Graphillion の dump/load でディスクに保存し、
+# (n, 制約の指定, ユニバースの辺の順序) をキーにして再利用する。
+# 合計サイズが上限を超えたら、最後に使われたのが古いものから削除する。
+# ZDD cache: GraphSets are saved on disk with Graphillion's dump/load and reused,
+# keyed by (n, constraint spec, edge order of the universe).
+# When the total size exceeds the limit, the least recently used entries are evicted.
+
+# 既定のキャッシュディレクトリ（環境変数 ZDD_CACHE_DIR で変更可）
+# Default cache directory (can be changed with the ZDD_CACHE_DIR environment variable)
+DEFAULT_CACHE_DIR = os.environ.get("ZDD_CACHE_DIR", "zdd_cache")
+
+# 既定のキャッシュサイズ上限（バイト）/ Default cache size limit (bytes)
+DEFAULT_MAX_BYTES = 1 << 30
+
+
+class GraphSetCache:
+    """
+    GraphSet をディスクに保存・再利用するキャッシュ
+    An on-disk cache of GraphSets.
+    """
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, n, spec):
+        # 現在のユニバースの辺の順序もキーに含める（順序が違うと ZDD を読み戻せない）
+        # Include the current edge order of the universe (a ZDD cannot be loaded under another order)
+        record = {"n": n, "spec": [list(s) for s in spec], "universe": [list(e) for e in GraphSet.universe()]}
+        text = json.dumps(record, sort_keys=True)
+        return hashlib.sha256(text.encode()).hexdigest()[:32], record
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.zdd")
+
+    def load(self, n, spec):
+        # キャッシュにあれば GraphSet を読み戻し、なければ None を返す
+        # Load the GraphSet if cached, otherwise return None
+        key, _ = self.key(n, spec)
+        path = self._path(key)
+        if not os.path.exists(path):
+            self.misses += 1
+            return None
+        with open(path) as f:
+            graphs = GraphSet.load(f)
+        os.utime(path)  # 最終使用時刻を更新 / Mark as recently used
+        self.hits += 1
+        return graphs
+
+    def store(self, n, spec, graphs):
+        # 一時ファイルに書いてから置き換え、途中で止まっても壊れたエントリが残らないようにする
+        # Write to a temporary file and rename it, so an interrupted run leaves no broken entry
+        key, record = self.key(n, spec)
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=self.cache_dir)
+        with os.fdopen(fd, "w") as f:
+            graphs.dump(f)
+        os.replace(tmp_path, self._path(key))
+
+        # 人が読めるようにキーの中身も残す / Keep the key contents for humans
+        record["count"] = graphs.len()
+        with open(os.path.join(self.cache_dir, f"{key}.json"), "w") as f:
+            json.dump(record, f)
+        self.evict()
+
+    def get_or_build(self, n, spec, build):
+        # キャッシュにあればそれを、なければ build() で作って保存したものを返す
+        # Return the cached GraphSet, or build it with build() and store it
+        graphs = self.load(n, spec)
+        if graphs is None:
+            graphs = build()
+            self.store(n, spec, graphs)
+        return graphs
+
+    def evict(self):
+        # 合計サイズが上限を超えている間、最後に使われたのが古いエントリから削除する
+        # While the total size exceeds the limit, remove the least recently used entries
+        entries = []
+        for fname in os.listdir(self.cache_dir):
+            if fname.endswith(".zdd"):
+                path = os.path.join(self.cache_dir, fname)
+                st = os.stat(path)
+                entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            meta_path = path[:-len(".zdd")] + ".json"
+            if os.path.exists(meta_path):
+                os.remove(meta_path)
+            total -= size
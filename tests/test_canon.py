@@ -0,0 +1,81 @@
+import os
+import sys
+import time
+import random
+import subprocess
+import networkx as nx
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "geng_boost")
+sys.path.append(SRC_DIR)
+import canon
+from canon import _python_canonical, canonical_graph6, canonical_lines
+
+
+def graph6(G):
+    return nx.to_graph6_bytes(nx.convert_node_labels_to_integers(G), header=False).decode().strip()
+
+
+# 対称性の高いグラフでも自己同型で刈り込んで 1 秒以内に終わる
+# Highly symmetric graphs finish within a second thanks to automorphism pruning
+def test_symmetric_graphs_are_fast():
+    for G in (nx.complete_graph(10), nx.complete_bipartite_graph(6, 6), nx.empty_graph(10), nx.complete_graph(12)):
+        start = time.perf_counter()
+        _python_canonical(graph6(G))
+        assert time.perf_counter() - start < 1.0
+
+
+# 正準形はラベルの付け方によらない / The canonical form does not depend on the labelling
+def test_relabelled_graphs_agree():
+    rng = random.Random(1)
+    for G in (nx.petersen_graph(), nx.complete_bipartite_graph(6, 6), nx.hypercube_graph(4),
+              nx.icosahedral_graph(), nx.paley_graph(13).to_undirected(), nx.gnp_random_graph(11, 0.4, seed=3)):
+        G = nx.convert_node_labels_to_integers(G)
+        forms = set()
+        for _ in range(5):
+            perm = list(G)
+            rng.shuffle(perm)
+            forms.add(_python_canonical(graph6(nx.relabel_nodes(G, dict(zip(G, perm))))))
+        assert len(forms) == 1
+
+
+# 同型でないグラフは別の正準形になる / Non-isomorphic graphs get different canonical forms
+def test_non_isomorphic_graphs_differ():
+    forms = {_python_canonical(graph6(G)) for G in nx.graph_atlas_g()[1:200]}
+    assert len(forms) == 199
+
+
+# labelg の代わりに Python の正準化を行うスクリプトを LABELG にする
+# Point LABELG at a script canonicalising with the Python implementation instead of labelg
+def fake_labelg(tmp_path, monkeypatch):
+    script = tmp_path / "labelg"
+    script.write_text(f"#!{sys.executable}\n"
+                      f"import sys; sys.path.insert(0, {os.path.abspath(SRC_DIR)!r})\n"
+                      "from canon import _python_canonical\n"
+                      "for line in sys.stdin:\n"
+                      "    print(_python_canonical(line.strip()), flush=True)\n")
+    script.chmod(0o755)
+    monkeypatch.setattr(canon, "LABELG", str(script))
+
+    # 起動した子プロセスを覚えておく / Remember the child processes started
+    procs = []
+    popen = subprocess.Popen
+    def recording_popen(*args, **kwargs):
+        procs.append(popen(*args, **kwargs))
+        return procs[-1]
+    monkeypatch.setattr(canon.subprocess, "Popen", recording_popen)
+    return procs
+
+
+# 途中で捨てたジェネレータも labelg を止めて回収する / An abandoned generator still stops and reaps labelg
+def test_abandoned_generator_reaps_labelg(tmp_path, monkeypatch):
+    procs = fake_labelg(tmp_path, monkeypatch)
+    lines = [graph6(G) for G in nx.graph_atlas_g()[1:200]] * 20
+    gen = canonical_lines(lines)
+    assert next(gen) == _python_canonical(lines[0])
+    gen.close()
+    assert len(procs) == 1 and procs[0].returncode is not None and procs[0].stdout.closed
+
+    # 最後まで読めば Python 実装と同じ正準形になる / Read to the end, the forms match the Python implementation
+    assert list(canonical_lines(lines[:199])) == [_python_canonical(line) for line in lines[:199]]
+    assert procs[1].returncode == 0
+    assert canonical_graph6(lines[5]) == _python_canonical(lines[5])
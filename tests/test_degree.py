@@ -0,0 +1,21 @@
+import os
+import sys
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "geng_boost"))
+from degree import eval_expr, parse_constraints
+
+
+def test_expressions():
+    assert eval_expr("n-2", 10) == 8
+    assert eval_expr("2*n-4", 10) == 16
+    assert eval_expr("n//2+1", 9) == 5
+    assert parse_constraints(["n-2:2", "3:n-2"], 8) == [(6, 2), (3, 6)]
+
+
+# 書式の誤りはすべて ValueError になる（CLI は parser.error で報告する）
+# Every malformed input raises ValueError (the CLIs report it with parser.error)
+@pytest.mark.parametrize("spec", ["n-:2", "3:(n", "n//0:1", "m:2", "n**2:1", "3", "3:4:5", ""])
+def test_malformed_constraints_raise_value_error(spec):
+    with pytest.raises(ValueError):
+        parse_constraints([spec], 8)
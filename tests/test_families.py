@@ -0,0 +1,54 @@
+import os
+import sys
+import json
+import networkx as nx
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "geng_boost"))
+from canon import encode_graph6, canonical_lines
+from families import CURATED_DIR, VARIANTS, build_index, json_to_graph6, pyramid
+
+
+# 車輪（頂点 n-1 が中心）の外周に弦を足したグラフの graph6
+# graph6 of a wheel (apex n-1) with chords added to its rim
+def wheel_with_chords(n, chords):
+    adj = pyramid(n)
+    for u, v in chords:
+        adj[u].add(v)
+        adj[v].add(u)
+    G = nx.Graph([(u, v) for u in range(n) for v in adj[u]])
+    assert nx.check_planarity(G)[0] and nx.node_connectivity(G) >= 3
+    return encode_graph6(adj)
+
+
+# 変種の族の規則は、JSON を索引に入れなくても手作業で選ばれた例をすべて見つける
+# The variant rules find every curated example without putting the JSON into the index
+def test_variant_rules_cover_curated_examples():
+    for family in VARIANTS:
+        family_dir = os.path.join(CURATED_DIR, family)
+        for name in os.listdir(family_dir):
+            index = build_index(int(name[1:]), curated_dir=None, use_labelg=False)
+            for fname in os.listdir(os.path.join(family_dir, name)):
+                with open(os.path.join(family_dir, name, fname)) as f:
+                    assert family in index.classify(json_to_graph6(json.load(f)))
+
+
+# 例のない n（12 以上）でも変種の族を判定できる
+# Variant families are recognised at n with no curated examples (12 and above)
+def test_variants_beyond_curated_data():
+    for n in (12, 13, 14):
+        assert not os.path.isdir(os.path.join(CURATED_DIR, "pyramid_var_1", f"n{n}"))
+        index = build_index(n, curated_dir=None, use_labelg=False)
+        rim = n - 1
+        assert index.classify(encode_graph6(pyramid(n))) == ["pyramid"]
+
+        # 弦 1 本：弦の長さ 2..rim//2 ごとに 1 つずつ / One chord: one member per chord length 2..rim//2
+        members = [wheel_with_chords(n, [(0, d)]) for d in range(2, rim // 2 + 1)]
+        assert all(index.classify(line) == ["pyramid_var_1"] for line in members)
+        assert len(set(canonical_lines(members, False))) == rim // 2 - 1
+
+        # 端点を共有しない交差しない弦 2 本 / Two non-crossing chords without common endpoints
+        assert index.classify(wheel_with_chords(n, [(0, 2), (3, 5)])) == ["pyramid_var_4"]
+        assert index.classify(wheel_with_chords(n, [(0, 5), (1, 3)])) == ["pyramid_var_4"]
+
+        # 外周の 3 頂点を結ぶ三角形 / A triangle on three rim vertices
+        assert index.classify(wheel_with_chords(n, [(0, 3), (3, 7), (0, 7)])) == ["pyramid_var_5"]
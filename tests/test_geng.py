@@ -0,0 +1,19 @@
+import os
+import sys
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "geng_boost"))
+from geng import parse_edge_range
+
+
+def test_edge_ranges():
+    assert parse_edge_range("12:18") == (12, 18)
+    assert parse_edge_range("12") == (12, 12)
+
+
+# derive.py と geng.py は ValueError を parser.error で報告する
+# derive.py and geng.py report ValueError with parser.error
+@pytest.mark.parametrize("spec", ["", "x:3", "3:", "18:12", "-1:3", "1:2:3"])
+def test_malformed_edge_ranges_raise_value_error(spec):
+    with pytest.raises(ValueError):
+        parse_edge_range(spec)
@@ -0,0 +1,47 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "geng_boost"))
+import jobqueue
+from jobqueue import LeaseQueue
+from store import input_files
+
+
+# 書きかけの一時ファイルはチャンクとして数えない
+# Temporary files in progress are not listed as chunks
+def test_temporary_outputs_are_not_chunks(tmp_path):
+    chunk_dir = tmp_path / "n7"
+    chunk_dir.mkdir()
+    (chunk_dir / "00000.g6.xz").write_bytes(b"")
+    (chunk_dir / ".tmp-host-1-00001.g6.xz").write_bytes(b"")
+    assert input_files(str(tmp_path), 7) == [str(chunk_dir / "00000.g6.xz")]
+
+
+# 期限切れのリースは奪える / An expired lease is taken over
+def test_expired_lease_is_taken_over(tmp_path):
+    old = LeaseQueue(str(tmp_path), ["a"], lease_seconds=10, worker="old")
+    assert old.acquire() == "a"
+    lease = tmp_path / "a.lease"
+    os.utime(lease, (time.time() - 60, time.time() - 60))
+    assert LeaseQueue(str(tmp_path), ["a"], lease_seconds=10, worker="new").acquire() == "a"
+    assert lease.read_text() == "new\n"
+
+
+# 期限切れと判定した後にハートビートが再開したリースは、移した後に元に戻す
+# A lease whose heartbeat resumes after it was found expired is put back after the rename
+def test_refreshed_lease_is_not_taken_over(tmp_path, monkeypatch):
+    old = LeaseQueue(str(tmp_path), ["a"], lease_seconds=10, worker="old")
+    assert old.acquire() == "a"
+    lease = tmp_path / "a.lease"
+    os.utime(lease, (time.time() - 60, time.time() - 60))
+
+    rename = os.rename
+    def rename_after_heartbeat(src, dst):
+        old.heartbeat("a")
+        rename(src, dst)
+    monkeypatch.setattr(jobqueue.os, "rename", rename_after_heartbeat)
+
+    assert LeaseQueue(str(tmp_path), ["a"], lease_seconds=10, worker="new").acquire() is None
+    assert lease.read_text() == "old\n"
+    assert os.listdir(tmp_path) == ["a.lease"]
@@ -0,0 +1,53 @@
+import os
+import sys
+import lzma
+import time
+import random
+import networkx as nx
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "geng_boost"))
+from coords import sidecar_path
+from pipeline import run_pipeline
+
+
+# graph6 ファイルと、行ごとに目印を入れた座標サイドカーを書く
+# Write a graph6 file and a coordinate sidecar whose lines mark the graph they belong to
+def write_input(path, count):
+    lines = [nx.to_graph6_bytes(nx.gnm_random_graph(8, 12, seed=i), header=False).strip() for i in range(count)]
+    with lzma.open(path, "wb") as f:
+        f.write(b"".join(line + b"\n" for line in lines))
+    with lzma.open(sidecar_path(path), "wb") as f:
+        f.write(b"".join(b"%d " % i + line + b"\n" for i, line in enumerate(lines)))
+    return lines
+
+
+# 最小次数 2 以上のグラフだけを残す。まとまりごとに待ち時間を変えて、終わる順序を入れ替える
+# Keep the graphs of minimum degree at least 2; a random delay per batch shuffles the order batches finish in
+def keep_min_degree_2(batch):
+    time.sleep(random.random() * 0.01)
+    return [(line, xy) for line, xy in batch if min(d for _, d in nx.from_graph6_bytes(line).degree) >= 2]
+
+
+def read_output(path):
+    with lzma.open(path, "rb") as f, lzma.open(sidecar_path(path), "rb") as xy:
+        return f.read(), xy.read()
+
+
+# 複数ワーカーでも、出力と座標サイドカーは 1 ワーカーのときとバイト単位で一致し、行と座標の組もずれない
+# With several workers the output and its sidecar match the single-worker run byte for byte, pairs intact
+def test_workers_keep_order_and_sidecar(tmp_path):
+    input_path = str(tmp_path / "in.g6.xz")
+    lines = write_input(input_path, 500)
+    counts = {}
+    for workers in (1, 4):
+        counts[workers] = run_pipeline(input_path, str(tmp_path / f"w{workers}.g6.xz"), keep_min_degree_2,
+                                       read_xy=True, write_xy=True, workers=workers, batch_lines=7)
+    serial, serial_xy = read_output(str(tmp_path / "w1.g6.xz"))
+    parallel, parallel_xy = read_output(str(tmp_path / "w4.g6.xz"))
+    assert parallel == serial and parallel_xy == serial_xy
+
+    expected = [(i, line) for i, line in enumerate(lines)
+                if min(d for _, d in nx.from_graph6_bytes(line).degree) >= 2]
+    assert 0 < len(expected) < len(lines) and counts == {1: len(expected), 4: len(expected)}
+    assert serial == b"".join(line + b"\n" for _, line in expected)
+    assert serial_xy == b"".join(b"%d " % i + line + b"\n" for i, line in expected)
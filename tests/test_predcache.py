@@ -0,0 +1,102 @@
+import os
+import sys
+import lzma
+import sqlite3
+import pytest
+import networkx as nx
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "geng_boost"))
+from predcache import PredicateCache
+from triconnected import process_file
+
+
+def graph_line(G):
+    return nx.to_graph6_bytes(G, header=False).decode().strip()
+
+
+def open_cache(tmp_path, max_bytes=1 << 30):
+    return PredicateCache(str(tmp_path / "cache.sqlite"), max_bytes, use_labelg=False, warn=False)
+
+
+# キャッシュにないものだけを compute に渡し、頂点を付け替えた同じグラフはヒットになる
+# Only misses reach compute, and a relabelled copy of a cached graph is a hit
+def test_resolve_computes_misses_and_hits_relabelled(tmp_path):
+    graphs = [nx.gnm_random_graph(7, 10, seed=i) for i in range(5)]
+    calls = []
+
+    def compute(lines):
+        calls.append(lines)
+        return [nx.is_connected(nx.from_graph6_bytes(line.encode())) for line in lines]
+
+    cache = open_cache(tmp_path)
+    lines = [graph_line(G) for G in graphs]
+    expected = [nx.is_connected(G) for G in graphs]
+    assert cache.resolve("connected", lines[:3], compute) == expected[:3]
+    assert cache.resolve("connected", lines, compute) == expected
+    assert calls == [lines[:3], lines[3:]]
+
+    relabelled = []
+    for G in graphs:
+        H = nx.empty_graph(7)
+        H.add_edges_from(((u + 3) % 7, (v + 3) % 7) for u, v in G.edges)
+        relabelled.append(graph_line(H))
+    assert relabelled != lines
+    assert cache.resolve("connected", relabelled, compute) == expected
+    assert len(calls) == 2 and cache.stats == {"connected": [3 + 5, 5]}
+    cache.close()
+
+
+# 別の正準化で作ったキャッシュは開けない / A cache built with another canonicaliser is refused
+def test_canonicalizer_mismatch_is_refused(tmp_path):
+    open_cache(tmp_path).close()
+    db = sqlite3.connect(str(tmp_path / "cache.sqlite"))
+    with db:
+        db.execute("UPDATE meta SET value = 'labelg' WHERE name = 'canonicalizer'")
+    db.close()
+    with pytest.raises(ValueError):
+        open_cache(tmp_path)
+
+
+# 上限を超えたら、最後に参照された世代の古い行から削除する
+# Over the limit, the rows last used in the oldest generation go first
+def test_evict_removes_oldest_first(tmp_path):
+    old = {f"old{i:04d}" + "x" * 60: i for i in range(1000)}
+    new = {f"new{i:04d}" + "x" * 60: i for i in range(1000)}
+    cache = open_cache(tmp_path)
+    cache.put_many("p", old)
+    cache.close(evict=False)
+
+    cache = open_cache(tmp_path)
+    cache.put_many("p", new)
+    touched = list(old)[:100]
+    assert cache.get_many("p", touched) == {key: old[key] for key in touched}
+    cache.max_bytes = int(cache.used_bytes() * 0.8)
+    removed = cache.evict()
+    assert 0 < removed < 900
+
+    left = cache.get_many("p", list(old) + list(new))
+    assert all(key in left for key in list(new) + touched)
+    assert len(left) == 2000 - removed
+    cache.close(evict=False)
+
+
+# キャッシュを使い 4 ワーカーで処理しても、キャッシュなしの 1 ワーカーとバイト単位で一致する（2 回目は全部ヒット）
+# With the cache and 4 workers the output matches the uncached single-worker run byte for byte
+# (the second run is all hits)
+def test_cached_pipeline_matches_serial(tmp_path):
+    input_path = str(tmp_path / "in.g6.xz")
+    with lzma.open(input_path, "wt") as f:
+        f.write("".join(graph_line(nx.gnm_random_graph(8, 16, seed=i)) + "\n" for i in range(400)))
+    serial_count = process_file(input_path, str(tmp_path / "serial.g6.xz"), 8)
+    with lzma.open(tmp_path / "serial.g6.xz", "rb") as f:
+        serial = f.read()
+
+    cache = open_cache(tmp_path)
+    for run in range(2):
+        output_path = str(tmp_path / f"cached{run}.g6.xz")
+        assert process_file(input_path, output_path, 8, workers=4, cache=cache) == serial_count
+        with lzma.open(output_path, "rb") as f:
+            assert f.read() == serial
+    hits, misses = cache.stats["triconnected"]
+    assert 0 < serial_count and hits == misses > 0
+    cache.close()
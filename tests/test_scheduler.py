@@ -0,0 +1,46 @@
+import os
+import sys
+import lzma
+import pytest
+import networkx as nx
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "geng_boost"))
+from scheduler import schedule
+
+
+# n 頂点の graph6 行を chunks 個のチャンクに分けて書く / Write graph6 lines on n vertices as `chunks` chunk files
+def write_chunks(store, n, lines, chunks):
+    chunk_dir = store / f"n{n}"
+    chunk_dir.mkdir(parents=True)
+    size = -(-len(lines) // chunks)
+    for i in range(chunks):
+        with lzma.open(chunk_dir / f"{i:05d}.g6.xz", "wt") as f:
+            f.write("".join(line + "\n" for line in lines[i * size:(i + 1) * size]))
+
+
+def graph_lines(n, count):
+    return [nx.to_graph6_bytes(nx.gnm_random_graph(n, 2 * n, seed=i), header=False).decode().strip()
+            for i in range(count)]
+
+
+def test_outputs_follow_input_order(tmp_path):
+    lines = graph_lines(8, 600)
+    write_chunks(tmp_path / "in", 8, lines, 2)
+    total = schedule("triconnected", str(tmp_path / "in"), 8, str(tmp_path / "out"), jobs=2, target_seconds=0.01)
+    kept = []
+    for i in range(2):
+        with lzma.open(tmp_path / "out" / "n8" / f"{i:05d}.g6.xz", "rt") as f:
+            kept += f.read().split()
+    expected = [line for line in lines if nx.node_connectivity(nx.from_graph6_bytes(line.encode())) >= 3]
+    assert total == len(kept) and kept == expected
+
+
+# 失敗したバッチがあれば、書きかけを含むこの実行の出力を残さない
+# A failed batch leaves no output of the run behind, partial or complete
+def test_failed_batch_removes_outputs(tmp_path):
+    lines = graph_lines(8, 600)
+    lines[500] = "not graph6"
+    write_chunks(tmp_path / "in", 8, lines, 2)
+    with pytest.raises(Exception):
+        schedule("triconnected", str(tmp_path / "in"), 8, str(tmp_path / "out"), jobs=2, target_seconds=0.01)
+    assert os.listdir(tmp_path / "out" / "n8") == []